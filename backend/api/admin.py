@@ -8,27 +8,27 @@ class QuanAdmin(admin.ModelAdmin):
     list_display = ('id', 'ten_quan', 'so_dai_ly')
     search_fields = ('ten_quan',)
 
-    def so_dai_ly(self, obj):
-        return obj.dai_lys.count()
-
-    so_dai_ly.short_description = "Số đại lý"
-
 
 @admin.register(LoaiDaiLy)
 class LoaiDaiLyAdmin(admin.ModelAdmin):
     list_display = ('id', 'ten_loai_dai_ly', 'no_toi_da', 'so_dai_ly')
     search_fields = ('ten_loai_dai_ly',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_so_dai_ly()
+
     def so_dai_ly(self, obj):
-        return obj.dai_lys.count()
+        return obj.so_dai_ly
 
     so_dai_ly.short_description = "Số đại lý"
+    so_dai_ly.admin_order_field = 'so_dai_ly'
 
 
 @admin.register(DaiLy)
 class DaiLyAdmin(admin.ModelAdmin):
     list_display = ('id', 'ten_dai_ly', 'dien_thoai', 'quan', 'loai_dai_ly', 'ngay_tiep_nhan', 'tien_no')
     list_filter = ('quan', 'loai_dai_ly', 'ngay_tiep_nhan')
+    list_select_related = ('quan', 'loai_dai_ly')
     search_fields = ('ten_dai_ly', 'dien_thoai', 'dia_chi', 'email')
     date_hierarchy = 'ngay_tiep_nhan'
 
@@ -1,6 +1,9 @@
- #backend/api/apps.py
+#backend/api/apps.py
 from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api'
\ No newline at end of file
+    name = 'api'
+
+    def ready(self):
+        from . import signals, sqlite  # noqa: F401
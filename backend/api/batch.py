@@ -0,0 +1,132 @@
+# backend/api/batch.py
+"""
+Batch (multiplexed) requests.
+
+``POST /api/batch/`` carries a list of sub-requests ``{method, path, body,
+headers}``. Each one is resolved through the URLconf and handed to the same
+view a normal request would reach, in-process and in order, so a client
+can load a whole screen in one round trip. Sub-requests see the headers of
+the batch request plus their own (e.g. If-None-Match), never its body.
+
+Modes follow bulk.py: in ``atomic`` mode the whole batch runs in one
+transaction and the first sub-request that fails (status >= 400) rolls
+everything back, the remaining ones are not run (424). In ``partial`` mode
+every sub-request stands alone, as if it had been sent separately.
+"""
+import json
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework.response import Response
+
+from .bulk import MODE_ATOMIC
+
+MAX_REQUESTS = 50
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE')
+PATH_PREFIX = '/api/'
+# Tên URL của chính /api/batch/ (không cho lồng batch)
+BATCH_ROUTE = 'batch'
+# Không chuyển các header này của request batch sang request con
+_NOT_INHERITED = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH', 'HTTP_IDEMPOTENCY_KEY')
+
+
+class BatchError(ValueError):
+    """Lô yêu cầu không hợp lệ"""
+
+
+def parse_items(data):
+    """Kiểm tra danh sách yêu cầu con, trả về [(method, path, query, body, headers)]"""
+    if not isinstance(data, list) or not data:
+        raise BatchError("Dữ liệu phải là một mảng yêu cầu khác rỗng")
+    if len(data) > MAX_REQUESTS:
+        raise BatchError(f"Mỗi lô tối đa {MAX_REQUESTS} yêu cầu")
+    items = []
+    for index, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise BatchError(f"Yêu cầu {index}: phải là một object")
+        method = str(item.get('method', 'GET')).upper()
+        if method not in METHODS:
+            raise BatchError(f"Yêu cầu {index}: method phải là một trong: {', '.join(METHODS)}")
+        url = item.get('path')
+        if not isinstance(url, str) or not url.startswith(PATH_PREFIX):
+            raise BatchError(f"Yêu cầu {index}: path phải bắt đầu bằng {PATH_PREFIX}")
+        headers = item.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise BatchError(f"Yêu cầu {index}: headers phải là một object")
+        parts = urlsplit(url)
+        items.append((method, parts.path, parts.query, item.get('body'), headers))
+    return items
+
+
+def _sub_request(request, method, path, query, body, headers):
+    environ = {key: value for key, value in request.META.items() if key not in _NOT_INHERITED}
+    payload = b'' if body is None else json.dumps(body).encode('utf-8')
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.input': BytesIO(payload),
+    })
+    if body is not None:
+        environ['CONTENT_TYPE'] = 'application/json'
+    for name, value in headers.items():
+        environ[f"HTTP_{name.upper().replace('-', '_')}"] = str(value)
+    return WSGIRequest(environ)
+
+
+def _error(status, message):
+    return {'status': status, 'headers': {}, 'body': {'error': message}}
+
+
+def dispatch(request, method, path, query, body, headers):
+    """Chạy một yêu cầu con qua URLconf, trả về {status, headers, body}"""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return _error(404, f"Không tìm thấy {path}")
+    if match.url_name == BATCH_ROUTE:
+        return _error(400, "Không thể lồng /api/batch/")
+
+    sub_request = _sub_request(request, method, path, query, body, headers)
+    sub_request.resolver_match = match
+    response = match.func(sub_request, *match.args, **match.kwargs)
+
+    if response.streaming:
+        response.close()
+        return _error(400, "Không hỗ trợ phản hồi dạng luồng (ví dụ export) trong lô")
+    result_headers = {name: value for name, value in response.items() if name != 'Content-Type'}
+    if isinstance(response, Response):
+        # Dữ liệu chưa render: được render một lần cùng cả lô
+        data = response.data
+    elif not response.content:
+        data = None
+    elif response.get('Content-Type', '').startswith('application/json'):
+        # Ví dụ phản hồi được phát lại theo Idempotency-Key (đã render sẵn)
+        data = json.loads(response.content)
+    else:
+        data = response.content.decode(response.charset or 'utf-8')
+    return {'status': response.status_code, 'headers': result_headers, 'body': data}
+
+
+def run_batch(request, items, mode):
+    """Chạy các yêu cầu con theo thứ tự, trả về {committed, responses}"""
+    if mode != MODE_ATOMIC:
+        return {'committed': True, 'responses': [dispatch(request, *item) for item in items]}
+
+    results = []
+    with transaction.atomic():
+        for index, item in enumerate(items):
+            result = dispatch(request, *item)
+            results.append(result)
+            if result['status'] >= 400:
+                transaction.set_rollback(True)
+                results.extend(
+                    _error(424, f"Không chạy do yêu cầu {index} lỗi") for _ in items[index + 1:]
+                )
+                return {'committed': False, 'responses': results}
+    return {'committed': True, 'responses': results}
@@ -0,0 +1,171 @@
+# backend/api/bulk.py
+"""
+Bulk create/update of distributors.
+
+A whole batch is validated in one pass: districts, distributor types and
+existing rows are loaded with one query each, district capacity is checked
+per district from the stored so_dai_ly counters, and rows are written with
+bulk_create / bulk_update inside a single transaction.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from . import search, stamps
+from .models import Quan, LoaiDaiLy, DaiLy
+from .pagination import parse_id
+from .regulations import quy_dinh_registry, SO_DAI_LY_TOI_DA_TRONG_QUAN
+from .serializers import BulkDaiLySerializer
+
+MODE_ATOMIC = 'atomic'
+MODE_PARTIAL = 'partial'
+MODES = (MODE_ATOMIC, MODE_PARTIAL)
+
+BATCH_SIZE = 500
+
+UPDATE_FIELDS = ['ten_dai_ly', 'dien_thoai', 'dia_chi', 'quan', 'loai_dai_ly', 'email', 'tien_no', 'phien_ban']
+
+
+def _int_or_none(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        # Ngoài khoảng số nguyên 64 bit của SQLite: coi như không tồn tại
+        return parse_id(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BulkResult:
+    """Kết quả từng phần tử của lô, theo đúng thứ tự gửi lên"""
+
+    def __init__(self, size):
+        self.items = [None] * size
+
+    def error(self, index, errors):
+        self.items[index] = {'index': index, 'status': 'error', 'errors': errors}
+
+    def ok(self, index, status, pk):
+        self.items[index] = {'index': index, 'status': status, 'id': pk}
+
+    @property
+    def has_errors(self):
+        return any(item is not None and item['status'] == 'error' for item in self.items)
+
+    def count(self, status):
+        return sum(1 for item in self.items if item is not None and item['status'] == status)
+
+    def as_dict(self, mode, committed):
+        return {
+            'mode': mode,
+            'committed': committed,
+            'created': self.count('created') if committed else 0,
+            'updated': self.count('updated') if committed else 0,
+            'errors': self.count('error'),
+            'results': self.items,
+        }
+
+
+def bulk_save_dai_lys(items, mode=MODE_ATOMIC):
+    """
+    Thêm mới (phần tử không có "id") hoặc cập nhật (có "id") nhiều đại lý.
+
+    mode=atomic: chỉ ghi khi mọi phần tử hợp lệ.
+    mode=partial: ghi các phần tử hợp lệ, báo lỗi các phần tử còn lại.
+    Trả về dict kết quả (xem BulkResult.as_dict).
+    """
+    result = BulkResult(len(items))
+
+    # 1. Nạp sẵn mọi quận, loại đại lý và đại lý cần cập nhật (một truy vấn mỗi loại)
+    update_ids = [_int_or_none(item.get('id')) for item in items if isinstance(item, dict) and 'id' in item]
+    existing = DaiLy.objects.select_related('loai_dai_ly').in_bulk([pk for pk in update_ids if pk is not None])
+    quan_ids = {_int_or_none(item.get('quan')) for item in items if isinstance(item, dict)}
+    quan_ids.update(dai_ly.quan_id for dai_ly in existing.values())
+    loai_ids = {_int_or_none(item.get('loai_dai_ly')) for item in items if isinstance(item, dict)}
+    context = {
+        'quans': Quan.objects.in_bulk([pk for pk in quan_ids if pk is not None]),
+        'loai_dai_lys': LoaiDaiLy.objects.in_bulk([pk for pk in loai_ids if pk is not None]),
+    }
+
+    # 2. Kiểm tra từng phần tử bằng serializer (không truy vấn)
+    valid = []
+    seen_ids = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            result.error(index, {'non_field_errors': ["Mỗi phần tử phải là một đối tượng JSON"]})
+            continue
+        instance = None
+        if 'id' in item:
+            pk = _int_or_none(item['id'])
+            instance = existing.get(pk)
+            if instance is None:
+                result.error(index, {'id': [f"Đại lý {item['id']} không tồn tại"]})
+                continue
+            if pk in seen_ids:
+                result.error(index, {'id': [f"Đại lý {pk} xuất hiện nhiều lần trong lô"]})
+                continue
+            seen_ids.add(pk)
+        serializer = BulkDaiLySerializer(instance, data=item, partial=instance is not None, context=context)
+        if not serializer.is_valid():
+            result.error(index, serializer.errors)
+            continue
+        valid.append((index, instance, serializer.validated_data))
+
+    # 3. Kiểm tra số đại lý tối đa theo từng quận từ bộ đếm đã lưu
+    so_toi_da = quy_dinh_registry.get(SO_DAI_LY_TOI_DA_TRONG_QUAN)
+    demand = Counter()
+    release = Counter()
+    accepted = []
+    for index, instance, data in valid:
+        quan = data.get('quan')
+        old_quan_id = instance.quan_id if instance is not None else None
+        if quan is not None and quan.pk != old_quan_id:
+            if so_toi_da is not None and quan.so_dai_ly + demand[quan.pk] >= so_toi_da:
+                result.error(index, {'quan': [f"Quận đã đạt số lượng đại lý tối đa ({so_toi_da})"]})
+                continue
+            demand[quan.pk] += 1
+            if old_quan_id is not None:
+                release[old_quan_id] += 1
+        accepted.append((index, instance, data))
+
+    if mode == MODE_ATOMIC and result.has_errors:
+        for index, instance, data in accepted:
+            result.ok(index, 'valid', instance.pk if instance is not None else None)
+        return result.as_dict(mode, committed=False)
+
+    # 4. Ghi cả lô trong một giao dịch
+    try:
+        with transaction.atomic():
+            for quan_id, count in demand.items():
+                # UPDATE có điều kiện: phát hiện trường hợp quận bị lấp đầy bởi giao dịch khác
+                Quan.objects.reserve_slot(quan_id, so_toi_da, count=count)
+            for quan_id, count in release.items():
+                Quan.objects.release_slot(quan_id, count=count)
+
+            phien_ban = DaiLy.objects.next_phien_ban()
+            created = []
+            updated = []
+            for index, instance, data in accepted:
+                if instance is None:
+                    created.append((index, DaiLy(**data, phien_ban=phien_ban)))
+                else:
+                    for field, value in data.items():
+                        setattr(instance, field, value)
+                    instance.phien_ban = phien_ban
+                    updated.append((index, instance))
+
+            DaiLy.objects.bulk_create([dai_ly for _, dai_ly in created], batch_size=BATCH_SIZE)
+            DaiLy.objects.bulk_update([dai_ly for _, dai_ly in updated], UPDATE_FIELDS, batch_size=BATCH_SIZE)
+            search.index_dai_lys([dai_ly for _, dai_ly in created + updated])
+            stamps.bump_on_commit(stamps.DAI_LY)
+    except ValueError as e:
+        # Quận bị lấp đầy đồng thời: không phần tử nào được ghi
+        for index, instance, data in accepted:
+            result.error(index, {'non_field_errors': [str(e)]})
+        return result.as_dict(mode, committed=False)
+
+    for index, dai_ly in created:
+        result.ok(index, 'created', dai_ly.pk)
+    for index, dai_ly in updated:
+        result.ok(index, 'updated', dai_ly.pk)
+    return result.as_dict(mode, committed=True)
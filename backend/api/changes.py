@@ -0,0 +1,91 @@
+# backend/api/changes.py
+"""
+Delta sync for distributors.
+
+Every write to a distributor stamps the row with the next value of a
+monotonic change sequence (``DaiLy.phien_ban``, indexed); every deletion
+leaves a tombstone (``DaiLyDaXoa``) stamped the same way. The sequence is
+allocated inside the writing transaction, so its order is the commit order
+and a reader that has seen value N has seen every change up to N.
+
+A sync token is the last sequence value the client has applied, optionally
+followed by the last id sent when a page ended in the middle of a value
+shared by many rows (one bulk write stamps all its rows with one value).
+Token "0" (or no token) means "everything".
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from .models import BoDem, DaiLyDaXoa, PHIEN_BAN_DAI_LY
+from .pagination import parse_id
+
+
+def encode_token(phien_ban, after_id=None):
+    if after_id is None:
+        return str(phien_ban)
+    return f"{phien_ban}-{after_id}"
+
+
+def decode_token(token):
+    """Tách token thành (phiên bản, id cuối đã gửi hoặc None), ValueError nếu không hợp lệ"""
+    if not token:
+        return 0, None
+    phien_ban, _, after_id = token.partition('-')
+    # parse_id: ngoài khoảng 64 bit là ValueError (400), không để OverflowError tới truy vấn
+    phien_ban = parse_id(phien_ban)
+    after_id = parse_id(after_id) if after_id else None
+    if phien_ban < 0 or (after_id is not None and after_id < 0):
+        raise ValueError(token)
+    return phien_ban, after_id
+
+
+def dai_ly_changes(queryset, token, limit):
+    """
+    Các đại lý thêm/sửa và id các đại lý bị xóa sau token, tối đa limit dòng.
+
+    Trả về dict: upserted (đại lý), deleted (id), token (token mới),
+    has_more (còn thay đổi, gọi lại ngay với token mới) và reset (token không
+    còn hợp lệ, ví dụ cơ sở dữ liệu đã được tạo lại: client phải xóa bản sao
+    cục bộ rồi áp dụng kết quả như lần đồng bộ đầu tiên).
+    """
+    phien_ban, after_id = decode_token(token)
+
+    # Đọc bộ đếm và dữ liệu trong cùng một giao dịch để có ảnh chụp nhất quán
+    with transaction.atomic():
+        current = BoDem.objects.current(PHIEN_BAN_DAI_LY)
+        reset = phien_ban > current
+        if reset:
+            phien_ban, after_id = 0, None
+
+        after = Q(phien_ban__gt=phien_ban)
+        if after_id is not None:
+            after |= Q(phien_ban=phien_ban, pk__gt=after_id)
+        upserted = list(
+            queryset.filter(after, phien_ban__lte=current).order_by('phien_ban', 'pk')[:limit + 1]
+        )
+
+        has_more = len(upserted) > limit
+        if has_more:
+            upserted = upserted[:limit]
+            last = upserted[-1]
+            upper, new_token = last.phien_ban, encode_token(last.phien_ban, last.pk)
+        else:
+            upper, new_token = current, encode_token(current)
+
+        # Lần đồng bộ đầu tiên không cần dấu xóa: client chưa có dữ liệu
+        deleted = []
+        if phien_ban > 0:
+            deleted = list(
+                DaiLyDaXoa.objects
+                .filter(phien_ban__gt=phien_ban, phien_ban__lte=upper)
+                .order_by('phien_ban')
+                .values_list('dai_ly_id', flat=True)
+            )
+
+    return {
+        'upserted': upserted,
+        'deleted': deleted,
+        'token': new_token,
+        'has_more': has_more,
+        'reset': reset,
+    }
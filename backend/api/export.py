@@ -0,0 +1,86 @@
+# backend/api/export.py
+"""
+Streaming export of distributors as CSV or NDJSON.
+
+Rows are read with a chunked ``.values()`` iterator (no model instances,
+no serializer) and written to the response as they arrive, so memory use
+and time to first byte do not depend on the size of the table.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+
+EXPORT_FIELDS = [
+    'id', 'ten_dai_ly', 'dien_thoai', 'dia_chi',
+    'quan', 'ten_quan', 'loai_dai_ly', 'ten_loai_dai_ly',
+    'ngay_tiep_nhan', 'email', 'tien_no'
+]
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """Đối tượng giả file: csv.writer ghi vào đâu thì trả lại chuỗi đó"""
+
+    def write(self, value):
+        return value
+
+
+# Cột lấy qua JOIN
+RELATED_FIELDS = {
+    'ten_quan': F('quan__ten_quan'),
+    'ten_loai_dai_ly': F('loai_dai_ly__ten_loai_dai_ly'),
+}
+
+
+def export_rows(queryset, fields=EXPORT_FIELDS):
+    """Duyệt các dòng đại lý (dict) theo lô; chỉ JOIN quận/loại đại lý khi cần tên của chúng"""
+    return queryset.order_by('id').values(
+        *[field for field in fields if field not in RELATED_FIELDS],
+        **{field: expression for field, expression in RELATED_FIELDS.items() if field in fields}
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _batched(lines):
+    """Gộp nhiều dòng thành một khối để giảm số lần ghi ra socket"""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= CHUNK_SIZE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def _csv_lines(rows, fields):
+    writer = csv.writer(_Echo())
+    # BOM để Excel nhận đúng tiếng Việt (UTF-8)
+    yield '\ufeff' + writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] if row[field] is not None else '' for field in fields])
+
+
+def _ndjson_lines(rows, fields):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode({field: row[field] for field in fields}) + '\n'
+
+
+FORMATS = {
+    'csv': (_csv_lines, 'text/csv; charset=utf-8'),
+    'ndjson': (_ndjson_lines, 'application/x-ndjson; charset=utf-8'),
+}
+
+
+def stream_export(queryset, export_format, fields=None, filename='daily'):
+    """StreamingHttpResponse xuất queryset đại lý theo định dạng csv hoặc ndjson (fields: tập cột cần xuất)"""
+    lines, content_type = FORMATS[export_format]
+    fields = [field for field in EXPORT_FIELDS if fields is None or field in fields]
+    response = StreamingHttpResponse(
+        _batched(lines(export_rows(queryset, fields), fields)), content_type=content_type
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
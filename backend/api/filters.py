@@ -0,0 +1,84 @@
+# backend/api/filters.py
+"""
+Query filters and ordering for the distributor list.
+
+    ?quan=1,2  ?loai_dai_ly=3  ?tien_no__gte=0&tien_no__lte=5000000
+    ?ngay_tiep_nhan__gte=2024-01-01&ngay_tiep_nhan__lte=2024-12-31
+    ?ordering=-tien_no
+
+Every filter and every ordering is backed by an index (migration 0005 and
+the foreign-key indexes). Invalid values answer 400 instead of being
+ignored, so a typo never silently returns the whole table.
+"""
+from datetime import date
+from decimal import InvalidOperation
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .pagination import KeysetPagination, parse_decimal, parse_id
+
+
+def _ids(value):
+    return [parse_id(part) for part in value.split(',') if part.strip()]
+
+
+# tham số -> (lookup, hàm chuyển giá trị, thông báo lỗi)
+FILTERS = {
+    'quan': ('quan__in', _ids, "Danh sách mã quận không hợp lệ"),
+    'loai_dai_ly': ('loai_dai_ly__in', _ids, "Danh sách mã loại đại lý không hợp lệ"),
+    'tien_no__gte': ('tien_no__gte', parse_decimal, "Tiền nợ phải là số"),
+    'tien_no__lte': ('tien_no__lte', parse_decimal, "Tiền nợ phải là số"),
+    'ngay_tiep_nhan__gte': ('ngay_tiep_nhan__gte', date.fromisoformat, "Ngày phải có dạng YYYY-MM-DD"),
+    'ngay_tiep_nhan__lte': ('ngay_tiep_nhan__lte', date.fromisoformat, "Ngày phải có dạng YYYY-MM-DD"),
+}
+
+# Cùng danh sách với phân trang keyset để ?ordering= có nghĩa như nhau ở cả hai chế độ
+ORDERINGS = KeysetPagination.orderings
+ORDERING_PARAM = 'ordering'
+
+
+def dai_ly_lookups(query_params):
+    """Dict lookup ORM từ các tham số lọc có mặt; ValidationError nếu giá trị không hợp lệ"""
+    lookups = {}
+    errors = {}
+    for param, (lookup, parse, message) in FILTERS.items():
+        value = query_params.get(param, '').strip()
+        if not value:
+            continue
+        try:
+            lookups[lookup] = parse(value)
+        except (ValueError, InvalidOperation):
+            errors[param] = [message]
+    if errors:
+        raise ValidationError(errors)
+    return lookups
+
+
+def dai_ly_ordering(query_params):
+    """Các cột order_by cho ?ordering=, hoặc None nếu không có tham số"""
+    ordering = query_params.get(ORDERING_PARAM, '').strip()
+    if not ordering:
+        return None
+    fields = ORDERINGS.get(ordering.lstrip('-'))
+    if fields is None:
+        raise ValidationError({ORDERING_PARAM: [f"Chỉ hỗ trợ sắp xếp theo: {', '.join(sorted(ORDERINGS))}"]})
+    if ordering.startswith('-'):
+        return [f'-{field}' for field in fields]
+    return list(fields)
+
+
+class DaiLyFilterBackend(BaseFilterBackend):
+    """Lọc đại lý theo quận, loại, khoảng tiền nợ và khoảng ngày tiếp nhận"""
+
+    def filter_queryset(self, request, queryset, view):
+        lookups = dai_ly_lookups(request.query_params)
+        return queryset.filter(**lookups) if lookups else queryset
+
+
+class DaiLyOrderingFilter(BaseFilterBackend):
+    """Sắp xếp theo ?ordering= (chỉ các cột có chỉ mục, luôn kèm id để thứ tự ổn định)"""
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = dai_ly_ordering(request.query_params)
+        return queryset.order_by(*ordering) if ordering else queryset
@@ -0,0 +1,117 @@
+# backend/api/idempotency.py
+"""
+Idempotency-Key support for writes (POST/PUT/PATCH).
+
+The first request carrying a key runs normally; its response is stored in
+YeuCauDaXuLy in the same transaction as the write, and every later request
+with the same key gets that response back (with ``Idempotent-Replayed:
+true``) without running the view again, so a client retry after a timeout
+cannot create a second distributor or use up district capacity twice.
+
+The stored row is created *before* the view runs. A concurrent duplicate
+therefore blocks on the SQLite write lock until the first request commits,
+then hits the unique key and replays its response. A key reused for a
+different request (method, path or body) is rejected with 422.
+
+Entries live ``IDEMPOTENCY['ttl_seconds']``; expired ones and the oldest
+beyond ``IDEMPOTENCY['max_entries']`` are purged every PURGE_EVERY writes.
+5xx and 429 (throttled) responses are not stored, so the client can retry
+them.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import YeuCauDaXuLy
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+METHODS = ('POST', 'PUT', 'PATCH')
+MAX_KEY_LENGTH = 255
+PURGE_EVERY = 100
+
+
+def fingerprint(request):
+    """Băm method, đường dẫn (kèm query string) và nội dung yêu cầu"""
+    digest = hashlib.sha256()
+    digest.update(f"{request.method}\n{request.get_full_path()}\n".encode('utf-8'))
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _expired_before():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY['ttl_seconds'])
+
+
+class IdempotencyError(Exception):
+    """
+    Idempotency-Key không dùng được cho yêu cầu này. View trả về
+    {"error": message} với status, qua renderer cấu hình của DRF.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _replay(record, request_fingerprint):
+    if record.dau_van_tay != request_fingerprint:
+        raise IdempotencyError(422, f"{HEADER} đã được dùng cho một yêu cầu khác")
+    response = HttpResponse(bytes(record.noi_dung), status=record.trang_thai,
+                            content_type=record.kieu_noi_dung or None)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _lookup(key):
+    record = YeuCauDaXuLy.objects.filter(khoa=key).first()
+    if record is not None and record.tao_luc < _expired_before():
+        YeuCauDaXuLy.objects.filter(pk=record.pk).delete()
+        return None
+    return record
+
+
+def handle(request, key, run):
+    """
+    Chạy yêu cầu ghi có Idempotency-Key: run() (dispatch của view) chỉ chạy
+    lần đầu, các lần sau trả lại phản hồi đã lưu. IdempotencyError nếu khóa
+    quá dài hoặc đã được dùng cho yêu cầu khác.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(400, f"{HEADER} dài tối đa {MAX_KEY_LENGTH} ký tự")
+    request_fingerprint = fingerprint(request)
+    record = _lookup(key)
+    if record is not None:
+        return _replay(record, request_fingerprint)
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                record = YeuCauDaXuLy.objects.create(
+                    khoa=key, dau_van_tay=request_fingerprint, tao_luc=timezone.now()
+                )
+        except IntegrityError:
+            # Một yêu cầu cùng khóa vừa commit trước (INSERT ở trên đã chờ nó xong)
+            record = None
+        if record is None:
+            return _replay(YeuCauDaXuLy.objects.get(khoa=key), request_fingerprint)
+
+        response = run()
+        if response.status_code >= 500 or response.status_code == 429 or response.streaming:
+            record.delete()
+            return response
+        if hasattr(response, 'render'):
+            response.render()
+        record.trang_thai = response.status_code
+        record.kieu_noi_dung = response.get('Content-Type', '')
+        record.noi_dung = response.content
+        record.save(update_fields=['trang_thai', 'kieu_noi_dung', 'noi_dung'])
+
+        if record.pk % PURGE_EVERY == 0:
+            YeuCauDaXuLy.objects.purge(_expired_before(), settings.IDEMPOTENCY['max_entries'])
+    return response
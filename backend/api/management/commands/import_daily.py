@@ -0,0 +1,272 @@
+import csv
+import os
+import re
+import time
+from collections import Counter
+from decimal import InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from api import search, stamps
+from api.models import Quan, LoaiDaiLy, DaiLy, TienDoNhap
+from api.pagination import parse_decimal
+from api.regulations import quy_dinh_registry, SO_DAI_LY_TOI_DA_TRONG_QUAN
+
+PHONE_RE = re.compile(r'^\d{10,11}$')
+REQUIRED_COLUMNS = ('ten_dai_ly', 'dien_thoai', 'dia_chi')
+
+
+class Command(BaseCommand):
+    help = (
+        "Nhập đại lý từ file CSV theo từng khối (bulk_create). "
+        "Cột: ten_dai_ly, dien_thoai, dia_chi, quan hoặc ten_quan, "
+        "loai_dai_ly hoặc ten_loai_dai_ly, email, tien_no (giống file xuất từ /api/daily/export/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help="Các file CSV cần nhập")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Số dòng mỗi khối (mặc định 5000)")
+        parser.add_argument('--encoding', default='utf-8-sig', help="Mã hóa file (mặc định utf-8-sig)")
+        parser.add_argument('--delimiter', default=',', help="Ký tự phân cách cột")
+        parser.add_argument(
+            '--restart', action='store_true',
+            help="Bỏ qua tiến độ đã lưu và nhập lại từ đầu (mặc định: tiếp tục từ khối đã commit cuối cùng)"
+        )
+
+    def handle(self, *args, **options):
+        self.chunk_size = options['chunk_size']
+        if self.chunk_size < 1:
+            raise CommandError("--chunk-size phải lớn hơn 0")
+
+        # Nạp sẵn tên/id quận và loại đại lý một lần cho toàn bộ lần nhập
+        self.quans = {quan.pk: quan for quan in Quan.objects.all()}
+        self.quan_by_name = {quan.ten_quan: quan.pk for quan in self.quans.values()}
+        self.loai_dai_lys = {loai.pk: loai for loai in LoaiDaiLy.objects.all()}
+        self.loai_by_name = {loai.ten_loai_dai_ly: loai.pk for loai in self.loai_dai_lys.values()}
+        self.so_toi_da = quy_dinh_registry.get(SO_DAI_LY_TOI_DA_TRONG_QUAN)
+
+        total_imported = total_rejected = 0
+        started = time.monotonic()
+        for path in options['files']:
+            imported, rejected = self.import_file(path, options)
+            total_imported += imported
+            total_rejected += rejected
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Hoàn tất: {total_imported} đại lý đã nhập, {total_rejected} dòng bị từ chối, "
+            f"{elapsed:.1f}s ({total_imported / elapsed if elapsed else 0:.0f} dòng/giây)"
+        ))
+
+    # Tiến độ -----------------------------------------------------------------
+
+    def load_state(self, path, restart):
+        """
+        Tiến độ đã lưu của file (TienDoNhap, chưa lưu nếu nhập lần đầu). Tiến
+        độ được ghi trong cùng giao dịch với từng khối, nên luôn khớp với dữ
+        liệu đã commit.
+        """
+        stat = os.stat(path)
+        fingerprint = {'kich_thuoc': stat.st_size, 'thoi_gian_sua': stat.st_mtime_ns}
+        state = TienDoNhap.objects.filter(duong_dan=os.path.abspath(path)).first()
+        if state is None:
+            return TienDoNhap(duong_dan=os.path.abspath(path), **fingerprint)
+        changed = any(getattr(state, key) != value for key, value in fingerprint.items())
+        if changed:
+            self.stdout.write(self.style.WARNING(f"{path}: file đã thay đổi, nhập lại từ đầu"))
+        if changed or restart:
+            # Chỉ đặt lại trong bộ nhớ: được ghi đè khi khối đầu tiên commit
+            state.kich_thuoc, state.thoi_gian_sua = fingerprint['kich_thuoc'], fingerprint['thoi_gian_sua']
+            state.so_dong = state.so_da_nhap = state.so_bi_tu_choi = 0
+        return state
+
+    # Nhập file ---------------------------------------------------------------
+
+    def import_file(self, path, options):
+        if not os.path.isfile(path):
+            raise CommandError(f"Không tìm thấy file {path}")
+        state = self.load_state(path, options['restart'])
+        imported_before, rejected_before = state.so_da_nhap, state.so_bi_tu_choi
+        if state.so_dong:
+            self.stdout.write(f"{path}: tiếp tục từ dòng {state.so_dong + 1}")
+
+        with open(path, newline='', encoding=options['encoding']) as f:
+            reader = csv.DictReader(f, delimiter=options['delimiter'])
+            self.check_columns(path, reader.fieldnames or [])
+            rows = islice(reader, state.so_dong, None)
+            rejects = RejectWriter(f"{path}.rejects.csv", reader.fieldnames, append=state.so_dong > 0)
+            try:
+                while True:
+                    chunk = list(islice(rows, self.chunk_size))
+                    if not chunk:
+                        break
+                    started = time.monotonic()
+                    first_line = state.so_dong + 2  # dòng 1 là tiêu đề
+                    try:
+                        imported, errors = self.import_chunk(chunk, first_line, state, rejects)
+                    except ValueError as e:
+                        # Quận bị lấp đầy bởi giao dịch khác: khối này đã được rollback
+                        raise CommandError(f"{path}: {e}. Chạy lại lệnh để tiếp tục từ dòng {first_line}.")
+
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f"{path}: {state.so_dong} dòng, +{imported} đại lý, {len(errors)} lỗi, "
+                        f"{len(chunk) / elapsed if elapsed else 0:.0f} dòng/giây"
+                    )
+            finally:
+                rejects.close()
+
+        if state.so_bi_tu_choi:
+            self.stdout.write(self.style.WARNING(f"{path}: các dòng lỗi được ghi vào {rejects.path}"))
+        return state.so_da_nhap - imported_before, state.so_bi_tu_choi - rejected_before
+
+    def check_columns(self, path, columns):
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if 'quan' not in columns and 'ten_quan' not in columns:
+            missing.append('quan/ten_quan')
+        if 'loai_dai_ly' not in columns and 'ten_loai_dai_ly' not in columns:
+            missing.append('loai_dai_ly/ten_loai_dai_ly')
+        if missing:
+            raise CommandError(f"{path}: thiếu cột {', '.join(missing)}")
+
+    def import_chunk(self, chunk, first_line, state, rejects):
+        """
+        Kiểm tra và ghi một khối cùng tiến độ (state) trong một giao dịch; trả
+        về (số đại lý đã nhập, danh sách (dòng, lỗi)).
+        """
+        errors = []
+        valid = []
+        for offset, row in enumerate(chunk):
+            try:
+                valid.append((offset, self.build(row)))
+            except ValueError as e:
+                errors.append((row, first_line + offset, str(e)))
+
+        # Số đại lý tối đa trong quận: đếm theo quận cho cả khối
+        if self.so_toi_da is not None:
+            demand = Counter()
+            accepted = []
+            for offset, dai_ly in valid:
+                quan = self.quans[dai_ly.quan_id]
+                if quan.so_dai_ly + demand[quan.pk] >= self.so_toi_da:
+                    errors.append((chunk[offset], first_line + offset,
+                                   f"Quận đã đạt số lượng đại lý tối đa ({self.so_toi_da})"))
+                    continue
+                demand[quan.pk] += 1
+                accepted.append((offset, dai_ly))
+            valid = accepted
+        else:
+            demand = Counter(dai_ly.quan_id for _, dai_ly in valid)
+
+        dai_lys = [dai_ly for _, dai_ly in valid]
+        errors.sort(key=lambda error: error[1])
+        with transaction.atomic():
+            for quan_id, count in demand.items():
+                Quan.objects.reserve_slot(quan_id, self.so_toi_da, count=count)
+            phien_ban = DaiLy.objects.next_phien_ban()
+            for dai_ly in dai_lys:
+                dai_ly.phien_ban = phien_ban
+            DaiLy.objects.bulk_create(dai_lys, batch_size=500)
+            search.index_dai_lys(dai_lys)
+            stamps.bump_on_commit(stamps.DAI_LY)
+            # Ghi dòng lỗi trước khi commit: nếu dừng giữa chừng thì khối được nhập
+            # lại và dòng lỗi bị ghi lặp, nhưng không bao giờ bị mất
+            rejects.write(errors)
+            state.so_dong += len(chunk)
+            state.so_da_nhap += len(dai_lys)
+            state.so_bi_tu_choi += len(errors)
+            state.save()
+        for quan_id, count in demand.items():
+            self.quans[quan_id].so_dai_ly += count
+
+        return len(dai_lys), errors
+
+    def build(self, row):
+        """Tạo DaiLy (chưa lưu) từ một dòng CSV, ValueError nếu dòng không hợp lệ"""
+        ten_dai_ly = (row.get('ten_dai_ly') or '').strip()
+        dien_thoai = (row.get('dien_thoai') or '').strip()
+        dia_chi = (row.get('dia_chi') or '').strip()
+        email = (row.get('email') or '').strip() or None
+        if not ten_dai_ly:
+            raise ValueError("Tên đại lý không được để trống.")
+        if not PHONE_RE.match(dien_thoai):
+            raise ValueError("Số điện thoại phải có 10-11 chữ số.")
+        if not dia_chi:
+            raise ValueError("Địa chỉ không được để trống.")
+        if email is not None:
+            try:
+                validate_email(email)
+            except ValidationError:
+                raise ValueError("Email không hợp lệ.")
+        # Như API: giá trị quá dài bị từ chối, không cắt bớt
+        for name, value in (('ten_dai_ly', ten_dai_ly), ('dia_chi', dia_chi), ('email', email)):
+            field = DaiLy._meta.get_field(name)
+            if value is not None and len(value) > field.max_length:
+                raise ValueError(f"{field.verbose_name} tối đa {field.max_length} ký tự.")
+
+        quan_id = self.resolve(row, 'quan', 'ten_quan', self.quans, self.quan_by_name, "Quận")
+        loai_id = self.resolve(
+            row, 'loai_dai_ly', 'ten_loai_dai_ly', self.loai_dai_lys, self.loai_by_name, "Loại đại lý"
+        )
+
+        try:
+            # parse_decimal: NaN/Infinity bị từ chối trước khi so sánh (so sánh NaN gây InvalidOperation)
+            tien_no = parse_decimal((row.get('tien_no') or '0').strip().replace(',', ''))
+        except (ValueError, InvalidOperation):
+            raise ValueError("Tiền nợ phải là số.")
+        if tien_no < 0 or tien_no != tien_no.to_integral_value():
+            raise ValueError("Tiền nợ phải là số nguyên không âm.")
+        no_toi_da = self.loai_dai_lys[loai_id].no_toi_da
+        if tien_no > no_toi_da:
+            raise ValueError(f"Tiền nợ vượt quá mức tối đa cho phép ({no_toi_da})")
+
+        return DaiLy(
+            ten_dai_ly=ten_dai_ly, dien_thoai=dien_thoai, dia_chi=dia_chi,
+            quan_id=quan_id, loai_dai_ly_id=loai_id, email=email, tien_no=tien_no
+        )
+
+    def resolve(self, row, id_column, name_column, by_id, by_name, label):
+        value = (row.get(id_column) or '').strip()
+        if value:
+            try:
+                pk = int(value)
+            except ValueError:
+                pk = None
+            if pk not in by_id:
+                raise ValueError(f"{label} {value} không tồn tại")
+            return pk
+        name = (row.get(name_column) or '').strip()
+        if name not in by_name:
+            raise ValueError(f"{label} '{name}' không tồn tại")
+        return by_name[name]
+
+
+class RejectWriter:
+    """Ghi các dòng bị từ chối (kèm số dòng và lý do) ra file CSV riêng, chỉ tạo file khi cần"""
+
+    def __init__(self, path, fieldnames, append=False):
+        self.path = path
+        self.fieldnames = ['dong', 'loi'] + list(fieldnames or [])
+        self.mode = 'a' if append and os.path.exists(path) else 'w'
+        self.file = None
+        self.writer = None
+
+    def write(self, errors):
+        if not errors:
+            return
+        if self.writer is None:
+            self.file = open(self.path, self.mode, newline='', encoding='utf-8-sig' if self.mode == 'w' else 'utf-8')
+            self.writer = csv.DictWriter(self.file, self.fieldnames, extrasaction='ignore')
+            if self.mode == 'w':
+                self.writer.writeheader()
+        for row, line, message in errors:
+            self.writer.writerow({**row, 'dong': line, 'loi': message})
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
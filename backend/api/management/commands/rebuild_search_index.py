@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import search
+from api.models import DaiLy
+
+
+class Command(BaseCommand):
+    help = "Xây lại chỉ mục tìm kiếm toàn văn (FTS5) cho đại lý"
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("Chưa có bảng chỉ mục FTS5, hãy chạy 'manage.py migrate' trước")
+        search.rebuild_index(DaiLy.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Đã lập chỉ mục {DaiLy.objects.count()} đại lý"))
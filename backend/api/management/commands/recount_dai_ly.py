@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Quan
+
+
+class Command(BaseCommand):
+    help = "Tính lại bộ đếm số đại lý (so_dai_ly) của mọi quận"
+
+    def handle(self, *args, **options):
+        updated = Quan.objects.recount()
+        self.stdout.write(self.style.SUCCESS(f"Đã tính lại số đại lý cho {updated} quận"))
@@ -0,0 +1,145 @@
+import math
+import multiprocessing
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from api import search, stamps
+from api.models import DaiLy, LoaiDaiLy, Quan
+from api.regulations import quy_dinh_registry, SO_DAI_LY_TOI_DA_TRONG_QUAN
+from api.seeding import BLOCK_SIZE, LOAI_DAI_LY, TEN_QUAN, generate_block, ten_quan
+
+INSERT_COLUMNS = (
+    'id', 'ten_dai_ly', 'dien_thoai', 'dia_chi', 'quan_id', 'loai_dai_ly_id', 'ngay_tiep_nhan', 'email', 'tien_no',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Tạo dữ liệu mẫu tiếng Việt (quận, loại đại lý, đại lý) để kiểm thử tải. "
+        "Cùng --seed và --rows luôn cho cùng dữ liệu; các khối được sinh song song "
+        "trên nhiều tiến trình và ghi theo lô."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help="Số đại lý cần tạo (mặc định 1000000)")
+        parser.add_argument(
+            '--quan', type=int,
+            help=f"Số quận mới (mặc định {len(TEN_QUAN)}, tăng thêm nếu cần để không vượt "
+                 f"{SO_DAI_LY_TOI_DA_TRONG_QUAN})"
+        )
+        parser.add_argument('--seed', type=int, default=1, help="Seed sinh dữ liệu (mặc định 1)")
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help="Số tiến trình sinh dữ liệu (mặc định: số CPU; 1 = không dùng tiến trình phụ)"
+        )
+
+    def handle(self, *args, **options):
+        rows, workers = options['rows'], options['workers']
+        if rows < 1:
+            raise CommandError("--rows phải lớn hơn 0")
+        if workers < 1:
+            raise CommandError("--workers phải lớn hơn 0")
+
+        so_toi_da = quy_dinh_registry.get(SO_DAI_LY_TOI_DA_TRONG_QUAN)
+        so_quan = options['quan']
+        if so_quan is None:
+            so_quan = max(len(TEN_QUAN), math.ceil(rows / so_toi_da) if so_toi_da else 0)
+        if so_quan < 1:
+            raise CommandError("--quan phải lớn hơn 0")
+        # Chia vòng tròn: quận nhiều nhất nhận ceil(rows / so_quan) đại lý
+        if so_toi_da is not None and math.ceil(rows / so_quan) > so_toi_da:
+            raise CommandError(
+                f"{rows} đại lý cần ít nhất {math.ceil(rows / so_toi_da)} quận "
+                f"({SO_DAI_LY_TOI_DA_TRONG_QUAN} = {so_toi_da})"
+            )
+
+        started = time.monotonic()
+        with transaction.atomic():
+            so_quan_cu = Quan.objects.count()
+            quans = Quan.objects.bulk_create([Quan(ten_quan=ten_quan(so_quan_cu + k)) for k in range(so_quan)])
+            loais = LoaiDaiLy.objects.bulk_create([
+                LoaiDaiLy(ten_loai_dai_ly=ten, no_toi_da=no_toi_da) for ten, no_toi_da, _ in LOAI_DAI_LY
+            ])
+            stamps.bump_on_commit(stamps.QUAN)
+            stamps.bump_on_commit(stamps.LOAI_DAI_LY)
+        quan_ids = [quan.pk for quan in quans]
+        loai_rows = [(loai.pk, int(loai.no_toi_da), weight) for loai, (_, _, weight) in zip(loais, LOAI_DAI_LY)]
+        self.stdout.write(f"Đã tạo {len(quans)} quận và {len(loais)} loại đại lý")
+
+        first_id = self.reserve_ids(rows)
+        tasks = [
+            (options['seed'], block, min(BLOCK_SIZE, rows - block * BLOCK_SIZE), first_id, quan_ids, loai_rows)
+            for block in range(math.ceil(rows / BLOCK_SIZE))
+        ]
+
+        if workers == 1:
+            blocks = map(generate_block, tasks)
+            self.write_blocks(blocks, so_toi_da, rows, started)
+        else:
+            with multiprocessing.get_context().Pool(workers) as pool:
+                # imap giữ thứ tự khối: id và phien_ban tăng dần như khi ghi tuần tự
+                blocks = pool.imap(generate_block, tasks)
+                self.write_blocks(blocks, so_toi_da, rows, started)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Hoàn tất: {rows} đại lý (id {first_id}..{first_id + rows - 1}), seed {options['seed']}, "
+            f"{elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} dòng/giây)"
+        ))
+
+    def reserve_ids(self, count):
+        """
+        Giữ chỗ count id liên tiếp cho đại lý mới, trả về id đầu tiên.
+
+        Bảng dùng AUTOINCREMENT: id của đại lý đã xóa (có thể còn bia mộ
+        DaiLyDaXoa cho đồng bộ delta) không bao giờ được cấp lại, nên phải bắt
+        đầu sau sqlite_sequence chứ không phải sau Max(pk). Nâng luôn
+        sqlite_sequence lên cuối dải để các lượt thêm khác trong lúc ghi nhận id
+        sau dải này.
+        """
+        table = DaiLy._meta.db_table
+        with transaction.atomic():
+            last = DaiLy.objects.aggregate(last=Max('pk'))['last'] or 0
+            if connection.vendor != 'sqlite':
+                return last + 1
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [table])
+                row = cursor.fetchone()
+                if row is not None:
+                    last = max(last, row[0])
+                    cursor.execute("UPDATE sqlite_sequence SET seq = %s WHERE name = %s", [last + count, table])
+                else:
+                    cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [table, last + count])
+        return last + 1
+
+    def write_blocks(self, blocks, so_toi_da, rows, started):
+        """
+        Ghi từng khối trong một giao dịch. Khối đã có id và dữ liệu hợp lệ nên
+        được chèn bằng executemany trên đúng các cột bulk_create sẽ ghi: dựng
+        hàng triệu đối tượng model chỉ để bulk_create chậm hơn khoảng 6 lần.
+        """
+        table = DaiLy._meta.db_table
+        columns = ', '.join(INSERT_COLUMNS)
+        placeholders = ', '.join(['%s'] * len(INSERT_COLUMNS))
+        done = 0
+        for dai_lys, fts_rows, demand in blocks:
+            with transaction.atomic():
+                for quan_id, count in demand.items():
+                    Quan.objects.reserve_slot(quan_id, so_toi_da, count=count)
+                # Một phiên bản cho cả khối, như bulk/import_daily (phien_ban là số nguyên do bộ đếm cấp)
+                phien_ban = int(DaiLy.objects.next_phien_ban())
+                with connection.cursor() as cursor:
+                    cursor.executemany(
+                        f"INSERT INTO {table} ({columns}, phien_ban) VALUES ({placeholders}, {phien_ban})",
+                        dai_lys
+                    )
+                search.index_rows(fts_rows)
+                stamps.bump_on_commit(stamps.DAI_LY)
+            done += len(dai_lys)
+            if done % (10 * BLOCK_SIZE) == 0 or done == rows:
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{done}/{rows} đại lý, {done / elapsed if elapsed else 0:.0f} dòng/giây")
@@ -0,0 +1,109 @@
+import json
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.querylog import N_PLUS_ONE, SLOW, log_paths, normalize_sql
+
+SORT_KEYS = {
+    'total': lambda group: group['total_ms'],
+    'max': lambda group: group['max_ms'],
+    'count': lambda group: group['count'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Tổng hợp nhật ký truy vấn chậm và N+1 (var/logs/slow_queries.log và các bản xoay vòng): "
+        "các câu SQL tốn thời gian nhất, view gọi chúng và kế hoạch thực thi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help="Số câu SQL hiển thị (mặc định 10)")
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total',
+                            help="Xếp theo tổng thời gian (mặc định), thời gian lớn nhất hoặc số lần")
+        parser.add_argument('--type', choices=[SLOW, N_PLUS_ONE, 'all'], default='all', dest='kind',
+                            help="Chỉ xem truy vấn chậm hoặc chỉ xem N+1")
+        parser.add_argument('--since', help="Chỉ tính các bản ghi từ thời điểm này (ISO 8601, ví dụ 2024-05-01)")
+
+    def handle(self, *args, **options):
+        if options['top'] <= 0:
+            raise CommandError("--top phải lớn hơn 0")
+        since = None
+        if options['since']:
+            try:
+                since = datetime.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since phải có dạng ISO 8601, ví dụ 2024-05-01")
+
+        groups = {}
+        for record in self.read_records():
+            if options['kind'] != 'all' and record.get('type') != options['kind']:
+                continue
+            if since is not None and not self.is_after(record, since):
+                continue
+            key = (record['type'], normalize_sql(record['sql']))
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    'type': record['type'], 'sql': key[1], 'count': 0, 'total_ms': 0.0,
+                    'max_ms': 0.0, 'repeats': 0, 'views': {}, 'plan': None, 'stack': None,
+                }
+            duration = record.get('duration_ms') or 0.0
+            group['count'] += 1
+            group['total_ms'] += duration
+            group['repeats'] = max(group['repeats'], record.get('count') or 0)
+            view = record.get('view') or '?'
+            group['views'][view] = group['views'].get(view, 0) + 1
+            if duration >= group['max_ms']:
+                group['max_ms'] = duration
+                group['plan'] = record.get('plan') or group['plan']
+                group['stack'] = record.get('stack') or group['stack']
+
+        if not groups:
+            self.stdout.write("Không có bản ghi nào trong nhật ký truy vấn chậm")
+            return
+
+        worst = sorted(groups.values(), key=SORT_KEYS[options['sort']], reverse=True)[:options['top']]
+        for rank, group in enumerate(worst, 1):
+            self.write_group(rank, group)
+
+    def read_records(self):
+        # Bản xoay vòng cũ nhất trước để thứ tự theo thời gian
+        for path in reversed(log_paths()):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        self.stderr.write(f"{path}:{line_no}: bỏ qua dòng không hợp lệ")
+
+    @staticmethod
+    def is_after(record, since):
+        logged = datetime.fromisoformat(record['time'])
+        if since.tzinfo is None:
+            logged = logged.astimezone().replace(tzinfo=None)
+        return logged >= since
+
+    def write_group(self, rank, group):
+        if group['type'] == N_PLUS_ONE:
+            title = (f"#{rank} N+1: {group['count']} request, tối đa {group['repeats']} lần/request, "
+                     f"tổng {group['total_ms']:.1f} ms")
+        else:
+            title = (f"#{rank} Chậm: {group['count']} lần, tổng {group['total_ms']:.1f} ms, "
+                     f"lâu nhất {group['max_ms']:.1f} ms")
+        self.stdout.write(self.style.WARNING(title))
+        self.stdout.write(f"  {group['sql']}")
+        views = sorted(group['views'].items(), key=lambda item: item[1], reverse=True)
+        self.stdout.write("  View: " + ", ".join(f"{view} ({count})" for view, count in views))
+        for step in group['plan'] or []:
+            line = f"  Kế hoạch: {step}"
+            # SCAN không dùng chỉ mục (trừ bảng ảo FTS) = duyệt toàn bảng
+            full_scan = step.startswith('SCAN') and 'USING' not in step and 'VIRTUAL TABLE' not in step
+            self.stdout.write(self.style.ERROR(line) if full_scan else line)
+        for frame in group['stack'] or []:
+            self.stdout.write(f"    {frame}")
+        self.stdout.write("")
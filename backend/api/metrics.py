@@ -0,0 +1,229 @@
+# backend/api/metrics.py
+"""
+Per-request timings and per-route histograms.
+
+``RequestMetricsMiddleware`` measures every request: wall time, number of
+SQL queries and time spent in them (through ``connection.execute_wrapper``),
+time spent turning model instances into dicts (``DynamicFieldsMixin``
+reports it through ``serializer_timer``) and response size. The numbers
+are sent back in a ``Server-Timing`` header and added to in-memory
+histograms keyed by route (URL name) and method, which ``metrics_view``
+exposes in the Prometheus text format at /api/_metrics.
+
+Histograms live in the memory of each worker process: every process reports
+its own requests since it started. Queries run while serializing are counted
+both in ``db`` and in ``ser``. The body of streaming responses (exports) is
+produced after the middleware returns, so for those only the work done
+before the first byte is measured and the size is not recorded.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+UNMATCHED_ROUTE = 'unmatched'
+# Tên URL của /api/_metrics (không tự đo chính nó)
+METRICS_ROUTE = 'metrics'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Số đo của request đang xử lý (mỗi thread/coroutine một bản)
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """Histogram tích lũy kiểu Prometheus: đếm theo bucket, tổng và số lần"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # phần tử cuối: +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Các histogram theo (tên số đo, route, method) và bộ đếm theo mã trạng thái"""
+
+    metrics = {
+        'duration': ('qldl_request_duration_seconds', "Thời gian xử lý request", DURATION_BUCKETS),
+        'db_queries': ('qldl_request_db_queries', "Số truy vấn SQL mỗi request", QUERY_BUCKETS),
+        'db_duration': ('qldl_request_db_duration_seconds', "Thời gian chạy SQL mỗi request", DURATION_BUCKETS),
+        'serializer_duration': (
+            'qldl_request_serializer_duration_seconds', "Thời gian serialize mỗi request", DURATION_BUCKETS
+        ),
+        'response_size': ('qldl_response_size_bytes', "Kích thước nội dung trả về", SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {key: {} for key in self.metrics}
+        self._requests = {}
+
+    def observe(self, route, method, status, values):
+        labels = (route, method)
+        with self._lock:
+            for key, value in values.items():
+                histograms = self._histograms[key]
+                histogram = histograms.get(labels)
+                if histogram is None:
+                    histogram = histograms[labels] = Histogram(self.metrics[key][2])
+                histogram.observe(value)
+            counter = (route, method, str(status))
+            self._requests[counter] = self._requests.get(counter, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            for histograms in self._histograms.values():
+                histograms.clear()
+            self._requests.clear()
+
+    def render(self):
+        """Nội dung định dạng văn bản Prometheus (exposition format 0.0.4)"""
+        lines = [
+            "# HELP qldl_requests_total Số request đã xử lý",
+            "# TYPE qldl_requests_total counter",
+        ]
+        with self._lock:
+            for (route, method, status), value in sorted(self._requests.items()):
+                lines.append(
+                    f'qldl_requests_total{{{_labels(route=route, method=method, status=status)}}} {value}'
+                )
+            for key, (name, help_text, buckets) in self.metrics.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (route, method), histogram in sorted(self._histograms[key].items()):
+                    labels = _labels(route=route, method=method)
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{{labels}}} {_number(histogram.sum)}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    def escape(value):
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    """Số đo của một request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_duration = 0.0
+        self.serializer_duration = 0.0
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: bao quanh mọi truy vấn trên các kết nối của request
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_duration += time.perf_counter() - started
+            self.db_queries += 1
+
+
+@contextmanager
+def serializer_timer():
+    """Cộng thời gian serialize vào request hiện tại (chỉ tính lớp ngoài cùng khi lồng nhau)"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics._serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._serializer_depth -= 1
+        if not metrics._serializer_depth:
+            metrics.serializer_duration += time.perf_counter() - started
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return match.view_name or match.route or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """
+    Đo mỗi request, gửi kết quả trong header Server-Timing và ghi vào
+    histogram theo route. Đặt gần đầu MIDDLEWARE để đo cả các middleware
+    khác.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - metrics.started
+
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = server_timing(metrics, duration, size)
+
+        route = _route(request)
+        if route != METRICS_ROUTE:
+            values = {
+                'duration': duration,
+                'db_queries': metrics.db_queries,
+                'db_duration': metrics.db_duration,
+                'serializer_duration': metrics.serializer_duration,
+            }
+            if size is not None:
+                values['response_size'] = size
+            registry.observe(route, request.method, response.status_code, values)
+        return response
+
+
+def server_timing(metrics, duration, size):
+    """Giá trị header Server-Timing (thời gian tính bằng mili giây)"""
+    entries = [
+        f'total;dur={duration * 1000:.2f}',
+        f'db;dur={metrics.db_duration * 1000:.2f};desc="{metrics.db_queries} queries"',
+        f'ser;dur={metrics.serializer_duration * 1000:.2f}',
+    ]
+    if size is not None:
+        entries.append(f'size;desc="{size} bytes"')
+    return ', '.join(entries)
+
+
+def metrics_view(request):
+    """Các histogram của tiến trình này theo định dạng văn bản Prometheus"""
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
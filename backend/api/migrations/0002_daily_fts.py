@@ -0,0 +1,66 @@
+import unicodedata
+
+from django.db import migrations, OperationalError
+
+# Chép lại từ api/search.py tại thời điểm tạo migration: migration không được
+# phụ thuộc vào mã hiện tại (có thể đổi cột, tên bảng hoặc cách bỏ dấu sau này)
+FTS_TABLE = 'api_daily_fts'
+FTS_COLUMNS = ('ten_dai_ly', 'dien_thoai', 'dia_chi', 'email')
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS api_daily_fts USING fts5("
+    "ten_dai_ly, dien_thoai, dia_chi, email, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')"
+)
+DROP_TABLE_SQL = "DROP TABLE IF EXISTS api_daily_fts"
+INSERT_SQL = (
+    "INSERT OR REPLACE INTO api_daily_fts (rowid, ten_dai_ly, dien_thoai, dia_chi, email) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+BATCH_SIZE = 5000
+
+
+def fold(text):
+    if not text:
+        return ''
+    text = text.replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE_TABLE_SQL)
+    except OperationalError:
+        # SQLite được biên dịch không có FTS5: tìm kiếm sẽ dùng icontains
+        return
+    DaiLy = apps.get_model('api', 'DaiLy')
+    rows = DaiLy.objects.using(schema_editor.connection.alias).values_list('pk', *FTS_COLUMNS)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        batch = []
+        for pk, *values in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append((pk, *(fold(value) for value in values)))
+            if len(batch) >= BATCH_SIZE:
+                cursor.executemany(INSERT_SQL, batch)
+                batch = []
+        if batch:
+            cursor.executemany(INSERT_SQL, batch)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
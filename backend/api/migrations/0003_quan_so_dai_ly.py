@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def recount_so_dai_ly(apps, schema_editor):
+    Quan = apps.get_model('api', 'Quan')
+    DaiLy = apps.get_model('api', 'DaiLy')
+    counts = DaiLy.objects.filter(quan=OuterRef('pk')).values('quan').annotate(n=Count('pk')).values('n')
+    Quan.objects.update(so_dai_ly=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_daily_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quan',
+            name='so_dai_ly',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Số Đại Lý'),
+        ),
+        migrations.RunPython(recount_so_dai_ly, migrations.RunPython.noop),
+    ]
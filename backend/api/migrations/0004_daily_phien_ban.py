@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+def init_phien_ban(apps, schema_editor):
+    # Các đại lý có sẵn cùng mang phiên bản 1: client đồng bộ từ 0 sẽ nhận hết
+    BoDem = apps.get_model('api', 'BoDem')
+    DaiLy = apps.get_model('api', 'DaiLy')
+    gia_tri = 1 if DaiLy.objects.update(phien_ban=1) else 0
+    BoDem.objects.update_or_create(ten='daily', defaults={'gia_tri': gia_tri})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_quan_so_dai_ly'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoDem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ten', models.CharField(max_length=50, unique=True, verbose_name='Tên Bộ Đếm')),
+                ('gia_tri', models.BigIntegerField(default=0, verbose_name='Giá Trị')),
+            ],
+            options={
+                'verbose_name': 'Bộ Đếm',
+                'verbose_name_plural': 'Bộ Đếm',
+            },
+        ),
+        migrations.CreateModel(
+            name='DaiLyDaXoa',
+            fields=[
+                ('dai_ly_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Mã Đại Lý')),
+                ('phien_ban', models.BigIntegerField(db_index=True, verbose_name='Phiên Bản')),
+            ],
+            options={
+                'verbose_name': 'Đại Lý Đã Xóa',
+                'verbose_name_plural': 'Đại Lý Đã Xóa',
+            },
+        ),
+        migrations.AddField(
+            model_name='daily',
+            name='phien_ban',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, verbose_name='Phiên Bản'),
+        ),
+        migrations.RunPython(init_phien_ban, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_daily_phien_ban'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='daily',
+            index=models.Index(fields=['loai_dai_ly', 'tien_no'], name='api_daily_loai_tien_no_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='daily',
+            index=models.Index(fields=['ngay_tiep_nhan'], name='api_daily_ngay_tiep_nhan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='daily',
+            index=models.Index(fields=['tien_no', 'id'], name='api_daily_tien_no_id_idx'),
+        ),
+    ]
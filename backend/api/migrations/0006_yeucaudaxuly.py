@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_daily_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YeuCauDaXuLy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('khoa', models.CharField(max_length=255, unique=True, verbose_name='Khóa Idempotency')),
+                ('dau_van_tay', models.CharField(max_length=64, verbose_name='Dấu Vân Tay Yêu Cầu')),
+                ('trang_thai', models.PositiveSmallIntegerField(null=True, verbose_name='Mã Trạng Thái')),
+                ('kieu_noi_dung', models.CharField(blank=True, default='', max_length=100, verbose_name='Kiểu Nội Dung')),
+                ('noi_dung', models.BinaryField(default=b'', verbose_name='Nội Dung')),
+                ('tao_luc', models.DateTimeField(db_index=True, verbose_name='Thời Điểm Tạo')),
+            ],
+            options={
+                'verbose_name': 'Yêu Cầu Đã Xử Lý',
+                'verbose_name_plural': 'Yêu Cầu Đã Xử Lý',
+            },
+        ),
+    ]
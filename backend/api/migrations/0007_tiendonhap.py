@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_yeucaudaxuly'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TienDoNhap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duong_dan', models.CharField(max_length=1000, unique=True, verbose_name='Đường Dẫn File')),
+                ('kich_thuoc', models.BigIntegerField(verbose_name='Kích Thước')),
+                ('thoi_gian_sua', models.BigIntegerField(verbose_name='Thời Điểm Sửa (ns)')),
+                ('so_dong', models.BigIntegerField(default=0, verbose_name='Số Dòng Đã Xử Lý')),
+                ('so_da_nhap', models.BigIntegerField(default=0, verbose_name='Số Đại Lý Đã Nhập')),
+                ('so_bi_tu_choi', models.BigIntegerField(default=0, verbose_name='Số Dòng Bị Từ Chối')),
+            ],
+            options={
+                'verbose_name': 'Tiến Độ Nhập',
+                'verbose_name_plural': 'Tiến Độ Nhập',
+            },
+        ),
+    ]
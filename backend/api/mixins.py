@@ -0,0 +1,79 @@
+# backend/api/mixins.py
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import idempotency, stamps
+
+
+class NotModified(Exception):
+    """Dữ liệu không đổi so với ETag client đang giữ"""
+
+
+class ConditionalGetMixin:
+    """
+    ETag mạnh và 304 Not Modified cho mọi yêu cầu GET/HEAD của viewset.
+
+    ETag được tính từ các stamp phiên bản trong etag_stamps (tăng mỗi khi
+    model tương ứng thay đổi), đường dẫn, query string và định dạng trả về.
+    Nó được tính TRƯỚC khi đọc dữ liệu, nên nếu If-None-Match khớp thì không
+    có truy vấn nào được thực hiện.
+    """
+    etag_stamps = ()
+
+    def get_etag(self, request):
+        parts = [request.get_full_path(), request.accepted_media_type or '']
+        parts.extend(f"{name}={stamps.read(name)}" for name in self.etag_stamps)
+        return '"%s"' % hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method in ('GET', 'HEAD'):
+            self.etag = self.get_etag(request)
+            if_none_match = request.headers.get('If-None-Match')
+            if if_none_match:
+                etags = parse_etags(if_none_match)
+                if '*' in etags or self.etag in etags:
+                    raise NotModified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code in (200, 304):
+            response['ETag'] = self.etag
+        return response
+
+
+class IdempotencyMixin:
+    """
+    Idempotency-Key cho POST/PUT/PATCH của viewset (kể cả các action ghi):
+    yêu cầu lặp lại cùng khóa nhận lại phản hồi lần đầu, view không chạy lại
+    (xem api/idempotency.py).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.headers.get(idempotency.HEADER)
+        if not key or request.method not in idempotency.METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        run = super().dispatch
+        try:
+            return idempotency.handle(request, key, lambda: run(request, *args, **kwargs))
+        except idempotency.IdempotencyError as e:
+            return self.idempotency_error(request, e, *args, **kwargs)
+
+    def idempotency_error(self, request, error, *args, **kwargs):
+        """Phản hồi lỗi qua renderer của DRF (chọn theo Accept) như mọi lỗi khác của API"""
+        self.args, self.kwargs = args, kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        response = Response({'error': error.message}, status=error.status)
+        return self.finalize_response(request, response, *args, **kwargs)
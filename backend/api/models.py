@@ -1,12 +1,137 @@
 # backend/api/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.core.validators import RegexValidator, MinValueValidator
 from decimal import Decimal
 
+from . import stamps
+from .regulations import quy_dinh_registry, SO_DAI_LY_TOI_DA_TRONG_QUAN
+
+# Tên bộ đếm phiên bản dùng cho đồng bộ delta đại lý
+PHIEN_BAN_DAI_LY = 'daily'
+
+
+class SoDaiLyQuerySet(models.QuerySet):
+    """QuerySet for entities that own distributors without a stored counter (LoaiDaiLy)"""
+
+    def with_so_dai_ly(self):
+        """Đếm số đại lý bằng một truy vấn GROUP BY thay vì đếm từng dòng"""
+        return self.annotate(so_dai_ly=Count('dai_lys'))
+
+
+class DaiLyQuerySet(models.QuerySet):
+    """QuerySet for distributors"""
+
+    def with_related(self):
+        """Nạp sẵn quận và loại đại lý bằng JOIN để tránh truy vấn từng dòng"""
+        return self.select_related('quan', 'loai_dai_ly')
+
+    def next_phien_ban(self):
+        """Cấp số phiên bản tiếp theo cho các thay đổi của giao dịch hiện tại"""
+        return BoDem.objects.next_value(PHIEN_BAN_DAI_LY)
+
+    def touch(self):
+        """Đánh dấu các đại lý là đã thay đổi (để đồng bộ delta gửi lại) mà không sửa dữ liệu"""
+        with transaction.atomic():
+            return self.update(phien_ban=self.next_phien_ban())
+
+    def adjust_debt(self, pk, delta):
+        """
+        Cộng delta (có dấu) vào tiền nợ của đại lý và trả về số dư mới.
+
+        Điều kiện 0 <= tien_no + delta <= loai_dai_ly.no_toi_da được kiểm tra
+        ngay trong câu UPDATE, nên không có khoảng hở giữa đọc và ghi.
+        """
+        with transaction.atomic():
+            updated = self.filter(
+                pk=pk,
+                tien_no__gte=-delta,
+                tien_no__lte=F('loai_dai_ly__no_toi_da') - delta
+            ).update(tien_no=F('tien_no') + delta, phien_ban=self.next_phien_ban())
+            if updated:
+                stamps.bump_on_commit(stamps.DAI_LY)
+                return self.filter(pk=pk).values_list('tien_no', flat=True).get()
+
+            # Không cập nhật được: đọc lại để báo lỗi cụ thể
+            row = self.filter(pk=pk).values('tien_no', 'loai_dai_ly__no_toi_da').first()
+            if row is None:
+                raise self.model.DoesNotExist("Đại lý không tồn tại")
+            if row['tien_no'] + delta < 0:
+                raise ValueError("Tiền nợ sau khi điều chỉnh không được âm")
+            raise ValueError(f"Tiền nợ vượt quá mức tối đa cho phép ({row['loai_dai_ly__no_toi_da']})")
+
+
+class QuanQuerySet(models.QuerySet):
+    """QuerySet for districts, maintains the denormalized so_dai_ly counter"""
+
+    def reserve_slot(self, quan_id, so_toi_da=None, count=1):
+        """
+        Tăng bộ đếm đại lý của quận thêm count bằng một câu UPDATE có điều kiện.
+
+        Kiểm tra và tăng nằm trong cùng một câu lệnh nên hai giao dịch đồng
+        thời không thể cùng vượt qua giới hạn so_toi_da.
+        """
+        quans = self.filter(pk=quan_id)
+        if so_toi_da is not None:
+            quans = quans.filter(so_dai_ly__lte=so_toi_da - count)
+        if not quans.update(so_dai_ly=F('so_dai_ly') + count):
+            raise ValueError(f"Quận đã đạt số lượng đại lý tối đa ({so_toi_da})")
+
+    def release_slot(self, quan_id, count=1):
+        """Giảm bộ đếm đại lý của quận đi count"""
+        self.filter(pk=quan_id, so_dai_ly__gte=count).update(so_dai_ly=F('so_dai_ly') - count)
+
+    def recount(self):
+        """Tính lại bộ đếm của mọi quận bằng một câu UPDATE với truy vấn con GROUP BY"""
+        counts = DaiLy.objects.filter(quan=OuterRef('pk')).values('quan').annotate(n=Count('pk')).values('n')
+        updated = self.update(so_dai_ly=Coalesce(Subquery(counts), Value(0)))
+        stamps.bump_on_commit(stamps.QUAN)
+        return updated
+
+
+class BoDemQuerySet(models.QuerySet):
+    """QuerySet for named monotonic counters"""
+
+    def next_value(self, ten):
+        """
+        Tăng bộ đếm và trả về giá trị mới, trong giao dịch hiện tại.
+
+        Câu UPDATE giữ khóa ghi trên dòng bộ đếm đến khi commit, nên thứ tự
+        các giá trị được cấp trùng với thứ tự commit của các giao dịch.
+        """
+        with transaction.atomic():
+            if not self.filter(ten=ten).update(gia_tri=F('gia_tri') + 1):
+                self.get_or_create(ten=ten)
+                self.filter(ten=ten).update(gia_tri=F('gia_tri') + 1)
+            return self.filter(ten=ten).values_list('gia_tri', flat=True).get()
+
+    def current(self, ten):
+        """Giá trị đã commit gần nhất của bộ đếm (0 nếu chưa có)"""
+        return self.filter(ten=ten).values_list('gia_tri', flat=True).first() or 0
+
+
+class BoDem(models.Model):
+    """Named monotonic counter (change sequence for delta sync)"""
+    ten = models.CharField(max_length=50, unique=True, verbose_name="Tên Bộ Đếm")
+    gia_tri = models.BigIntegerField(default=0, verbose_name="Giá Trị")
+
+    objects = BoDemQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Bộ Đếm"
+        verbose_name_plural = "Bộ Đếm"
+
+    def __str__(self):
+        return f"{self.ten}={self.gia_tri}"
+
 
 class Quan(models.Model):
     """District entity"""
     ten_quan = models.CharField(max_length=50, verbose_name="Tên Quận")
+    so_dai_ly = models.PositiveIntegerField(default=0, editable=False, verbose_name="Số Đại Lý")
+
+    objects = QuanQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Quận"
@@ -15,6 +140,28 @@ class Quan(models.Model):
     def __str__(self):
         return self.ten_quan
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Tên quận được trả kèm mỗi đại lý: ghi nhớ để nhận biết khi đổi tên
+        if 'ten_quan' in field_names:
+            instance._saved_ten_quan = instance.ten_quan
+        return instance
+
+    def save(self, *args, **kwargs):
+        # so_dai_ly chỉ được ghi bởi các câu UPDATE có điều kiện (reserve_slot/release_slot/recount):
+        # ghi lại giá trị đã đọc khi đổi tên sẽ xóa mất thay đổi của giao dịch khác
+        updating = not self._state.adding and kwargs.get('update_fields') is None
+        if updating:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname != 'so_dai_ly' and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+        if updating and 'so_dai_ly' not in self.get_deferred_fields():
+            self.refresh_from_db(fields=['so_dai_ly'])
+
 
 class LoaiDaiLy(models.Model):
     """Distributor Type entity"""
@@ -26,6 +173,8 @@ class LoaiDaiLy(models.Model):
         validators=[MinValueValidator(Decimal('0'))]
     )
 
+    objects = SoDaiLyQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Loại Đại Lý"
         verbose_name_plural = "Loại Đại Lý"
@@ -33,6 +182,13 @@ class LoaiDaiLy(models.Model):
     def __str__(self):
         return self.ten_loai_dai_ly
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'ten_loai_dai_ly' in field_names:
+            instance._saved_ten_loai_dai_ly = instance.ten_loai_dai_ly
+        return instance
+
 
 class DaiLy(models.Model):
     """Distributor entity"""
@@ -69,29 +225,73 @@ class DaiLy(models.Model):
         verbose_name="Tiền Nợ",
         validators=[MinValueValidator(Decimal('0'))]
     )
+    # Số thứ tự thay đổi gần nhất, dùng cho /api/daily/changes/
+    phien_ban = models.BigIntegerField(default=0, editable=False, db_index=True, verbose_name="Phiên Bản")
+
+    objects = DaiLyQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Đại Lý"
         verbose_name_plural = "Đại Lý"
+        indexes = [
+            # Kiểm tra nợ khi giảm no_toi_da: loai_dai_ly = ? AND tien_no > ?
+            models.Index(fields=['loai_dai_ly', 'tien_no'], name='api_daily_loai_tien_no_idx'),
+            # Lọc/phân cấp theo ngày trong trang quản trị
+            models.Index(fields=['ngay_tiep_nhan'], name='api_daily_ngay_tiep_nhan_idx'),
+            # Sắp xếp theo tiền nợ (đại lý nợ nhiều nhất, phân trang keyset ordering=tien_no)
+            models.Index(fields=['tien_no', 'id'], name='api_daily_tien_no_id_idx'),
+        ]
 
     def __str__(self):
         return self.ten_dai_ly
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Ghi nhớ quận đã lưu để nhận biết khi đại lý được chuyển quận
+        if 'quan_id' in field_names:
+            instance._saved_quan_id = instance.quan_id
+        return instance
+
+    def _get_saved_quan_id(self):
+        if self._state.adding:
+            return None
+        if not hasattr(self, '_saved_quan_id'):
+            self._saved_quan_id = DaiLy.objects.filter(pk=self.pk).values_list('quan_id', flat=True).first()
+        return self._saved_quan_id
+
     def save(self, *args, **kwargs):
         # Kiểm tra ràng buộc khi lưu đại lý
         if self.tien_no > self.loai_dai_ly.no_toi_da:
             raise ValueError(f"Tiền nợ vượt quá mức tối đa cho phép ({self.loai_dai_ly.no_toi_da})")
 
-        # Kiểm tra số lượng đại lý trong quận
-        if not self.pk:  # Chỉ kiểm tra khi tạo mới
-            quy_dinh = QuyDinh.objects.filter(ten_quy_dinh="SoDaiLyToiDaTrongQuan").first()
-            if quy_dinh:
-                so_toi_da = int(quy_dinh.gia_tri)
-                so_daily_hien_tai = DaiLy.objects.filter(quan=self.quan).count()
-                if so_daily_hien_tai >= so_toi_da:
-                    raise ValueError(f"Quận đã đạt số lượng đại lý tối đa ({so_toi_da})")
+        with transaction.atomic():
+            # Kiểm tra số lượng đại lý trong quận khi tạo mới hoặc chuyển quận
+            saved_quan_id = self._get_saved_quan_id()
+            if saved_quan_id != self.quan_id:
+                so_toi_da = quy_dinh_registry.get(SO_DAI_LY_TOI_DA_TRONG_QUAN)
+                Quan.objects.reserve_slot(self.quan_id, so_toi_da)
+                if saved_quan_id is not None:
+                    Quan.objects.release_slot(saved_quan_id)
 
-        super().save(*args, **kwargs)
+            self.phien_ban = DaiLy.objects.next_phien_ban()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'phien_ban'}
+            super().save(*args, **kwargs)
+        self._saved_quan_id = self.quan_id
+
+
+class DaiLyDaXoa(models.Model):
+    """Tombstone of a deleted distributor, kept for delta sync"""
+    dai_ly_id = models.BigIntegerField(primary_key=True, verbose_name="Mã Đại Lý")
+    phien_ban = models.BigIntegerField(db_index=True, verbose_name="Phiên Bản")
+
+    class Meta:
+        verbose_name = "Đại Lý Đã Xóa"
+        verbose_name_plural = "Đại Lý Đã Xóa"
+
+    def __str__(self):
+        return str(self.dai_ly_id)
 
 
 class QuyDinh(models.Model):
@@ -105,4 +305,51 @@ class QuyDinh(models.Model):
         verbose_name_plural = "Quy Định"
 
     def __str__(self):
-        return self.ten_quy_dinh
\ No newline at end of file
+        return self.ten_quy_dinh
+
+
+class YeuCauDaXuLyQuerySet(models.QuerySet):
+    """QuerySet for stored responses of idempotent writes"""
+
+    def purge(self, expired_before, max_entries):
+        """Xóa các phản hồi hết hạn, rồi các phản hồi cũ nhất nếu vượt quá max_entries"""
+        self.filter(tao_luc__lt=expired_before).delete()
+        last = self.aggregate(last=models.Max('pk'))['last']
+        if last is not None:
+            self.filter(pk__lte=last - max_entries).delete()
+
+
+class YeuCauDaXuLy(models.Model):
+    """First response to a write sent with an Idempotency-Key, replayed for retries"""
+    khoa = models.CharField(max_length=255, unique=True, verbose_name="Khóa Idempotency")
+    dau_van_tay = models.CharField(max_length=64, verbose_name="Dấu Vân Tay Yêu Cầu")
+    trang_thai = models.PositiveSmallIntegerField(null=True, verbose_name="Mã Trạng Thái")
+    kieu_noi_dung = models.CharField(max_length=100, blank=True, default='', verbose_name="Kiểu Nội Dung")
+    noi_dung = models.BinaryField(default=b'', verbose_name="Nội Dung")
+    tao_luc = models.DateTimeField(db_index=True, verbose_name="Thời Điểm Tạo")
+
+    objects = YeuCauDaXuLyQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Yêu Cầu Đã Xử Lý"
+        verbose_name_plural = "Yêu Cầu Đã Xử Lý"
+
+    def __str__(self):
+        return self.khoa
+
+
+class TienDoNhap(models.Model):
+    """Progress of an import_daily run over one file, committed together with each chunk"""
+    duong_dan = models.CharField(max_length=1000, unique=True, verbose_name="Đường Dẫn File")
+    kich_thuoc = models.BigIntegerField(verbose_name="Kích Thước")
+    thoi_gian_sua = models.BigIntegerField(verbose_name="Thời Điểm Sửa (ns)")
+    so_dong = models.BigIntegerField(default=0, verbose_name="Số Dòng Đã Xử Lý")
+    so_da_nhap = models.BigIntegerField(default=0, verbose_name="Số Đại Lý Đã Nhập")
+    so_bi_tu_choi = models.BigIntegerField(default=0, verbose_name="Số Dòng Bị Từ Chối")
+
+    class Meta:
+        verbose_name = "Tiến Độ Nhập"
+        verbose_name_plural = "Tiến Độ Nhập"
+
+    def __str__(self):
+        return f"{self.duong_dan}: {self.so_dong}"
@@ -0,0 +1,200 @@
+# backend/api/pagination.py
+import base64
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Khoảng giá trị của cột INTEGER trong SQLite (số nguyên có dấu 64 bit)
+MIN_ID = -2 ** 63
+MAX_ID = 2 ** 63 - 1
+
+
+def parse_id(value):
+    """Chuyển chuỗi thành id; ValueError nếu không phải số nguyên hoặc vượt khoảng của SQLite"""
+    number = int(value)
+    if not MIN_ID <= number <= MAX_ID:
+        raise ValueError(f"id ngoài khoảng cho phép: {value}")
+    return number
+
+
+def parse_decimal(value):
+    """Chuyển chuỗi thành Decimal; ValueError với NaN/Infinity (InvalidOperation nếu không phải số)"""
+    number = Decimal(value)
+    if not number.is_finite():
+        raise ValueError(f"Số không hữu hạn: {value}")
+    return number
+
+
+class SearchPagination(PageNumberPagination):
+    """
+    Phân trang cho kết quả tìm kiếm.
+
+    Khác PageNumberPagination, dữ liệu không đến từ queryset mà từ một hàm
+    fetch(offset, limit) trả về (tổng số kết quả, các dòng của trang).
+    Định dạng phản hồi giống hệt danh sách thông thường.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_search(self, request, fetch):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(page_number='', message='Invalid page.'))
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.page_number, message='Invalid page.'))
+        self.count, rows = fetch((self.page_number - 1) * self.page_size, self.page_size)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if self.page_number * self.page_size >= self.count:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Phân trang keyset (cursor) cho danh sách đại lý.
+
+    Trang tiếp theo được lọc bằng điều kiện WHERE trên khóa sắp xếp của dòng
+    cuối trang trước, nên không cần COUNT(*) và không có OFFSET: trang thứ
+    10.000 nhanh như trang đầu. Hỗ trợ sắp xếp theo (id), (tien_no, id) hoặc
+    (ngay_tiep_nhan, id), tăng hoặc giảm dần (?ordering=tien_no, -tien_no, ...).
+    """
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    orderings = {
+        'id': ('id',),
+        'tien_no': ('tien_no', 'id'),
+        'ngay_tiep_nhan': ('ngay_tiep_nhan', 'id'),
+    }
+    # Chuyển giá trị trong cursor (chuỗi) về kiểu của cột
+    parsers = {
+        'id': parse_id,
+        'tien_no': parse_decimal,
+        'ngay_tiep_nhan': date.fromisoformat,
+    }
+    default_ordering = 'id'
+    invalid_cursor_message = 'Cursor không hợp lệ.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        self.descending = self.ordering.startswith('-')
+        self.fields = self.orderings.get(self.ordering.lstrip('-'))
+        if self.fields is None:
+            raise ValidationError({self.ordering_query_param: [
+                f"Chỉ hỗ trợ sắp xếp theo: {', '.join(sorted(self.orderings))}"
+            ]})
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor['r']
+        descending = self.descending != reverse
+
+        queryset = queryset.order_by(*[f'-{field}' if descending else field for field in self.fields])
+        loaded, deferred = queryset.query.deferred_loading
+        if not deferred:
+            # Queryset đã .only() (?fields=): vẫn nạp khóa sắp xếp để tạo cursor mà không truy vấn thêm
+            queryset = queryset.only(*loaded, *self.fields)
+        if self.cursor is not None:
+            queryset = queryset.filter(self._after(self.cursor['p'], descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else self.cursor is not None
+        self.rows = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, api_settings.PAGE_SIZE))
+        except (TypeError, ValueError):
+            page_size = api_settings.PAGE_SIZE
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    def _after(self, position, descending):
+        """Điều kiện "đứng sau vị trí cursor" theo chiều sắp xếp hiện tại"""
+        lookup = 'lt' if descending else 'gt'
+        condition = Q(**{f'{self.fields[-1]}__{lookup}': position[-1]})
+        for index in range(len(self.fields) - 2, -1, -1):
+            field = self.fields[index]
+            condition = Q(**{f'{field}__{lookup}': position[index]}) | (Q(**{field: position[index]}) & condition)
+        if len(self.fields) > 1:
+            # Điều kiện thừa trên cột đầu giúp SQLite tìm thẳng vào chỉ mục (tien_no, id) thay vì quét từ đầu
+            bound = 'lte' if descending else 'gte'
+            condition = Q(**{f'{self.fields[0]}__{bound}': position[0]}) & condition
+        return condition
+
+    def encode_cursor(self, row, reverse):
+        position = [str(getattr(row, field)) for field in self.fields]
+        payload = json.dumps({'o': self.ordering, 'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+            if payload['o'] != self.ordering or len(payload['p']) != len(self.fields):
+                raise ValueError
+            position = [
+                self.parsers[field](value)
+                for field, value in zip(self.fields, payload['p'])
+            ]
+            return {'p': position, 'r': bool(payload['r'])}
+        except (TypeError, ValueError, KeyError, UnicodeError, InvalidOperation):
+            raise NotFound(self.invalid_cursor_message)
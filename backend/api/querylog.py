@@ -0,0 +1,200 @@
+# backend/api/querylog.py
+"""
+Slow-query and N+1 log.
+
+``SlowQueryMiddleware`` watches every SQL query issued while a request is
+handled. A query slower than ``settings.SLOW_QUERY_LOG['threshold_ms']`` is
+written to a rotating JSON-lines file together with its parameters, the view
+that issued it, an excerpt of the project's Python stack and the output of
+``EXPLAIN QUERY PLAN``. At the end of the request, any statement that ran
+``n_plus_one`` times or more (same SQL once literal IN lists are collapsed)
+is written as an N+1 record.
+
+``manage.py slow_queries`` summarizes the file (and its rotated backups).
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+SLOW = 'slow'
+N_PLUS_ONE = 'n_plus_one'
+
+MAX_SQL_LENGTH = 4000
+MAX_PARAMS = 50
+STACK_DEPTH = 8
+
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_EXPLAINABLE_RE = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+# Frame của các lớp đo đạc không giúp tìm ra nơi gọi truy vấn
+_IGNORED_FILES = {__file__, metrics.__file__}
+
+_logger = logging.getLogger('api.slow_queries')
+_handler_lock = threading.Lock()
+
+
+def normalize_sql(sql):
+    """Câu SQL đã bỏ khác biệt về số phần tử trong IN (...), dùng để gom nhóm"""
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+def log_paths():
+    """File log hiện tại và các bản đã xoay vòng (cũ nhất cuối cùng)"""
+    path = settings.SLOW_QUERY_LOG['path']
+    return [path] + [f"{path}.{i}" for i in range(1, settings.SLOW_QUERY_LOG['backup_count'] + 1)]
+
+
+def _get_logger():
+    if not _logger.handlers:
+        with _handler_lock:
+            if not _logger.handlers:
+                config = settings.SLOW_QUERY_LOG
+                os.makedirs(os.path.dirname(config['path']), exist_ok=True)
+                handler = RotatingFileHandler(
+                    config['path'], maxBytes=config['max_bytes'],
+                    backupCount=config['backup_count'], encoding='utf-8', delay=True,
+                )
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                _logger.addHandler(handler)
+                _logger.setLevel(logging.INFO)
+                _logger.propagate = False
+    return _logger
+
+
+def write(record):
+    record = {'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), **record}
+    _get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def stack_excerpt():
+    """Các frame cuối cùng thuộc mã nguồn dự án (bỏ Django, DRF và các middleware đo đạc)"""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        f"{os.path.relpath(frame.filename, base_dir)}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and frame.filename not in _IGNORED_FILES
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+def explain(connection, sql, params):
+    """Kết quả EXPLAIN QUERY PLAN (SQLite), chạy ngoài execute_wrapper để không bị đếm/ghi lại"""
+    if connection.vendor != 'sqlite' or not _EXPLAINABLE_RE.match(sql):
+        return None
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN lỗi: {e}"]
+    finally:
+        cursor.close()
+
+
+def _params(params):
+    if params is None:
+        return None
+    params = list(params)
+    if len(params) > MAX_PARAMS:
+        return params[:MAX_PARAMS] + [f"... ({len(params)} tham số)"]
+    return params
+
+
+class QueryWatcher:
+    """execute_wrapper của một request: ghi truy vấn chậm và đếm số lần lặp lại mỗi câu SQL"""
+
+    def __init__(self, request):
+        self.request = request
+        self.view = None
+        self.threshold = settings.SLOW_QUERY_LOG['threshold_ms'] / 1000
+        self.n_plus_one = settings.SLOW_QUERY_LOG['n_plus_one']
+        # SQL chuẩn hóa -> [số lần, tổng thời gian, stack lúc chạm ngưỡng N+1]
+        self.repeated = {}
+
+    def _base_record(self, kind):
+        return {
+            'type': kind,
+            'view': self.view,
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+        }
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - started
+
+        key = normalize_sql(sql)
+        entry = self.repeated.get(key)
+        if entry is None:
+            entry = self.repeated[key] = [0, 0.0, None]
+        entry[0] += 1
+        entry[1] += duration
+        if entry[0] == self.n_plus_one:
+            entry[2] = stack_excerpt()
+
+        if duration >= self.threshold:
+            write({
+                **self._base_record(SLOW),
+                'duration_ms': round(duration * 1000, 3),
+                'sql': sql[:MAX_SQL_LENGTH],
+                'params': None if many else _params(params),
+                'stack': stack_excerpt(),
+                'plan': None if many else explain(context['connection'], sql, params),
+            })
+        return result
+
+    def finish(self):
+        for sql, (count, duration, stack) in self.repeated.items():
+            if count >= self.n_plus_one:
+                write({
+                    **self._base_record(N_PLUS_ONE),
+                    'count': count,
+                    'duration_ms': round(duration * 1000, 3),
+                    'sql': sql[:MAX_SQL_LENGTH],
+                    'stack': stack,
+                })
+
+
+def view_label(view_func, method):
+    """Tên view dạng module.Lớp.action (viewset DRF) hoặc module.hàm"""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return f"{view_func.__module__}.{view_func.__qualname__}"
+    label = f"{cls.__module__}.{cls.__name__}"
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    return f"{label}.{action}" if action else label
+
+
+class SlowQueryMiddleware:
+    """Theo dõi truy vấn của mỗi request (xem settings.SLOW_QUERY_LOG)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        watcher = QueryWatcher(request)
+        request._query_watcher = watcher
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(watcher))
+            response = self.get_response(request)
+        watcher.finish()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_watcher.view = view_label(view_func, request.method)
@@ -0,0 +1,81 @@
+# backend/api/regulations.py
+"""
+In-memory registry of QuyDinh (regulation) values.
+
+All regulations are loaded with one query and kept parsed in memory. The
+registry is invalidated when a QuyDinh row is saved or deleted (see
+signals.py); other processes notice through the shared ``quydinh`` version
+stamp, so reading a regulation never needs a database query.
+"""
+import threading
+from decimal import Decimal
+
+from . import stamps
+
+SO_DAI_LY_TOI_DA_TRONG_QUAN = "SoDaiLyToiDaTrongQuan"
+TI_LE_GIA_XUAT = "TiLeGiaXuat"
+
+# Kiểu dữ liệu của các quy định đã biết, quy định khác được giữ dạng chuỗi
+PARSERS = {
+    SO_DAI_LY_TOI_DA_TRONG_QUAN: int,
+    TI_LE_GIA_XUAT: Decimal,
+}
+
+STAMP_NAME = stamps.QUY_DINH
+
+
+class QuyDinhRegistry:
+    """Process-local cache of regulations"""
+
+    def __init__(self, stamp_name=STAMP_NAME):
+        self.stamp_name = stamp_name
+        self._lock = threading.Lock()
+        self._version = None
+        self._rows = {}
+        self._values = {}
+
+    def _ensure_loaded(self):
+        version = stamps.read(self.stamp_name)
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            from .models import QuyDinh
+
+            rows = {quy_dinh.ten_quy_dinh: quy_dinh for quy_dinh in QuyDinh.objects.all()}
+            values = {}
+            for name, quy_dinh in rows.items():
+                parser = PARSERS.get(name, str)
+                try:
+                    values[name] = parser(quy_dinh.gia_tri)
+                except (ValueError, ArithmeticError) as e:
+                    values[name] = e
+            # Ghi version đọc TRƯỚC khi tải: nếu có thay đổi trong lúc tải, lần sau sẽ tải lại
+            self._rows, self._values, self._version = rows, values, version
+
+    def get(self, name, default=None):
+        """Giá trị đã chuyển kiểu của quy định, hoặc default nếu không tồn tại"""
+        self._ensure_loaded()
+        value = self._values.get(name, default)
+        if isinstance(value, Exception):
+            raise ValueError(f"Quy định {name} có giá trị không hợp lệ: {self._rows[name].gia_tri}")
+        return value
+
+    def get_row(self, name):
+        """Bản ghi QuyDinh (chỉ đọc) theo tên, hoặc None"""
+        self._ensure_loaded()
+        return self._rows.get(name)
+
+    def all(self):
+        """Tất cả quy định (chỉ đọc), sắp theo id"""
+        self._ensure_loaded()
+        return sorted(self._rows.values(), key=lambda quy_dinh: quy_dinh.pk)
+
+    def invalidate(self):
+        """Bỏ dữ liệu đã nạp ở mọi tiến trình"""
+        self._version = None
+        stamps.bump(self.stamp_name)
+
+
+quy_dinh_registry = QuyDinhRegistry()
@@ -0,0 +1,76 @@
+# backend/api/renderers.py
+from decimal import Decimal
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn: không có thì dùng JSONRenderer của DRF
+    orjson = None
+
+
+_drf_encoder = JSONEncoder()
+
+
+def _orjson_default(obj):
+    """Kiểu orjson không tự mã hóa: Decimal giữ nguyên chữ số, còn lại giống encoder của DRF"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    return _drf_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer dùng orjson (nhanh hơn nhiều lần với danh sách lớn).
+
+    Decimal được mã hóa thành chuỗi chính xác (như COERCE_DECIMAL_TO_STRING),
+    date/datetime theo ISO 8601; kết quả tương đương JSONRenderer ở chế độ
+    UNICODE_JSON + COMPACT_JSON mặc định.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=_orjson_default, option=option)
+
+        # Như JSONRenderer: luôn escape U+2028/U+2029 để kết quả là tập con hợp lệ của JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class StreamedFormatRenderer(BaseRenderer):
+    """
+    Định dạng chỉ dùng cho content negotiation: nội dung thực tế được view
+    stream (xem api/export.py), không qua renderer.
+
+    Response của DRF đi qua đây là phản hồi lỗi (400 bộ lọc, 404 định dạng,
+    429...): trả về JSON như mọi lỗi khác của API thay vì ghi dict vào CSV.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer = ORJSONRenderer()
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = renderer.media_type
+        return renderer.render(data, renderer.media_type, renderer_context)
+
+
+class CSVRenderer(StreamedFormatRenderer):
+    """Khai báo định dạng csv cho content negotiation (?format=csv)"""
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(StreamedFormatRenderer):
+    """Khai báo định dạng ndjson (một đối tượng JSON mỗi dòng) cho content negotiation"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
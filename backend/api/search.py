@@ -0,0 +1,155 @@
+# backend/api/search.py
+"""
+Full-text search for distributors.
+
+The searchable columns of DaiLy are mirrored into an SQLite FTS5 table
+(``api_daily_fts``) whose rowid is the distributor id. Text is folded to
+lower-case ASCII before it is indexed and before it is queried, so
+"Đại Lý Hòa Bình" matches "dai ly hoa binh". When FTS5 is not available
+(other database backends) search falls back to ``icontains`` filters.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'api_daily_fts'
+FTS_COLUMNS = ('ten_dai_ly', 'dien_thoai', 'dia_chi', 'email')
+# Trọng số bm25 theo thứ tự FTS_COLUMNS: tên đại lý quan trọng nhất
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{', '.join(FTS_COLUMNS)}, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')"
+)
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+_TOKEN_RE = re.compile(r'\w+')
+# Các kết nối đã xác nhận có bảng chỉ mục, tránh hỏi sqlite_master mỗi lần lưu
+_available_aliases = set()
+
+
+def fold(text):
+    """Bỏ dấu tiếng Việt và chuyển về chữ thường ("Đà Nẵng" -> "da nang")"""
+    if not text:
+        return ''
+    text = text.replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def build_match_query(keyword):
+    """Chuyển từ khóa thành biểu thức MATCH: mọi từ đều phải khớp tiền tố"""
+    tokens = _TOKEN_RE.findall(fold(keyword))
+    if not tokens:
+        return None
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+def is_available(using=connection):
+    """FTS5 chỉ dùng được trên SQLite và khi bảng chỉ mục đã được tạo"""
+    if using.alias in _available_aliases:
+        return True
+    if using.vendor != 'sqlite':
+        return False
+    if FTS_TABLE in using.introspection.table_names():
+        _available_aliases.add(using.alias)
+        return True
+    return False
+
+
+def _row(dai_ly):
+    return (dai_ly.pk,) + tuple(fold(getattr(dai_ly, column)) for column in FTS_COLUMNS)
+
+
+def index_dai_lys(dai_lys, using=connection):
+    """Thêm hoặc cập nhật các đại lý trong chỉ mục tìm kiếm"""
+    index_rows([_row(dai_ly) for dai_ly in dai_lys], using)
+
+
+def index_rows(rows, using=connection):
+    """Như index_dai_lys với các dòng (id, cột FTS_COLUMNS...) đã bỏ dấu sẵn bằng fold()"""
+    if not rows or not is_available(using):
+        return
+    placeholders = ', '.join(['%s'] * (len(FTS_COLUMNS) + 1))
+    with using.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES ({placeholders})",
+            rows
+        )
+
+
+def remove_dai_lys(ids, using=connection):
+    """Xóa các đại lý khỏi chỉ mục tìm kiếm"""
+    ids = list(ids)
+    if not ids or not is_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in ids])
+
+
+def rebuild_index(queryset, using=connection, batch_size=5000):
+    """Xây lại toàn bộ chỉ mục từ queryset đại lý"""
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    batch = []
+    for dai_ly in queryset.only('pk', *FTS_COLUMNS).iterator(chunk_size=batch_size):
+        batch.append(dai_ly)
+        if len(batch) >= batch_size:
+            index_dai_lys(batch, using)
+            batch = []
+    index_dai_lys(batch, using)
+
+
+def search_ids(keyword, offset=0, limit=None, using=connection, restrict=None):
+    """
+    Tìm kiếm đại lý theo từ khóa.
+
+    restrict: queryset đại lý (đã lọc) giới hạn phạm vi tìm kiếm.
+    Trả về (tổng số kết quả, danh sách id theo thứ tự liên quan giảm dần),
+    hoặc None nếu không dùng được FTS5.
+    """
+    if not is_available(using):
+        return None
+    match = build_match_query(keyword)
+    if match is None:
+        return 0, []
+    where, params = f"{FTS_TABLE} MATCH %s", [match]
+    if restrict is not None:
+        sql, restrict_params = restrict.order_by().values('pk').query.sql_with_params()
+        where += f" AND rowid IN ({sql})"
+        params.extend(restrict_params)
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    with using.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE} WHERE {where}", params)
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {where} "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}), rowid LIMIT %s OFFSET %s",
+            params + [-1 if limit is None else limit, offset]
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    return total, ids
+
+
+def search_filter(keyword, using=connection):
+    """Điều kiện Q "khớp từ khóa" để kết hợp với bộ lọc/sắp xếp khác (FTS5 nếu có, không thì LIKE)"""
+    if not is_available(using):
+        return icontains_filter(keyword)
+    match = build_match_query(keyword)
+    if match is None:
+        return Q(pk__in=[])
+    return Q(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+
+
+def icontains_filter(keyword):
+    """Bộ lọc LIKE dự phòng khi không có FTS5"""
+    return (
+        Q(ten_dai_ly__icontains=keyword) |
+        Q(dien_thoai__icontains=keyword) |
+        Q(dia_chi__icontains=keyword) |
+        Q(email__icontains=keyword)
+    )
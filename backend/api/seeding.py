@@ -0,0 +1,169 @@
+# backend/api/seeding.py
+"""
+Deterministic synthetic Vietnamese data for load testing (manage.py seed_load).
+
+Distributors are generated in blocks of BLOCK_SIZE rows. Block k is produced
+from its own ``random.Random(f"{seed}:{k}")``, so the data depends only on the
+seed and the row count, never on how many worker processes generated it or
+in which order the blocks were finished. Nothing here touches the database:
+``generate_block`` runs in worker processes and returns plain tuples (the
+distributor rows and their already folded search-index rows).
+"""
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+from .search import fold
+
+BLOCK_SIZE = 10000
+
+NGAY_DAU = date(2019, 1, 1)
+SO_NGAY = 6 * 365
+
+TEN_QUAN = (
+    "Quận 1", "Quận 3", "Quận 4", "Quận 5", "Quận 6", "Quận 7", "Quận 8", "Quận 10", "Quận 11", "Quận 12",
+    "Quận Bình Thạnh", "Quận Gò Vấp", "Quận Phú Nhuận", "Quận Tân Bình", "Quận Tân Phú", "Quận Bình Tân",
+    "Thành phố Thủ Đức", "Huyện Bình Chánh", "Huyện Củ Chi", "Huyện Hóc Môn", "Huyện Nhà Bè", "Huyện Cần Giờ",
+    "Quận Ba Đình", "Quận Hoàn Kiếm", "Quận Đống Đa", "Quận Hai Bà Trưng", "Quận Cầu Giấy", "Quận Tây Hồ",
+    "Quận Thanh Xuân", "Quận Hoàng Mai", "Quận Long Biên", "Quận Hà Đông", "Quận Nam Từ Liêm",
+    "Quận Bắc Từ Liêm", "Quận Hải Châu", "Quận Thanh Khê", "Quận Sơn Trà", "Quận Ngũ Hành Sơn",
+    "Quận Liên Chiểu", "Quận Cẩm Lệ", "Quận Ninh Kiều", "Quận Bình Thủy", "Quận Cái Răng",
+)
+
+# (tên, nợ tối đa, tỉ lệ đại lý thuộc loại)
+LOAI_DAI_LY = (
+    ("Đại lý cấp 1", 100_000_000, 10),
+    ("Đại lý cấp 2", 50_000_000, 25),
+    ("Đại lý bán lẻ", 20_000_000, 35),
+    ("Cửa hàng tiện lợi", 10_000_000, 20),
+    ("Nhà phân phối", 500_000_000, 10),
+)
+
+# Họ phổ biến, kèm tỉ lệ (%) gần đúng trong dân số
+HO = (
+    ("Nguyễn", 38), ("Trần", 11), ("Lê", 9.5), ("Phạm", 7), ("Hoàng", 5), ("Huỳnh", 4), ("Phan", 4.5),
+    ("Vũ", 3.9), ("Võ", 3), ("Đặng", 2.1), ("Bùi", 2), ("Đỗ", 1.4), ("Hồ", 1.3), ("Ngô", 1.3),
+    ("Dương", 1), ("Lý", 0.5),
+)
+TEN_DEM = ("Văn", "Thị", "Minh", "Hoàng", "Ngọc", "Thanh", "Quốc", "Hữu", "Đức", "Thu", "Anh", "Gia", "Bảo", "Kim")
+TEN = (
+    "An", "Bình", "Chi", "Cường", "Dũng", "Giang", "Hà", "Hải", "Hạnh", "Hiếu", "Hùng", "Hương", "Khoa", "Khánh",
+    "Lan", "Linh", "Long", "Mai", "Nam", "Ngân", "Nhung", "Phong", "Phúc", "Quân", "Sơn", "Tâm", "Thảo", "Thắng",
+    "Trang", "Trung", "Tuấn", "Tùng", "Vy", "Yến",
+)
+THUONG_HIEU = (
+    "Phát Đạt", "Thành Công", "Minh Long", "Hưng Thịnh", "Tân Tiến", "Vạn Phúc", "An Khang", "Phú Quý",
+    "Hoàng Gia", "Kim Ngân", "Đại Phát", "Thịnh Vượng", "Sao Mai", "Bình Minh", "Hòa Bình", "Trường Sơn",
+)
+TIEN_TO = ("Đại lý", "Cửa hàng", "Tạp hóa", "Nhà phân phối", "Công ty TNHH", "Doanh nghiệp tư nhân")
+TEN_DUONG = (
+    "Lê Lợi", "Nguyễn Huệ", "Hai Bà Trưng", "Trần Hưng Đạo", "Lý Thường Kiệt", "Điện Biên Phủ",
+    "Cách Mạng Tháng Tám", "Nguyễn Trãi", "Lê Văn Sỹ", "Võ Văn Tần", "Pasteur", "Nam Kỳ Khởi Nghĩa",
+    "Phan Xích Long", "Hoàng Văn Thụ", "Nguyễn Thị Minh Khai", "Quang Trung", "Lạc Long Quân", "Âu Cơ",
+    "Phạm Văn Đồng", "Kha Vạn Cân", "Trường Chinh", "Cộng Hòa", "Lê Duẩn", "Bạch Đằng", "Hùng Vương",
+)
+# Đầu số di động (10 chữ số) và mã vùng cố định (11 chữ số)
+DAU_SO_DI_DONG = (
+    "032", "033", "034", "035", "036", "037", "038", "039", "070", "076", "077", "078", "079",
+    "081", "082", "083", "084", "085", "086", "088", "089", "090", "091", "093", "094", "096", "097", "098",
+)
+MA_VUNG = ("028", "024", "0236", "0292")
+TEN_MIEN_EMAIL = ("gmail.com", "yahoo.com.vn", "outlook.com", "fpt.vn", "vnn.vn")
+
+
+def _with_folded(words):
+    """Mỗi từ kèm bản đã bỏ dấu, để không phải gọi fold() cho từng dòng"""
+    return tuple((word, fold(word)) for word in words)
+
+
+_HO = _with_folded(name for name, _ in HO)
+_HO_WEIGHTS = tuple(accumulate(weight for _, weight in HO))
+_TEN_DEM = _with_folded(TEN_DEM)
+_TEN = _with_folded(TEN)
+_THUONG_HIEU = _with_folded(THUONG_HIEU)
+_TIEN_TO = _with_folded(TIEN_TO)
+_TEN_DUONG = _with_folded(TEN_DUONG)
+
+
+def ten_quan(index):
+    """Tên quận thứ index (0, 1, ...): tên thật, sau đó đánh số thêm để không trùng"""
+    base = TEN_QUAN[index % len(TEN_QUAN)]
+    return base if index < len(TEN_QUAN) else f"{base} {index // len(TEN_QUAN) + 1}"
+
+
+def quan_counts(rows, so_quan):
+    """Số đại lý của mỗi quận khi chia vòng tròn rows đại lý cho so_quan quận"""
+    return [rows // so_quan + (1 if k < rows % so_quan else 0) for k in range(so_quan)]
+
+
+def generate_block(task):
+    """
+    Sinh một khối đại lý.
+
+    task: (seed, số thứ tự khối, số dòng, id đầu tiên, [id quận], [(id loại, nợ tối đa, tỉ lệ)]).
+    Dòng thứ n (tính trên toàn bộ lần tạo) thuộc quận n % số quận.
+    Trả về (dòng đại lý, dòng chỉ mục tìm kiếm, {id quận: số đại lý}).
+    """
+    seed, block, count, first_id, quan_ids, loais = task
+    rng = random.Random(f"{seed}:{block}")
+    random_ = rng.random
+    randrange = rng.randrange
+    choice = rng.choice
+    loai_weights = tuple(accumulate(weight for _, _, weight in loais))
+    so_quan = len(quan_ids)
+    first = block * BLOCK_SIZE
+
+    dai_lys, fts_rows, demand = [], [], {}
+    for offset in range(count):
+        n = first + offset
+        pk = first_id + n
+        quan_id = quan_ids[n % so_quan]
+        demand[quan_id] = demand.get(quan_id, 0) + 1
+
+        loai_id, no_toi_da, _ = rng.choices(loais, cum_weights=loai_weights)[0]
+        if random_() < 0.5:
+            # "Đại lý Nguyễn Văn An"
+            tien_to, tien_to_fold = choice(_TIEN_TO)
+            ho, ho_fold = rng.choices(_HO, cum_weights=_HO_WEIGHTS)[0]
+            dem, dem_fold = choice(_TEN_DEM)
+            ten, ten_rieng_fold = choice(_TEN)
+            ten_dai_ly = f"{tien_to} {ho} {dem} {ten}"
+            ten_fold = f"{tien_to_fold} {ho_fold} {dem_fold} {ten_rieng_fold}"
+            email_user = f"{ten_rieng_fold}.{ho_fold}{pk}"
+        else:
+            # "Tạp hóa Phát Đạt 2"
+            tien_to, tien_to_fold = choice(_TIEN_TO)
+            hieu, hieu_fold = choice(_THUONG_HIEU)
+            so = randrange(1, 10)
+            ten_dai_ly = f"{tien_to} {hieu} {so}"
+            ten_fold = f"{tien_to_fold} {hieu_fold} {so}"
+            email_user = f"{hieu_fold.replace(' ', '')}{pk}"
+
+        if random_() < 0.8:
+            dien_thoai = f"{choice(DAU_SO_DI_DONG)}{randrange(10_000_000):07d}"
+        else:
+            ma_vung = choice(MA_VUNG)
+            dien_thoai = f"{ma_vung}{randrange(10 ** (11 - len(ma_vung))):0{11 - len(ma_vung)}d}"
+
+        duong, duong_fold = choice(_TEN_DUONG)
+        so_nha = randrange(1, 500)
+        if random_() < 0.3:
+            so_nha = f"{so_nha}/{randrange(1, 50)}"
+        phuong = randrange(1, 16)
+        dia_chi = f"{so_nha} {duong}, Phường {phuong}"
+        dia_chi_fold = f"{so_nha} {duong_fold}, phuong {phuong}"
+
+        email = f"{email_user}@{choice(TEN_MIEN_EMAIL)}" if random_() < 0.3 else None
+
+        # Một phần ba không nợ, còn lại lệch về mức nợ thấp, làm tròn nghìn đồng, luôn <= nợ tối đa
+        if random_() < 0.35:
+            tien_no = 0
+        else:
+            tien_no = int(no_toi_da * random_() ** 2) // 1000 * 1000
+
+        ngay = NGAY_DAU + timedelta(days=randrange(SO_NGAY))
+        dai_lys.append((
+            pk, ten_dai_ly, dien_thoai, dia_chi, quan_id, loai_id, ngay.isoformat(), email, tien_no,
+        ))
+        fts_rows.append((pk, ten_fold, dien_thoai, dia_chi_fold, email or ''))
+    return dai_lys, fts_rows, demand
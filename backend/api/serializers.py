@@ -1,20 +1,95 @@
 # backend/api/serializers.py
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from .metrics import serializer_timer
 from .models import Quan, LoaiDaiLy, DaiLy, QuyDinh
 
 
-class QuanSerializer(serializers.ModelSerializer):
-    so_dai_ly = serializers.SerializerMethodField()
+def _split_names(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets: ?fields=id,ten_quan chỉ trả về các trường liệt kê,
+    ?exclude=so_dai_ly bỏ các trường liệt kê (chỉ áp dụng cho yêu cầu đọc).
+
+    Các view dùng selected_fields()/prune_queryset() để chỉ SELECT cột và
+    JOIN cần cho những trường này.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context.get('request'))
+        if selected is not None:
+            for name in list(self.fields):
+                if name not in selected:
+                    self.fields.pop(name)
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+    @classmethod
+    def selected_fields(cls, request):
+        """Tập tên trường được yêu cầu, hoặc None nếu trả về đủ mọi trường"""
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        include = _split_names(request.query_params.get(cls.fields_query_param))
+        exclude = _split_names(request.query_params.get(cls.exclude_query_param))
+        if not include and not exclude:
+            return None
+        return {
+            name for name in cls.Meta.fields
+            if (not include or name in include) and name not in exclude
+        }
 
+    @classmethod
+    def wants(cls, request, name):
+        selected = cls.selected_fields(request)
+        return selected is None or name in selected
+
+    @classmethod
+    def prune_queryset(cls, queryset, request):
+        """Chỉ nạp các cột (only) và JOIN (select_related) cần cho các trường được yêu cầu"""
+        selected = cls.selected_fields(request)
+        if selected is None:
+            return queryset
+        fields = cls().fields
+        columns = {'pk'}
+        related = set()
+        for name in selected:
+            source = fields[name].source
+            if source == '*':  # SerializerMethodField: view tự quyết định (annotation)
+                continue
+            path = source.split('.')
+            columns.add('__'.join(path))
+            if len(path) > 1:
+                related.add('__'.join(path[:-1]))
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+
+def _so_dai_ly(obj):
+    """Đọc số đại lý từ annotation, chỉ truy vấn khi queryset chưa annotate"""
+    so_dai_ly = getattr(obj, 'so_dai_ly', None)
+    if so_dai_ly is None:
+        return obj.dai_lys.count()
+    return so_dai_ly
+
+
+class QuanSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Quan
         fields = ['id', 'ten_quan', 'so_dai_ly']
-
-    def get_so_dai_ly(self, obj):
-        return obj.dai_lys.count()
+        read_only_fields = ['so_dai_ly']
 
 
-class LoaiDaiLySerializer(serializers.ModelSerializer):
+class LoaiDaiLySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     so_dai_ly = serializers.SerializerMethodField()
 
     class Meta:
@@ -22,10 +97,10 @@ class LoaiDaiLySerializer(serializers.ModelSerializer):
         fields = ['id', 'ten_loai_dai_ly', 'no_toi_da', 'so_dai_ly']
 
     def get_so_dai_ly(self, obj):
-        return obj.dai_lys.count()
+        return _so_dai_ly(obj)
 
 
-class DaiLySerializer(serializers.ModelSerializer):
+class DaiLySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     ten_quan = serializers.ReadOnlyField(source='quan.ten_quan')
     ten_loai_dai_ly = serializers.ReadOnlyField(source='loai_dai_ly.ten_loai_dai_ly')
 
@@ -39,7 +114,55 @@ class DaiLySerializer(serializers.ModelSerializer):
         read_only_fields = ['ngay_tiep_nhan']
 
 
-class QuyDinhSerializer(serializers.ModelSerializer):
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField tra cứu trong dict {pk: obj} đã nạp sẵn ở context thay vì truy vấn"""
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = self.context[self.context_key].get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+class BulkDaiLySerializer(DaiLySerializer):
+    """
+    Kiểm tra một đại lý trong yêu cầu bulk.
+
+    Quận và loại đại lý được lấy từ context['quans'] / context['loai_dai_lys']
+    (nạp một lần cho cả lô) và ràng buộc nợ tối đa được kiểm tra tại đây,
+    nên việc kiểm tra cả lô không phát sinh truy vấn theo từng dòng.
+    """
+    quan = PrefetchedPrimaryKeyRelatedField('quans', queryset=Quan.objects.all())
+    loai_dai_ly = PrefetchedPrimaryKeyRelatedField('loai_dai_lys', queryset=LoaiDaiLy.objects.all())
+
+    def validate(self, attrs):
+        loai_dai_ly = attrs.get('loai_dai_ly') or self.instance.loai_dai_ly
+        tien_no = attrs.get('tien_no', self.instance.tien_no if self.instance else 0)
+        if tien_no > loai_dai_ly.no_toi_da:
+            raise serializers.ValidationError(
+                {'tien_no': [f"Tiền nợ vượt quá mức tối đa cho phép ({loai_dai_ly.no_toi_da})"]}
+            )
+        return attrs
+
+
+class AdjustDebtSerializer(serializers.Serializer):
+    """Điều chỉnh tiền nợ: delta dương để tăng nợ, âm để giảm nợ"""
+    id = serializers.IntegerField(read_only=True)
+    delta = serializers.DecimalField(max_digits=18, decimal_places=0, write_only=True)
+    tien_no = serializers.DecimalField(max_digits=18, decimal_places=0, read_only=True)
+
+
+class QuyDinhSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = QuyDinh
         fields = ['id', 'ten_quy_dinh', 'gia_tri', 'mo_ta']
\ No newline at end of file
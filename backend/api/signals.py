@@ -0,0 +1,73 @@
+# backend/api/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import search, stamps
+from .models import DaiLy, DaiLyDaXoa, LoaiDaiLy, Quan, QuyDinh
+from .regulations import quy_dinh_registry
+
+
+@receiver(post_save, sender=DaiLy)
+def index_dai_ly(sender, instance, **kwargs):
+    """Đồng bộ chỉ mục tìm kiếm khi thêm/sửa đại lý"""
+    search.index_dai_lys([instance])
+
+
+@receiver(post_delete, sender=DaiLy)
+def unindex_dai_ly(sender, instance, **kwargs):
+    """Xóa đại lý khỏi chỉ mục tìm kiếm"""
+    search.remove_dai_lys([instance.pk])
+
+
+@receiver(post_delete, sender=DaiLy)
+def release_quan_slot(sender, instance, **kwargs):
+    """Giảm bộ đếm đại lý của quận (chạy trong cùng giao dịch xóa)"""
+    Quan.objects.release_slot(instance.quan_id)
+
+
+@receiver(post_delete, sender=DaiLy)
+def record_tombstone(sender, instance, **kwargs):
+    """Ghi dấu xóa để client đồng bộ delta biết đại lý đã bị xóa"""
+    DaiLyDaXoa(dai_ly_id=instance.pk, phien_ban=DaiLy.objects.next_phien_ban()).save()
+
+
+@receiver(post_save, sender=Quan)
+def touch_dai_lys_of_quan(sender, instance, created, **kwargs):
+    """Đổi tên quận làm thay đổi ten_quan của các đại lý trong quận"""
+    if not created and instance.ten_quan != getattr(instance, '_saved_ten_quan', None):
+        DaiLy.objects.filter(quan=instance).touch()
+    instance._saved_ten_quan = instance.ten_quan
+
+
+@receiver(post_save, sender=LoaiDaiLy)
+def touch_dai_lys_of_loai(sender, instance, created, **kwargs):
+    """Đổi tên loại đại lý làm thay đổi ten_loai_dai_ly của các đại lý thuộc loại"""
+    if not created and instance.ten_loai_dai_ly != getattr(instance, '_saved_ten_loai_dai_ly', None):
+        DaiLy.objects.filter(loai_dai_ly=instance).touch()
+    instance._saved_ten_loai_dai_ly = instance.ten_loai_dai_ly
+
+
+@receiver(post_save, sender=QuyDinh)
+@receiver(post_delete, sender=QuyDinh)
+def invalidate_quy_dinh(sender, **kwargs):
+    """Làm mới bộ nhớ đệm quy định sau khi giao dịch được commit"""
+    transaction.on_commit(quy_dinh_registry.invalidate)
+
+
+@receiver(post_save, sender=Quan)
+@receiver(post_delete, sender=Quan)
+def bump_quan_stamp(sender, **kwargs):
+    stamps.bump_on_commit(stamps.QUAN)
+
+
+@receiver(post_save, sender=LoaiDaiLy)
+@receiver(post_delete, sender=LoaiDaiLy)
+def bump_loai_dai_ly_stamp(sender, **kwargs):
+    stamps.bump_on_commit(stamps.LOAI_DAI_LY)
+
+
+@receiver(post_save, sender=DaiLy)
+@receiver(post_delete, sender=DaiLy)
+def bump_dai_ly_stamp(sender, **kwargs):
+    stamps.bump_on_commit(stamps.DAI_LY)
@@ -0,0 +1,30 @@
+# backend/api/sqlite.py
+"""
+SQLite connection profile.
+
+Django 4.2 has no per-connection init command for SQLite, so the PRAGMAs in
+``settings.SQLITE_PRAGMAS`` are applied from the ``connection_created``
+signal. With persistent connections (``CONN_MAX_AGE``) this runs once per
+worker thread rather than once per request.
+"""
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    """Áp dụng các PRAGMA cấu hình cho kết nối SQLite vừa mở"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            # PRAGMA không nhận tham số ràng buộc: chỉ cho phép tên/số đơn giản
+            if not _VALUE_RE.match(str(value)):
+                raise ValueError(f"Giá trị PRAGMA {name} không hợp lệ: {value!r}")
+            cursor.execute(f"PRAGMA {name} = {value}")
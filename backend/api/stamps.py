@@ -0,0 +1,51 @@
+# backend/api/stamps.py
+"""
+Version stamps shared between worker processes.
+
+Each stamp is a tiny file under ``settings.VERSION_STAMP_DIR`` holding a
+random token. Bumping a stamp replaces the file atomically; readers compare
+the token with the one they cached to know whether in-memory data is stale.
+Reading a stamp is a local file read, never a database query.
+"""
+import os
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+
+QUAN = 'quan'
+LOAI_DAI_LY = 'loaidaily'
+DAI_LY = 'daily'
+QUY_DINH = 'quydinh'
+
+
+def _path(name):
+    return os.path.join(settings.VERSION_STAMP_DIR, name)
+
+
+def read(name):
+    """Giá trị hiện tại của stamp (tạo mới nếu chưa có, để không bao giờ trùng giá trị cũ)"""
+    try:
+        with open(_path(name), 'r', encoding='ascii') as f:
+            return f.read()
+    except FileNotFoundError:
+        return bump(name)
+
+
+def bump(name):
+    """Đổi stamp sang giá trị mới, báo cho mọi tiến trình rằng dữ liệu đã thay đổi"""
+    os.makedirs(settings.VERSION_STAMP_DIR, exist_ok=True)
+    token = uuid.uuid4().hex
+    tmp_path = f"{_path(name)}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='ascii') as f:
+        f.write(token)
+    os.replace(tmp_path, _path(name))
+    return token
+
+
+def bump_on_commit(*names):
+    """Tăng các stamp sau khi giao dịch hiện tại commit (ngay lập tức nếu không có giao dịch)"""
+    def bump_all():
+        for name in names:
+            bump(name)
+    transaction.on_commit(bump_all)
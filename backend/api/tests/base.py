@@ -0,0 +1,63 @@
+# backend/api/tests/base.py
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from api.models import DaiLy, LoaiDaiLy, Quan, QuyDinh
+from api.regulations import quy_dinh_registry, SO_DAI_LY_TOI_DA_TRONG_QUAN
+
+SO_TOI_DA = 2
+
+
+class ApiTestCase(TestCase):
+    """
+    Dữ liệu mẫu chung: hai quận (tối đa SO_TOI_DA đại lý mỗi quận) và một
+    loại đại lý. Stamp phiên bản và bảng throttle nằm trong thư mục tạm, không
+    đụng tới var/ của máy chủ; throttle bị tắt.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        var_dir = tempfile.mkdtemp(prefix='qldl-test-')
+        cls.addClassCleanup(shutil.rmtree, var_dir, ignore_errors=True)
+        test_settings = override_settings(
+            VERSION_STAMP_DIR=os.path.join(var_dir, 'stamps'),
+            API_THROTTLE={
+                **settings.API_THROTTLE, 'enabled': False, 'path': os.path.join(var_dir, 'throttle', 'buckets'),
+            },
+        )
+        test_settings.enable()
+        cls.addClassCleanup(test_settings.disable)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.loai = LoaiDaiLy.objects.create(ten_loai_dai_ly="Loại 1", no_toi_da=Decimal('1000000'))
+        cls.quan_1 = Quan.objects.create(ten_quan="Quận 1")
+        cls.quan_2 = Quan.objects.create(ten_quan="Quận 2")
+        QuyDinh.objects.create(ten_quy_dinh=SO_DAI_LY_TOI_DA_TRONG_QUAN, gia_tri=str(SO_TOI_DA))
+
+    def setUp(self):
+        # Giao dịch của mỗi test bị rollback mà không commit: tự làm mới bộ nhớ đệm quy định
+        quy_dinh_registry.invalidate()
+
+    def create_dai_ly(self, quan, **fields):
+        fields = {
+            'ten_dai_ly': "Đại lý", 'dien_thoai': '0901234567', 'dia_chi': "1 Lê Lợi",
+            'loai_dai_ly': self.loai, **fields,
+        }
+        return DaiLy.objects.create(quan=quan, **fields)
+
+    def payload(self, quan, **fields):
+        """Dữ liệu JSON để thêm/sửa đại lý qua API"""
+        return {
+            'ten_dai_ly': "Đại lý", 'dien_thoai': '0901234567', 'dia_chi': "1 Lê Lợi",
+            'quan': quan.pk, 'loai_dai_ly': self.loai.pk, **fields,
+        }
+
+    def so_dai_ly(self, quan):
+        return Quan.objects.values_list('so_dai_ly', flat=True).get(pk=quan.pk)
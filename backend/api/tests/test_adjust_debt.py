@@ -0,0 +1,76 @@
+# backend/api/tests/test_adjust_debt.py
+from decimal import Decimal
+
+from api.models import DaiLy
+
+from .base import ApiTestCase
+
+
+class AdjustDebtTests(ApiTestCase):
+    """DaiLyQuerySet.adjust_debt: 0 <= tien_no <= no_toi_da của loại đại lý"""
+
+    def setUp(self):
+        super().setUp()
+        self.dai_ly = self.create_dai_ly(self.quan_1, tien_no=Decimal('100'))
+
+    def tien_no(self):
+        return DaiLy.objects.values_list('tien_no', flat=True).get(pk=self.dai_ly.pk)
+
+    def test_adjust_returns_new_balance(self):
+        self.assertEqual(DaiLy.objects.adjust_debt(self.dai_ly.pk, Decimal('50')), Decimal('150'))
+        self.assertEqual(DaiLy.objects.adjust_debt(self.dai_ly.pk, Decimal('-150')), Decimal('0'))
+        self.assertEqual(self.tien_no(), Decimal('0'))
+
+    def test_adjust_up_to_no_toi_da(self):
+        delta = self.loai.no_toi_da - Decimal('100')
+        self.assertEqual(DaiLy.objects.adjust_debt(self.dai_ly.pk, delta), self.loai.no_toi_da)
+
+    def test_adjust_above_no_toi_da_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "vượt quá mức tối đa"):
+            DaiLy.objects.adjust_debt(self.dai_ly.pk, self.loai.no_toi_da - Decimal('99'))
+        self.assertEqual(self.tien_no(), Decimal('100'))
+
+    def test_adjust_below_zero_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "không được âm"):
+            DaiLy.objects.adjust_debt(self.dai_ly.pk, Decimal('-101'))
+        self.assertEqual(self.tien_no(), Decimal('100'))
+
+    def test_adjust_missing_dai_ly(self):
+        with self.assertRaises(DaiLy.DoesNotExist):
+            DaiLy.objects.adjust_debt(self.dai_ly.pk + 1000, Decimal('1'))
+
+    def test_adjust_bumps_phien_ban(self):
+        before = DaiLy.objects.values_list('phien_ban', flat=True).get(pk=self.dai_ly.pk)
+        DaiLy.objects.adjust_debt(self.dai_ly.pk, Decimal('1'))
+        after = DaiLy.objects.values_list('phien_ban', flat=True).get(pk=self.dai_ly.pk)
+        self.assertGreater(after, before)
+
+    def test_adjust_debt_endpoint(self):
+        url = f'/api/daily/{self.dai_ly.pk}/adjust_debt/'
+        response = self.client.post(url, {'delta': '-40'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()['tien_no']), Decimal('60'))
+
+        response = self.client.post(url, {'delta': '-61'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+        response = self.client.post(
+            f'/api/daily/{self.dai_ly.pk + 1000}/adjust_debt/', {'delta': '1'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_adjust_debt_endpoint_out_of_range_id(self):
+        for pk in (2 ** 63, 10 ** 30):
+            with self.subTest(pk=pk):
+                response = self.client.post(
+                    f'/api/daily/{pk}/adjust_debt/', {'delta': '1'}, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 404)
+
+    def test_adjust_debt_endpoint_rejects_fractional_delta(self):
+        response = self.client.post(
+            f'/api/daily/{self.dai_ly.pk}/adjust_debt/', {'delta': '1.5'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.tien_no(), Decimal('100'))
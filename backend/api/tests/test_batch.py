@@ -0,0 +1,84 @@
+# backend/api/tests/test_batch.py
+from api.batch import MAX_REQUESTS
+from api.models import DaiLy
+
+from .base import ApiTestCase
+
+URL = '/api/batch/'
+
+
+class BatchTests(ApiTestCase):
+    """POST /api/batch/: nhiều yêu cầu con trong một request"""
+
+    def batch(self, items, mode=None):
+        url = URL if mode is None else f'{URL}?mode={mode}'
+        return self.client.post(url, items, content_type='application/json')
+
+    def test_reads_in_one_request(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        response = self.batch([
+            {'path': '/api/quan/'},
+            {'method': 'GET', 'path': f'/api/daily/{dai_ly.pk}/?fields=id,ten_dai_ly'},
+            {'path': '/api/khong-co/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([result['status'] for result in results], [200, 200, 404])
+        self.assertEqual(results[0]['body']['count'], 2)
+        self.assertEqual(results[1]['body'], {'id': dai_ly.pk, 'ten_dai_ly': "Đại lý"})
+        self.assertIn('ETag', results[1]['headers'])
+
+    def test_sub_request_if_none_match(self):
+        etag = self.client.get('/api/quan/')['ETag']
+        results = self.batch([{'path': '/api/quan/', 'headers': {'If-None-Match': etag}}]).json()['responses']
+        self.assertEqual(results[0]['status'], 304)
+        self.assertIsNone(results[0]['body'])
+
+    def test_partial_keeps_successful_writes(self):
+        results = self.batch([
+            {'method': 'POST', 'path': '/api/daily/', 'body': self.payload(self.quan_1)},
+            {'method': 'POST', 'path': '/api/daily/', 'body': self.payload(self.quan_1, dien_thoai='1')},
+        ]).json()['responses']
+        self.assertEqual([result['status'] for result in results], [201, 400])
+        self.assertEqual(DaiLy.objects.count(), 1)
+
+    def test_atomic_rolls_back_everything(self):
+        response = self.batch([
+            {'method': 'POST', 'path': '/api/daily/', 'body': self.payload(self.quan_1)},
+            {'method': 'POST', 'path': '/api/daily/', 'body': self.payload(self.quan_1, dien_thoai='1')},
+            {'method': 'POST', 'path': '/api/daily/', 'body': self.payload(self.quan_2)},
+        ], 'atomic')
+        self.assertEqual(response.status_code, 400)
+        result = response.json()
+        self.assertFalse(result['committed'])
+        self.assertEqual([item['status'] for item in result['responses']], [201, 400, 424])
+        self.assertFalse(DaiLy.objects.exists())
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+
+    def test_idempotency_key_per_sub_request(self):
+        item = {'method': 'POST', 'path': '/api/daily/', 'body': self.payload(self.quan_1),
+                'headers': {'Idempotency-Key': 'lo-1'}}
+        first = self.batch([item]).json()['responses'][0]
+        second = self.batch([item]).json()['responses'][0]
+        self.assertEqual(second['status'], 201)
+        self.assertEqual(second['body'], first['body'])
+        self.assertEqual(DaiLy.objects.count(), 1)
+
+    def test_rejected_batches(self):
+        cases = [
+            {'path': '/api/quan/'},
+            [],
+            [{'path': '/api/quan/'}] * (MAX_REQUESTS + 1),
+            [{'method': 'TRACE', 'path': '/api/quan/'}],
+            [{'path': 'http://example.com/api/quan/'}],
+            [{'path': '/api/quan/', 'headers': ['x']}],
+        ]
+        for items in cases:
+            with self.subTest(items=str(items)[:60]):
+                self.assertEqual(self.batch(items).status_code, 400)
+        self.assertEqual(self.batch([{'path': '/api/quan/'}], 'khac').status_code, 400)
+
+    def test_nested_batch_and_streaming_are_refused(self):
+        results = self.batch([{'method': 'POST', 'path': '/api/batch/', 'body': []},
+                              {'path': '/api/daily/export/?format=csv'}]).json()['responses']
+        self.assertEqual([result['status'] for result in results], [400, 400])
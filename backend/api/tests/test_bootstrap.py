@@ -0,0 +1,52 @@
+# backend/api/tests/test_bootstrap.py
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Quan, QuyDinh
+
+from .base import ApiTestCase
+
+URL = '/api/bootstrap/'
+
+
+class BootstrapTests(ApiTestCase):
+    """GET /api/bootstrap/: dữ liệu khởi động client trong một request, một ETag chung"""
+
+    def setUp(self):
+        super().setUp()
+        self.dai_lys = [self.create_dai_ly(self.quan_1), self.create_dai_ly(self.quan_2, ten_dai_ly="B")]
+
+    def test_payload(self):
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([quan['so_dai_ly'] for quan in data['quans']], [1, 1])
+        self.assertEqual(data['loai_dai_lys'][0]['so_dai_ly'], 2)
+        self.assertEqual([quy_dinh['ten_quy_dinh'] for quy_dinh in data['quy_dinhs']], ['SoDaiLyToiDaTrongQuan'])
+        self.assertEqual(data['dai_lys']['count'], 2)
+        self.assertEqual([row['id'] for row in data['dai_lys']['results']], [dai_ly.pk for dai_ly in self.dai_lys])
+
+    def test_dai_ly_params(self):
+        data = self.client.get(URL, {'fields': 'id,ten_dai_ly', 'quan': str(self.quan_2.pk)}).json()
+        self.assertEqual(data['dai_lys']['results'], [{'id': self.dai_lys[1].pk, 'ten_dai_ly': "B"}])
+        # ?fields= chỉ áp dụng cho đại lý
+        self.assertIn('ten_quan', data['quans'][0])
+        self.assertEqual(self.client.get(URL, {'tien_no__gte': 'NaN'}).status_code, 400)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(URL)
+        for n in range(3):
+            self.create_dai_ly(Quan.objects.create(ten_quan=f"Quận thêm {n}"), ten_dai_ly=f"Thêm {n}")
+        with CaptureQueriesContext(connection) as after:
+            self.client.get(URL)
+        self.assertEqual(len(after), len(before))
+
+    def test_not_modified_until_any_part_changes(self):
+        etag = self.client.get(URL)['ETag']
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            QuyDinh.objects.create(ten_quy_dinh='TiLeGiaXuat', gia_tri='1.02')
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['quy_dinhs']), 2)
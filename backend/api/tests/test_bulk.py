@@ -0,0 +1,80 @@
+# backend/api/tests/test_bulk.py
+from decimal import Decimal
+
+from api.models import DaiLy
+
+from .base import ApiTestCase, SO_TOI_DA
+
+URL = '/api/daily/bulk/'
+
+
+class BulkTests(ApiTestCase):
+    """POST /api/daily/bulk/: thêm/sửa nhiều đại lý trong một giao dịch"""
+
+    def bulk(self, items, mode=None):
+        url = URL if mode is None else f'{URL}?mode={mode}'
+        return self.client.post(url, items, content_type='application/json')
+
+    def test_create_and_update(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        response = self.bulk([
+            self.payload(self.quan_2, ten_dai_ly="Mới"),
+            {'id': dai_ly.pk, 'ten_dai_ly': "Đã sửa", 'tien_no': '5'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result['created'], result['updated'], result['errors']), (1, 1, 0))
+        self.assertEqual([item['status'] for item in result['results']], ['created', 'updated'])
+        dai_ly.refresh_from_db()
+        self.assertEqual((dai_ly.ten_dai_ly, dai_ly.tien_no), ("Đã sửa", Decimal('5')))
+        self.assertEqual(self.so_dai_ly(self.quan_2), 1)
+
+    def test_atomic_writes_nothing_when_one_item_fails(self):
+        response = self.bulk([self.payload(self.quan_1), self.payload(self.quan_1, dien_thoai='123')])
+        self.assertEqual(response.status_code, 400)
+        result = response.json()
+        self.assertFalse(result['committed'])
+        self.assertEqual([item['status'] for item in result['results']], ['valid', 'error'])
+        self.assertFalse(DaiLy.objects.exists())
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+
+    def test_partial_writes_valid_items(self):
+        response = self.bulk([self.payload(self.quan_1), self.payload(self.quan_1, dien_thoai='123')], 'partial')
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result['created'], result['errors']), (1, 1))
+        self.assertEqual(DaiLy.objects.count(), 1)
+
+    def test_district_cap_counts_the_whole_batch(self):
+        items = [self.payload(self.quan_1) for _ in range(SO_TOI_DA + 1)]
+        result = self.bulk(items, 'partial').json()
+        self.assertEqual(result['created'], SO_TOI_DA)
+        self.assertIn('quan', result['results'][-1]['errors'])
+        self.assertEqual(self.so_dai_ly(self.quan_1), SO_TOI_DA)
+
+    def test_move_between_districts(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        self.bulk([{'id': dai_ly.pk, 'quan': self.quan_2.pk}])
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+        self.assertEqual(self.so_dai_ly(self.quan_2), 1)
+
+    def test_unknown_and_duplicate_ids(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        result = self.bulk([
+            {'id': dai_ly.pk, 'ten_dai_ly': "A"}, {'id': dai_ly.pk, 'ten_dai_ly': "B"},
+            {'id': 2 ** 63, 'ten_dai_ly': "C"}, {'id': 10 ** 30, 'ten_dai_ly': "D"}, {'id': 'x'},
+        ], 'partial').json()
+        self.assertEqual([item['status'] for item in result['results']], ['updated'] + ['error'] * 4)
+
+    def test_debt_above_no_toi_da_is_rejected(self):
+        result = self.bulk([self.payload(self.quan_1, tien_no=str(self.loai.no_toi_da + 1))]).json()
+        self.assertIn('tien_no', result['results'][0]['errors'])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.bulk({'ten_dai_ly': "x"}).status_code, 400)
+        self.assertEqual(self.bulk([], 'khac').status_code, 400)
+
+    def test_search_index_updated(self):
+        self.bulk([self.payload(self.quan_1, ten_dai_ly="Đại lý Sông Hàn")])
+        response = self.client.get('/api/daily/search/', {'keyword': 'song han'})
+        self.assertEqual(response.json()['count'], 1)
@@ -0,0 +1,107 @@
+# backend/api/tests/test_capacity.py
+from api.models import DaiLy, Quan
+
+from .base import ApiTestCase, SO_TOI_DA
+
+
+class ReserveSlotTests(ApiTestCase):
+    """QuanQuerySet.reserve_slot/release_slot và bộ đếm so_dai_ly"""
+
+    def test_reserve_up_to_cap(self):
+        for _ in range(SO_TOI_DA):
+            Quan.objects.reserve_slot(self.quan_1.pk, SO_TOI_DA)
+        with self.assertRaises(ValueError):
+            Quan.objects.reserve_slot(self.quan_1.pk, SO_TOI_DA)
+        self.assertEqual(self.so_dai_ly(self.quan_1), SO_TOI_DA)
+
+    def test_reserve_count_over_cap_reserves_nothing(self):
+        with self.assertRaises(ValueError):
+            Quan.objects.reserve_slot(self.quan_1.pk, SO_TOI_DA, count=SO_TOI_DA + 1)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+
+    def test_reserve_without_cap(self):
+        Quan.objects.reserve_slot(self.quan_1.pk, None, count=SO_TOI_DA + 5)
+        self.assertEqual(self.so_dai_ly(self.quan_1), SO_TOI_DA + 5)
+
+    def test_release_slot(self):
+        Quan.objects.reserve_slot(self.quan_1.pk, SO_TOI_DA, count=2)
+        Quan.objects.release_slot(self.quan_1.pk)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 1)
+
+    def test_release_slot_never_goes_negative(self):
+        Quan.objects.release_slot(self.quan_1.pk)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+
+    def test_create_in_full_district_returns_400(self):
+        for _ in range(SO_TOI_DA):
+            response = self.client.post('/api/daily/', self.payload(self.quan_1), content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/daily/', self.payload(self.quan_1), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        self.assertEqual(DaiLy.objects.filter(quan=self.quan_1).count(), SO_TOI_DA)
+        self.assertEqual(self.so_dai_ly(self.quan_1), SO_TOI_DA)
+
+    def test_put_moves_slot_between_districts(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        response = self.client.put(
+            f'/api/daily/{dai_ly.pk}/', self.payload(self.quan_2), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+        self.assertEqual(self.so_dai_ly(self.quan_2), 1)
+
+    def test_put_into_full_district_is_rejected(self):
+        for _ in range(SO_TOI_DA):
+            self.create_dai_ly(self.quan_2)
+        dai_ly = self.create_dai_ly(self.quan_1)
+        response = self.client.put(
+            f'/api/daily/{dai_ly.pk}/', self.payload(self.quan_2), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        dai_ly.refresh_from_db()
+        self.assertEqual(dai_ly.quan_id, self.quan_1.pk)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 1)
+        self.assertEqual(self.so_dai_ly(self.quan_2), SO_TOI_DA)
+
+    def test_put_in_same_full_district_keeps_slot(self):
+        dai_lys = [self.create_dai_ly(self.quan_1) for _ in range(SO_TOI_DA)]
+        response = self.client.put(
+            f'/api/daily/{dai_lys[0].pk}/', self.payload(self.quan_1, ten_dai_ly="Tên mới"),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.so_dai_ly(self.quan_1), SO_TOI_DA)
+
+    def test_delete_releases_slot(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        response = self.client.delete(f'/api/daily/{dai_ly.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+
+    def test_rename_keeps_concurrent_reservation(self):
+        quan = Quan.objects.get(pk=self.quan_1.pk)
+        # Giao dịch khác giữ chỗ sau khi quận đã được đọc
+        Quan.objects.reserve_slot(self.quan_1.pk, SO_TOI_DA)
+        quan.ten_quan = "Quận Một"
+        quan.save()
+        self.assertEqual(self.so_dai_ly(self.quan_1), 1)
+        self.assertEqual(quan.so_dai_ly, 1)
+
+    def test_rename_via_api_keeps_counter(self):
+        self.create_dai_ly(self.quan_1)
+        for method in ('put', 'patch'):
+            with self.subTest(method=method):
+                response = getattr(self.client, method)(
+                    f'/api/quan/{self.quan_1.pk}/', {'ten_quan': f"Quận {method}"}, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['so_dai_ly'], 1)
+                self.assertEqual(self.so_dai_ly(self.quan_1), 1)
+
+    def test_so_dai_ly_is_read_only_in_api(self):
+        response = self.client.patch(
+            f'/api/quan/{self.quan_1.pk}/', {'so_dai_ly': 99}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
@@ -0,0 +1,81 @@
+# backend/api/tests/test_changes.py
+from api.models import DaiLy
+
+from .base import ApiTestCase
+
+URL = '/api/daily/changes/'
+
+
+class ChangesTests(ApiTestCase):
+    """/api/daily/changes/: token đồng bộ delta và dấu xóa"""
+
+    def changes(self, since='', **params):
+        response = self.client.get(URL, {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync_returns_everything(self):
+        dai_lys = [self.create_dai_ly(self.quan_1), self.create_dai_ly(self.quan_2)]
+        result = self.changes()
+        self.assertEqual([row['id'] for row in result['upserted']], [dai_ly.pk for dai_ly in dai_lys])
+        self.assertEqual(result['deleted'], [])
+        self.assertFalse(result['has_more'])
+        self.assertFalse(result['reset'])
+
+    def test_token_returns_only_later_changes(self):
+        first = self.create_dai_ly(self.quan_1)
+        second = self.create_dai_ly(self.quan_1)
+        token = self.changes()['token']
+        self.assertEqual(self.changes(token)['upserted'], [])
+
+        second.ten_dai_ly = "Đã đổi tên"
+        second.save()
+        result = self.changes(token)
+        self.assertEqual([row['id'] for row in result['upserted']], [second.pk])
+        self.assertEqual(result['upserted'][0]['ten_dai_ly'], "Đã đổi tên")
+        self.assertNotEqual(result['token'], token)
+        self.assertNotIn(first.pk, [row['id'] for row in result['upserted']])
+
+    def test_delete_leaves_tombstone(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        kept = self.create_dai_ly(self.quan_1)
+        token = self.changes()['token']
+
+        response = self.client.delete(f'/api/daily/{dai_ly.pk}/')
+        self.assertEqual(response.status_code, 204)
+        result = self.changes(token)
+        self.assertEqual(result['deleted'], [dai_ly.pk])
+        self.assertEqual(result['upserted'], [])
+        # Lần đồng bộ đầu tiên không cần dấu xóa
+        first = self.changes()
+        self.assertEqual(first['deleted'], [])
+        self.assertEqual([row['id'] for row in first['upserted']], [kept.pk])
+
+    def test_paging_resumes_inside_shared_version(self):
+        # bulk touch: ba đại lý cùng một phiên bản
+        ids = [self.create_dai_ly(quan).pk for quan in (self.quan_1, self.quan_1, self.quan_2)]
+        DaiLy.objects.filter(pk__in=ids).touch()
+        token = self.changes()['token']
+        DaiLy.objects.filter(pk__in=ids).touch()
+
+        seen = []
+        while True:
+            result = self.changes(token, page_size=1)
+            seen.extend(row['id'] for row in result['upserted'])
+            token = result['token']
+            if not result['has_more']:
+                break
+            self.assertIn('-', token)
+        self.assertEqual(seen, ids)
+
+    def test_token_from_the_future_resets(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        result = self.changes('999999')
+        self.assertTrue(result['reset'])
+        self.assertEqual([row['id'] for row in result['upserted']], [dai_ly.pk])
+
+    def test_invalid_token_returns_400(self):
+        for token in ('abc', '-1', '1-x', '1-2-3', '1-99999999999999999999999', str(2 ** 63), '1.5'):
+            with self.subTest(token=token):
+                response = self.client.get(URL, {'since': token})
+                self.assertEqual(response.status_code, 400)
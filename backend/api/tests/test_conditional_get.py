@@ -0,0 +1,88 @@
+# backend/api/tests/test_conditional_get.py
+from .base import ApiTestCase
+
+
+class ConditionalGetTests(ApiTestCase):
+    """ETag và 304 Not Modified trên danh sách và chi tiết"""
+
+    def setUp(self):
+        super().setUp()
+        self.dai_ly = self.create_dai_ly(self.quan_1)
+
+    def assert_not_modified(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        return etag
+
+    def test_list_not_modified(self):
+        self.assert_not_modified('/api/daily/')
+
+    def test_detail_not_modified(self):
+        self.assert_not_modified(f'/api/daily/{self.dai_ly.pk}/')
+
+    def test_other_resources_not_modified(self):
+        for url in ('/api/quan/', f'/api/quan/{self.quan_1.pk}/', '/api/loaidaily/', '/api/quydinh/'):
+            with self.subTest(url=url):
+                self.assert_not_modified(url)
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get('/api/daily/')['ETag']
+        self.assertNotEqual(self.client.get('/api/daily/', {'page_size': 1})['ETag'], first)
+
+    def test_write_changes_etag(self):
+        url = '/api/daily/'
+        etag = self.assert_not_modified(url)
+        detail_etag = self.assert_not_modified(f'/api/daily/{self.dai_ly.pk}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, self.payload(self.quan_2), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        response = self.client.get(f'/api/daily/{self.dai_ly.pk}/', HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_etag_returns_body(self):
+        response = self.client.get('/api/daily/', HTTP_IF_NONE_MATCH='"cu"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_not_modified_runs_no_query(self):
+        etag = self.client.get('/api/daily/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/daily/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_head_and_wildcard(self):
+        etag = self.client.head('/api/daily/')['ETag']
+        self.assertEqual(self.client.head('/api/daily/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/daily/', HTTP_IF_NONE_MATCH='*').status_code, 304)
+        self.assertEqual(self.client.get('/api/daily/', HTTP_IF_NONE_MATCH=f'"khac", {etag}').status_code, 304)
+
+    def test_etag_depends_on_format(self):
+        json_etag = self.client.get('/api/daily/', HTTP_ACCEPT='application/json')['ETag']
+        html_etag = self.client.get('/api/daily/', HTTP_ACCEPT='text/html')['ETag']
+        self.assertNotEqual(json_etag, html_etag)
+
+    def test_nested_action_not_modified(self):
+        self.assert_not_modified(f'/api/quan/{self.quan_1.pk}/dai_lys/')
+
+    def test_related_rename_changes_etag(self):
+        # ten_quan được trả kèm mỗi đại lý
+        etag = self.assert_not_modified('/api/daily/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/quan/{self.quan_1.pk}/', {'ten_quan': "Quận Mới"}, content_type='application/json')
+        response = self.client.get('/api/daily/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['ten_quan'], "Quận Mới")
+
+    def test_writes_do_not_get_etag(self):
+        response = self.client.post('/api/daily/', self.payload(self.quan_2), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,84 @@
+# backend/api/tests/test_export.py
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import override_settings
+
+from .base import ApiTestCase
+
+URL = '/api/daily/export/'
+
+
+class ExportTests(ApiTestCase):
+    """/api/daily/export/: CSV/NDJSON dạng luồng, lỗi trả về JSON"""
+
+    def setUp(self):
+        super().setUp()
+        self.a = self.create_dai_ly(self.quan_1, ten_dai_ly="Đại lý Hòa Bình", tien_no=Decimal('10'))
+        self.b = self.create_dai_ly(self.quan_2, ten_dai_ly="Bến Thành", tien_no=Decimal('500'), email='a@b.vn')
+
+    def export(self, **params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv(self):
+        response, body = self.export(format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="daily.csv"', response['Content-Disposition'])
+        self.assertTrue(body.startswith('\ufeff'))
+        rows = list(csv.DictReader(io.StringIO(body[1:])))
+        self.assertEqual([row['id'] for row in rows], [str(self.a.pk), str(self.b.pk)])
+        self.assertEqual(rows[0]['ten_quan'], "Quận 1")
+        self.assertEqual(rows[0]['email'], '')
+        self.assertEqual(rows[1]['tien_no'], '500')
+
+    def test_ndjson(self):
+        response, body = self.export(format='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['ten_dai_ly'] for row in rows], ["Đại lý Hòa Bình", "Bến Thành"])
+        self.assertEqual(rows[1]['email'], 'a@b.vn')
+
+    def test_accept_header_selects_format(self):
+        response = self.client.get(URL, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+
+    def test_filters_and_fields(self):
+        _, body = self.export(format='csv', tien_no__gte='100', fields='id,ten_dai_ly')
+        rows = list(csv.reader(io.StringIO(body[1:])))
+        self.assertEqual(rows, [['id', 'ten_dai_ly'], [str(self.b.pk), "Bến Thành"]])
+
+    def assert_json_error(self, response, status):
+        self.assertEqual(response.status_code, status)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response.json()
+
+    def test_invalid_filter_returns_json_error(self):
+        for export_format in ('csv', 'ndjson'):
+            with self.subTest(export_format=export_format):
+                body = self.assert_json_error(
+                    self.client.get(URL, {'format': export_format, 'tien_no__gte': 'abc'}), 400
+                )
+                self.assertIn('tien_no__gte', body)
+
+    def test_invalid_ordering_returns_json_error(self):
+        body = self.assert_json_error(self.client.get(URL, {'format': 'csv', 'ordering': 'email'}), 400)
+        self.assertIn('ordering', body)
+
+    def test_unsupported_format_returns_json_error(self):
+        body = self.assert_json_error(self.client.get(URL, {'format': 'json'}), 404)
+        self.assertIn('detail', body)
+
+    def test_throttled_returns_json_error(self):
+        throttle = {**settings.API_THROTTLE, 'enabled': True, 'rates': {
+            scope: {'rate': 0.001, 'burst': 1} for scope in settings.API_THROTTLE['rates']
+        }}
+        with override_settings(API_THROTTLE=throttle):
+            self.client.get(URL, {'format': 'csv'}, REMOTE_ADDR='10.9.0.1')
+            body = self.assert_json_error(self.client.get(URL, {'format': 'csv'}, REMOTE_ADDR='10.9.0.1'), 429)
+        self.assertIn('detail', body)
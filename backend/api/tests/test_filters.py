@@ -0,0 +1,66 @@
+# backend/api/tests/test_filters.py
+from decimal import Decimal
+
+from .base import ApiTestCase
+
+URL = '/api/daily/'
+
+
+class FilterTests(ApiTestCase):
+    """Bộ lọc danh sách đại lý: giá trị không hợp lệ trả về 400"""
+
+    def setUp(self):
+        super().setUp()
+        self.nho = self.create_dai_ly(self.quan_1, tien_no=Decimal('10'))
+        self.lon = self.create_dai_ly(self.quan_2, tien_no=Decimal('500'))
+
+    def test_valid_filters(self):
+        response = self.client.get(URL, {'tien_no__gte': '100'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.lon.pk])
+        response = self.client.get(URL, {'quan': f'{self.quan_1.pk}'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.nho.pk])
+
+    def test_invalid_values_return_400(self):
+        cases = [
+            ('tien_no__gte', 'abc'), ('tien_no__gte', 'NaN'), ('tien_no__lte', 'Infinity'),
+            ('tien_no__lte', '-Infinity'), ('tien_no__gte', 'sNaN'), ('tien_no__lte', '-sNaN'),
+            ('quan', 'x'), ('quan', '1,x'), ('quan', str(2 ** 63)), ('loai_dai_ly', str(-2 ** 63 - 1)),
+            ('ngay_tiep_nhan__gte', '2024-13-01'),
+        ]
+        for param, value in cases:
+            with self.subTest(param=param, value=value):
+                response = self.client.get(URL, {param: value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(param, response.json())
+
+    def test_invalid_values_return_400_on_other_endpoints(self):
+        for url in ('/api/daily/search/?keyword=dai', f'/api/quan/{self.quan_1.pk}/dai_lys/', '/api/daily/export/'):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'tien_no__gte': 'NaN'})
+                self.assertEqual(response.status_code, 400)
+
+    def test_invalid_ordering_returns_400(self):
+        response = self.client.get(URL, {'ordering': 'ten_dai_ly'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_combined_filters(self):
+        other = self.create_dai_ly(self.quan_1, tien_no=Decimal('300'))
+        response = self.client.get(URL, {'quan': f'{self.quan_1.pk},{self.quan_2.pk}', 'tien_no__lte': '400'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.nho.pk, other.pk])
+        response = self.client.get(URL, {'loai_dai_ly': str(self.loai.pk), 'tien_no__gte': '10', 'tien_no__lte': '10'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.nho.pk])
+
+    def test_date_filter(self):
+        today = self.nho.ngay_tiep_nhan.isoformat()
+        self.assertEqual(self.client.get(URL, {'ngay_tiep_nhan__gte': today}).json()['count'], 2)
+        self.assertEqual(self.client.get(URL, {'ngay_tiep_nhan__lte': '2000-01-01'}).json()['count'], 0)
+
+    def test_ordering(self):
+        response = self.client.get(URL, {'ordering': '-tien_no'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.lon.pk, self.nho.pk])
+        response = self.client.get(URL, {'ordering': 'tien_no'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.nho.pk, self.lon.pk])
+
+    def test_filters_apply_to_nested_list(self):
+        response = self.client.get(f'/api/quan/{self.quan_2.pk}/dai_lys/', {'tien_no__gte': '1000'})
+        self.assertEqual(response.json()['count'], 0)
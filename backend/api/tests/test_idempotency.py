@@ -0,0 +1,110 @@
+# backend/api/tests/test_idempotency.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from api import idempotency
+from api.models import DaiLy, YeuCauDaXuLy
+
+from .base import ApiTestCase
+
+URL = '/api/daily/'
+
+
+class IdempotencyTests(ApiTestCase):
+    """Idempotency-Key trên POST/PUT/PATCH"""
+
+    def post(self, data, key):
+        return self.client.post(URL, data, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        data = self.payload(self.quan_1)
+        first = self.post(data, 'khoa-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn(idempotency.REPLAYED_HEADER, first)
+
+        second = self.post(data, 'khoa-1')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second[idempotency.REPLAYED_HEADER], 'true')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(DaiLy.objects.count(), 1)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 1)
+
+    def test_without_key_every_request_runs(self):
+        data = self.payload(self.quan_1)
+        self.client.post(URL, data, content_type='application/json')
+        self.client.post(URL, data, content_type='application/json')
+        self.assertEqual(DaiLy.objects.count(), 2)
+        self.assertFalse(YeuCauDaXuLy.objects.exists())
+
+    def test_key_reused_for_other_request_returns_422(self):
+        self.post(self.payload(self.quan_1), 'khoa-1')
+        response = self.post(self.payload(self.quan_1, ten_dai_ly="Khác"), 'khoa-1')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('error', response.json())
+        self.assertEqual(DaiLy.objects.count(), 1)
+
+    def test_key_reused_for_other_path_returns_422(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        self.post(self.payload(self.quan_1), 'khoa-1')
+        response = self.client.put(
+            f'{URL}{dai_ly.pk}/', self.payload(self.quan_1), content_type='application/json',
+            HTTP_IDEMPOTENCY_KEY='khoa-1'
+        )
+        self.assertEqual(response.status_code, 422)
+
+    def test_error_response_is_replayed(self):
+        data = self.payload(self.quan_1, dien_thoai='123')
+        first = self.post(data, 'khoa-1')
+        self.assertEqual(first.status_code, 400)
+        second = self.post(data, 'khoa-1')
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(second[idempotency.REPLAYED_HEADER], 'true')
+
+    def test_key_too_long_returns_400(self):
+        response = self.post(self.payload(self.quan_1), 'k' * (idempotency.MAX_KEY_LENGTH + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        self.assertFalse(DaiLy.objects.exists())
+
+    def test_patch_replay_does_not_apply_twice(self):
+        dai_ly = self.create_dai_ly(self.quan_1)
+        url = f'{URL}{dai_ly.pk}/'
+        for _ in range(2):
+            response = self.client.patch(
+                url, {'quan': self.quan_2.pk}, content_type='application/json', HTTP_IDEMPOTENCY_KEY='doi-quan'
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.so_dai_ly(self.quan_1), 0)
+        self.assertEqual(self.so_dai_ly(self.quan_2), 1)
+
+    def test_reads_ignore_key(self):
+        response = self.client.get(URL, HTTP_IDEMPOTENCY_KEY='doc')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(YeuCauDaXuLy.objects.exists())
+
+    def test_expired_key_runs_again(self):
+        data = self.payload(self.quan_1)
+        self.post(data, 'khoa-1')
+        with self.settings(IDEMPOTENCY={**settings.IDEMPOTENCY, 'ttl_seconds': -1}):
+            response = self.post(data, 'khoa-1')
+        self.assertNotIn(idempotency.REPLAYED_HEADER, response)
+        self.assertEqual(DaiLy.objects.count(), 2)
+
+    def test_purge(self):
+        now = timezone.now()
+        for n in range(5):
+            YeuCauDaXuLy.objects.create(khoa=f'k{n}', dau_van_tay='x', tao_luc=now - timedelta(hours=n))
+        YeuCauDaXuLy.objects.purge(now - timedelta(hours=3, minutes=30), max_entries=2)
+        self.assertEqual(sorted(YeuCauDaXuLy.objects.values_list('khoa', flat=True)), ['k2', 'k3'])
+
+    def test_error_follows_content_negotiation(self):
+        self.post(self.payload(self.quan_1), 'khoa-1')
+        response = self.client.post(
+            URL, self.payload(self.quan_2), content_type='application/json',
+            HTTP_IDEMPOTENCY_KEY='khoa-1', HTTP_ACCEPT='text/html'
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
@@ -0,0 +1,156 @@
+# backend/api/tests/test_import_daily.py
+import csv
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+
+from api.management.commands import import_daily
+from api.models import DaiLy, TienDoNhap
+
+from .base import ApiTestCase, SO_TOI_DA
+
+COLUMNS = ['ten_dai_ly', 'dien_thoai', 'dia_chi', 'ten_quan', 'ten_loai_dai_ly', 'email', 'tien_no']
+
+
+class Crash(Exception):
+    """Giả lập tiến trình bị dừng giữa hai khối"""
+
+
+class ImportDailyTests(ApiTestCase):
+    """Lệnh import_daily: kiểm tra dòng, file lỗi, số đại lý tối đa trong quận, tiếp tục sau khi dừng"""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp(prefix='qldl-import-')
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.path = os.path.join(self.directory, 'daily.csv')
+
+    def row(self, ten_dai_ly, quan="Quận 1", **fields):
+        return {
+            'ten_dai_ly': ten_dai_ly, 'dien_thoai': '0901234567', 'dia_chi': "1 Lê Lợi",
+            'ten_quan': quan, 'ten_loai_dai_ly': "Loại 1", 'email': '', 'tien_no': '0', **fields,
+        }
+
+    def write(self, rows):
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command('import_daily', self.path, *args, stdout=out)
+        return out.getvalue()
+
+    def rejects(self):
+        with open(f"{self.path}.rejects.csv", encoding='utf-8-sig') as f:
+            return list(csv.DictReader(f))
+
+    def test_imports_valid_rows(self):
+        self.write([self.row("A", tien_no='1,000'), self.row("B", quan="Quận 2", email='b@x.vn')])
+        self.run_import()
+        self.assertEqual(
+            list(DaiLy.objects.order_by('id').values_list('ten_dai_ly', 'quan_id', 'tien_no')),
+            [("A", self.quan_1.pk, Decimal('1000')), ("B", self.quan_2.pk, Decimal('0'))]
+        )
+        self.assertEqual(self.so_dai_ly(self.quan_1), 1)
+        self.assertFalse(os.path.exists(f"{self.path}.rejects.csv"))
+        response = self.client.get('/api/daily/search/', {'keyword': 'b'})
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_invalid_rows_go_to_rejects_file(self):
+        self.write([
+            self.row("Tốt"),
+            self.row(""),
+            self.row("Điện thoại", dien_thoai='123'),
+            self.row("Email", email='khong-hop-le'),
+            self.row("Quận lạ", quan="Quận 99"),
+            self.row("Chữ", tien_no='abc'),
+            self.row("NaN", tien_no='NaN'),
+            self.row("Vô cực", tien_no='Infinity'),
+            self.row("sNaN", tien_no='-sNaN'),
+            self.row("Âm", tien_no='-1'),
+            self.row("Lẻ", tien_no='1.5'),
+            self.row("Vượt nợ", tien_no=str(self.loai.no_toi_da + 1)),
+            self.row("x" * 101),
+            self.row("Địa chỉ dài", dia_chi="d" * 201),
+        ])
+        self.run_import()
+        self.assertEqual(list(DaiLy.objects.values_list('ten_dai_ly', flat=True)), ["Tốt"])
+        rejects = self.rejects()
+        self.assertEqual([int(row['dong']) for row in rejects], list(range(3, 16)))
+        self.assertTrue(all(row['loi'] for row in rejects))
+        self.assertIn("tối đa 100 ký tự", rejects[-2]['loi'])
+
+    def test_district_cap(self):
+        self.write([self.row(f"Đại lý {n}") for n in range(SO_TOI_DA + 2)])
+        self.run_import('--chunk-size', '1')
+        self.assertEqual(DaiLy.objects.count(), SO_TOI_DA)
+        self.assertEqual(self.so_dai_ly(self.quan_1), SO_TOI_DA)
+        self.assertEqual(len(self.rejects()), 2)
+        self.assertIn("tối đa", self.rejects()[0]['loi'])
+
+    def test_resume_after_crash_does_not_duplicate(self):
+        self.write([self.row(f"Đại lý {n}", quan="Quận 1" if n % 2 else "Quận 2") for n in range(4)]
+                   + [self.row("Lỗi", dien_thoai='1')])
+        original = import_daily.Command.import_chunk
+        calls = []
+
+        def crash_after_first_chunk(command, *args):
+            result = original(command, *args)
+            calls.append(1)
+            if len(calls) == 1:
+                raise Crash
+            return result
+
+        with mock.patch.object(import_daily.Command, 'import_chunk', crash_after_first_chunk):
+            with self.assertRaises(Crash):
+                self.run_import('--chunk-size', '2')
+        self.assertEqual(DaiLy.objects.count(), 2)
+        state = TienDoNhap.objects.get()
+        self.assertEqual((state.so_dong, state.so_da_nhap, state.so_bi_tu_choi), (2, 2, 0))
+
+        out = self.run_import('--chunk-size', '2')
+        self.assertIn("tiếp tục từ dòng 3", out)
+        self.assertEqual(
+            sorted(DaiLy.objects.values_list('ten_dai_ly', flat=True)), [f"Đại lý {n}" for n in range(4)]
+        )
+        state.refresh_from_db()
+        self.assertEqual((state.so_dong, state.so_da_nhap, state.so_bi_tu_choi), (5, 4, 1))
+        self.assertEqual(len(self.rejects()), 1)
+
+        # Đã nhập hết: chạy lại không thêm gì
+        self.run_import()
+        self.assertEqual(DaiLy.objects.count(), 4)
+
+    def test_changed_file_restarts(self):
+        self.write([self.row("A")])
+        self.run_import()
+        self.write([self.row("A"), self.row("B", quan="Quận 2")])
+        os.utime(self.path, ns=(0, 0))
+        out = self.run_import()
+        self.assertIn("file đã thay đổi", out)
+        self.assertEqual(DaiLy.objects.count(), 3)
+
+    def test_restart_option(self):
+        self.write([self.row("A")])
+        self.run_import()
+        self.run_import('--restart')
+        self.assertEqual(DaiLy.objects.count(), 2)
+        self.assertEqual(TienDoNhap.objects.get().so_dong, 1)
+
+    def test_command_errors(self):
+        with self.assertRaises(CommandError):
+            call_command('import_daily', os.path.join(self.directory, 'khong-co.csv'), stdout=StringIO())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("ten_dai_ly,dien_thoai\nA,0901234567\n")
+        with self.assertRaisesMessage(CommandError, "thiếu cột"):
+            self.run_import()
+        self.write([self.row("A")])
+        with self.assertRaises(CommandError):
+            self.run_import('--chunk-size', '0')
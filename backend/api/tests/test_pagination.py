@@ -0,0 +1,77 @@
+# backend/api/tests/test_pagination.py
+import base64
+import json
+from decimal import Decimal
+
+from .base import ApiTestCase
+
+URL = '/api/daily/'
+
+
+def cursor(ordering, position, reverse=False):
+    payload = json.dumps({'o': ordering, 'p': position, 'r': int(reverse)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+class CursorTests(ApiTestCase):
+    """Phân trang keyset (?pagination=cursor): cursor không hợp lệ trả về 404"""
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [
+            self.create_dai_ly(quan, tien_no=Decimal(tien_no)).pk
+            for quan, tien_no in ((self.quan_1, '30'), (self.quan_1, '10'), (self.quan_2, '20'))
+        ]
+
+    def test_next_links_cover_every_row(self):
+        url, seen = f'{URL}?pagination=cursor&ordering=-tien_no&page_size=1', []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.json()['results'])
+            url = response.json()['next']
+        self.assertEqual(seen, [self.ids[0], self.ids[2], self.ids[1]])
+
+    def test_invalid_cursors_return_404(self):
+        cases = [
+            ('id', 'khong-phai-base64'),
+            ('id', cursor('id', [str(2 ** 63)])),
+            ('id', cursor('id', ['abc'])),
+            ('tien_no', cursor('tien_no', ['NaN', '1'])),
+            ('tien_no', cursor('tien_no', ['Infinity', '1'])),
+            ('tien_no', cursor('tien_no', ['-sNaN', '1'])),
+            ('tien_no', cursor('tien_no', ['10', str(-2 ** 63 - 1)])),
+            ('tien_no', cursor('id', ['1'])),
+            ('id', cursor('id', ['1', '2'])),
+        ]
+        for ordering, token in cases:
+            with self.subTest(ordering=ordering, token=token):
+                response = self.client.get(URL, {'pagination': 'cursor', 'ordering': ordering, 'cursor': token})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json()['detail'], "Cursor không hợp lệ.")
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(URL, {'pagination': 'cursor', 'page_size': 2}).json()
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in second['results']], self.ids[2:])
+        self.assertIsNone(second['next'])
+        back = self.client.get(second['previous']).json()
+        self.assertEqual([row['id'] for row in back['results']], self.ids[:2])
+
+    def test_rows_added_between_pages_are_not_repeated(self):
+        first = self.client.get(URL, {'pagination': 'cursor', 'page_size': 2}).json()
+        added = self.create_dai_ly(self.quan_2)
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in second['results']], [self.ids[2], added.pk])
+
+    def test_sparse_fields_keep_cursor(self):
+        response = self.client.get(
+            URL, {'pagination': 'cursor', 'ordering': 'tien_no', 'page_size': 1, 'fields': 'ten_dai_ly'}
+        ).json()
+        self.assertEqual(list(response['results'][0]), ['ten_dai_ly'])
+        self.assertIsNotNone(response['next'])
+
+    def test_unknown_ordering_returns_400(self):
+        response = self.client.get(URL, {'pagination': 'cursor', 'ordering': 'ten_dai_ly'})
+        self.assertEqual(response.status_code, 400)
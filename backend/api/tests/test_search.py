@@ -0,0 +1,65 @@
+# backend/api/tests/test_search.py
+from django.db import connection
+
+from api import search
+from api.models import DaiLy
+
+from .base import ApiTestCase
+
+URL = '/api/daily/search/'
+
+
+class SearchTests(ApiTestCase):
+    """/api/daily/search/: FTS5, không dấu, khớp tiền tố, xếp theo mức độ liên quan"""
+
+    def setUp(self):
+        super().setUp()
+        self.hoa_binh = self.create_dai_ly(self.quan_1, ten_dai_ly="Đại lý Hòa Bình")
+        self.ben_thanh = self.create_dai_ly(self.quan_2, ten_dai_ly="Cửa hàng Bến Thành", dia_chi="12 Hòa Hảo")
+
+    def ids(self, keyword, **params):
+        response = self.client.get(URL, {'keyword': keyword, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['results']]
+
+    def test_fts_index_exists(self):
+        self.assertTrue(search.is_available(connection))
+
+    def test_fold(self):
+        self.assertEqual(search.fold("Đại Lý Hòa Bình"), "dai ly hoa binh")
+
+    def test_accent_insensitive_prefix_match(self):
+        self.assertEqual(self.ids("dai ly hoa"), [self.hoa_binh.pk])
+        self.assertEqual(self.ids("BEN th"), [self.ben_thanh.pk])
+
+    def test_name_ranks_above_address(self):
+        self.assertEqual(self.ids("hoa"), [self.hoa_binh.pk, self.ben_thanh.pk])
+
+    def test_combined_with_filters(self):
+        self.assertEqual(self.ids("hoa", quan=str(self.quan_2.pk)), [self.ben_thanh.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.hoa_binh.ten_dai_ly = "Đại lý Phú Mỹ"
+        self.hoa_binh.save()
+        self.assertEqual(self.ids("phu my"), [self.hoa_binh.pk])
+        self.assertEqual(self.ids("binh"), [])
+        self.client.delete(f'/api/daily/{self.hoa_binh.pk}/')
+        self.assertEqual(self.ids("phu my"), [])
+
+    def test_empty_keyword_returns_nothing(self):
+        response = self.client.get(URL, {'keyword': '  '})
+        self.assertEqual(response.json()['count'], 0)
+        self.assertEqual(self.ids("!!!"), [])
+
+    def test_pagination(self):
+        response = self.client.get(URL, {'keyword': 'hoa', 'page_size': 1})
+        self.assertEqual(response.json()['count'], 2)
+        self.assertIsNotNone(response.json()['next'])
+        self.assertEqual(self.client.get(URL, {'keyword': 'hoa', 'page': 0}).status_code, 404)
+
+    def test_rebuild_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.FTS_TABLE}")
+        self.assertEqual(self.ids("hoa"), [])
+        search.rebuild_index(DaiLy.objects.all())
+        self.assertEqual(sorted(self.ids("hoa")), sorted([self.hoa_binh.pk, self.ben_thanh.pk]))
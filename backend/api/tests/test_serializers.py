@@ -0,0 +1,43 @@
+# backend/api/tests/test_serializers.py
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import LoaiDaiLy, Quan
+
+from .base import ApiTestCase
+
+
+class SoDaiLyTests(ApiTestCase):
+    """so_dai_ly của quận và loại đại lý: đúng giá trị, số truy vấn không tăng theo số dòng"""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_so_dai_ly_values(self):
+        for quan in (self.quan_1, self.quan_1, self.quan_2):
+            self.create_dai_ly(quan)
+        quans = {row['id']: row['so_dai_ly'] for row in self.client.get('/api/quan/').json()['results']}
+        self.assertEqual(quans, {self.quan_1.pk: 2, self.quan_2.pk: 1})
+        loais = self.client.get('/api/loaidaily/').json()['results']
+        self.assertEqual([(row['id'], row['so_dai_ly']) for row in loais], [(self.loai.pk, 3)])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for url in ('/api/quan/', '/api/loaidaily/'):
+            with self.subTest(url=url):
+                before = self.count_queries(url)
+                for n in range(5):
+                    quan = Quan.objects.create(ten_quan=f"Quận thêm {n}")
+                    loai = LoaiDaiLy.objects.create(ten_loai_dai_ly=f"Loại thêm {n}", no_toi_da=100)
+                    self.create_dai_ly(quan, loai_dai_ly=loai)
+                self.assertEqual(self.count_queries(url), before)
+
+    def test_excluding_so_dai_ly_skips_count(self):
+        self.create_dai_ly(self.quan_1)
+        response = self.client.get('/api/loaidaily/', {'exclude': 'so_dai_ly'})
+        self.assertNotIn('so_dai_ly', response.json()['results'][0])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/loaidaily/', {'exclude': 'so_dai_ly'})
+        self.assertFalse(any('COUNT("api_daily"' in query['sql'] for query in queries.captured_queries))
@@ -0,0 +1,155 @@
+# backend/api/tests/test_throttling.py
+import itertools
+import os
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from api.throttling import BucketStore, key_hash
+
+from .base import ApiTestCase
+
+SEARCH_URL = '/api/daily/search/'
+
+_networks = itertools.count(1)
+
+
+class TokenBucketThrottleTests(ApiTestCase):
+    """Giới hạn theo client và nhóm route, header RateLimit-* và Retry-After"""
+
+    BURST = 3
+
+    def setUp(self):
+        super().setUp()
+        # Nạp lại rất chậm: không có token nào được trả lại trong lúc chạy test
+        throttle = {**settings.API_THROTTLE, 'enabled': True, 'rates': {
+            scope: {'rate': 0.001, 'burst': self.BURST} for scope in settings.API_THROTTLE['rates']
+        }}
+        test_settings = override_settings(API_THROTTLE=throttle)
+        test_settings.enable()
+        self.addCleanup(test_settings.disable)
+        # Bảng bucket nằm trong file dùng chung cho cả lớp: mỗi test một dải địa chỉ riêng
+        self.addr = f'10.25.{next(_networks)}.'
+
+    def search(self, client_addr, **extra):
+        return self.client.get(SEARCH_URL, {'q': 'đại'}, REMOTE_ADDR=client_addr, **extra)
+
+    def test_burst_then_429(self):
+        addr = self.addr + '1'
+        statuses = [self.search(addr).status_code for _ in range(self.BURST + 2)]
+        self.assertEqual(statuses, [200] * self.BURST + [429, 429])
+
+    def test_rate_limit_headers(self):
+        addr = self.addr + '1'
+        response = self.search(addr)
+        self.assertEqual(response['RateLimit-Limit'], str(self.BURST))
+        self.assertEqual(response['RateLimit-Remaining'], str(self.BURST - 1))
+        for _ in range(self.BURST - 1):
+            self.search(addr)
+        response = self.search(addr)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['RateLimit-Remaining'], '0')
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertGreater(int(response['RateLimit-Reset']), 0)
+
+    def test_forwarded_for_does_not_bypass(self):
+        # NUM_PROXIES = 0: X-Forwarded-For do client gửi không đổi được danh tính
+        addr = self.addr + '1'
+        statuses = [
+            self.search(addr, HTTP_X_FORWARDED_FOR=f'{self.addr}{100 + i}').status_code
+            for i in range(self.BURST + 2)
+        ]
+        self.assertEqual(statuses.count(429), 2)
+
+    def test_forwarded_for_with_trusted_proxy(self):
+        # Sau một proxy tin cậy, client là địa chỉ cuối cùng proxy thêm vào X-Forwarded-For
+        proxy, client, other = self.addr + '1', self.addr + '101', self.addr + '102'
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            for _ in range(self.BURST):
+                self.assertEqual(self.search(proxy, HTTP_X_FORWARDED_FOR=client).status_code, 200)
+            self.assertEqual(self.search(proxy, HTTP_X_FORWARDED_FOR=client).status_code, 429)
+            self.assertEqual(self.search(proxy, HTTP_X_FORWARDED_FOR=other).status_code, 200)
+            # Địa chỉ giả do client chèn vào đầu header không được dùng
+            self.assertEqual(
+                self.search(proxy, HTTP_X_FORWARDED_FOR=f'{other}, {client}').status_code, 429)
+
+    def test_clients_are_separate(self):
+        for _ in range(self.BURST):
+            self.search(self.addr + '1')
+        self.assertEqual(self.search(self.addr + '1').status_code, 429)
+        self.assertEqual(self.search(self.addr + '2').status_code, 200)
+
+    def test_route_classes_are_separate(self):
+        addr = self.addr + '1'
+        for _ in range(self.BURST):
+            self.search(addr)
+        self.assertEqual(self.search(addr).status_code, 429)
+        self.assertEqual(self.client.get('/api/quan/', REMOTE_ADDR=addr).status_code, 200)
+        response = self.client.post('/api/daily/', self.payload(self.quan_1), content_type='application/json',
+                                    REMOTE_ADDR=addr)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['RateLimit-Remaining'], str(self.BURST - 1))
+
+    def test_batch_sub_requests_are_throttled(self):
+        addr = self.addr + '1'
+        items = [{'path': SEARCH_URL + '?q=a'} for _ in range(self.BURST + 1)]
+        response = self.client.post('/api/batch/', items, content_type='application/json', REMOTE_ADDR=addr)
+        self.assertEqual(response.status_code, 200)
+        statuses = [result['status'] for result in response.json()['responses']]
+        self.assertEqual(statuses, [200] * self.BURST + [429])
+        self.assertEqual(self.search(addr).status_code, 429)
+
+    def test_disabled(self):
+        addr = self.addr + '1'
+        with override_settings(API_THROTTLE={**settings.API_THROTTLE, 'enabled': False}):
+            statuses = [self.search(addr).status_code for _ in range(self.BURST + 2)]
+            self.assertNotIn('RateLimit-Limit', self.search(addr))
+        self.assertEqual(statuses, [200] * (self.BURST + 2))
+
+
+class BucketStoreTests(SimpleTestCase):
+    """Bảng bucket trong file ánh xạ bộ nhớ"""
+
+    def store(self, slots=64):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = BucketStore(os.path.join(directory.name, 'buckets'), slots)
+        self.addCleanup(store.close)
+        return store
+
+    def test_refill(self):
+        store = self.store()
+        self.assertEqual(store.take('k', 2, 2, now=100.0), (True, 1.0))
+        self.assertEqual(store.take('k', 2, 2, now=100.0), (True, 0.0))
+        self.assertEqual(store.take('k', 2, 2, now=100.0), (False, 0.0))
+        # 0,5 giây với 2 token/giây: nạp lại đúng một token
+        self.assertEqual(store.take('k', 2, 2, now=100.5), (True, 0.0))
+        # Không vượt quá burst dù chờ lâu
+        self.assertEqual(store.take('k', 2, 2, now=1000.0), (True, 1.0))
+
+    def test_clock_going_back_does_not_refill(self):
+        store = self.store()
+        store.take('k', 1, 1, now=100.0)
+        self.assertEqual(store.take('k', 1, 1, now=50.0), (False, 0.0))
+
+    def test_shared_between_instances(self):
+        store = self.store()
+        other = BucketStore(store.path, store.slots)
+        self.addCleanup(other.close)
+        store.take('k', 1, 1, now=100.0)
+        self.assertEqual(other.take('k', 1, 1, now=100.0), (False, 0.0))
+
+    def test_full_table_evicts_least_recently_used(self):
+        store = self.store(slots=4)
+        for i in range(4):
+            store.take(f'k{i}', 1, 1, now=100.0 + i)
+        # Bảng đầy: khóa mới lấy ô của bucket cũ nhất, các bucket khác giữ nguyên
+        self.assertEqual(store.take('new', 1, 1, now=200.0), (True, 0.0))
+        self.assertEqual(store.take('new', 1, 1, now=200.0), (False, 0.0))
+        self.assertEqual(store.take('k3', 1, 1, now=103.0), (False, 0.0))
+
+    def test_key_hash(self):
+        self.assertEqual(key_hash('read:10.0.0.1'), key_hash('read:10.0.0.1'))
+        self.assertNotEqual(key_hash('read:10.0.0.1'), key_hash('search:10.0.0.1'))
+        self.assertNotEqual(key_hash(''), 0)
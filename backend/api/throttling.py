@@ -0,0 +1,190 @@
+# backend/api/throttling.py
+"""
+Per-client token-bucket throttling, shared between worker processes.
+
+Every (route class, client) pair has a bucket of ``burst`` tokens refilled
+at ``rate`` tokens per second; a request takes one token or is answered 429
+with Retry-After. Route classes are ``read`` (GET/HEAD), ``search``
+(``/api/daily/search/``, which is the expensive read) and ``write``; the
+limits live in ``settings.API_THROTTLE``.
+
+Buckets are kept in a fixed-size open-addressing hash table in a
+memory-mapped file (``API_THROTTLE['path']``), so all processes of the
+server see the same buckets without a database query or a cache server. A
+slot is (8-byte key hash, tokens, last refill time); a full probe sequence
+evicts the least recently used slot, whose bucket has refilled the most
+and so loses the least. Updates hold an ``fcntl`` lock on the file (and a
+thread lock, since POSIX record locks are per process). Without fcntl
+(Windows) the table is only shared between the threads of one process.
+
+``RateLimitHeadersMiddleware`` adds RateLimit-Limit / RateLimit-Remaining /
+RateLimit-Reset to the response of every throttled request.
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+READ = 'read'
+SEARCH = 'search'
+WRITE = 'write'
+SEARCH_ACTIONS = ('search',)
+
+# Hash khóa, số token, thời điểm nạp lại gần nhất
+SLOT = struct.Struct('<Qdd')
+PROBES = 8
+
+
+def key_hash(key):
+    """Hash 64 bit ổn định giữa các tiến trình (hash() của Python thay đổi theo tiến trình), khác 0"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+class BucketStore:
+    """Bảng token bucket trong một file ánh xạ bộ nhớ, dùng chung giữa các tiến trình"""
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+
+    def _open(self):
+        # Mở lại sau fork: mỗi tiến trình có mmap và khóa fcntl riêng
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = self.slots * SLOT.size
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._fd, self._map, self._pid = fd, mmap.mmap(fd, size), os.getpid()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._fd = self._map = self._pid = None
+
+    def take(self, key, rate, burst, now=None):
+        """
+        Lấy một token từ bucket của key. Trả về (được phép hay không, số token
+        còn lại sau khi lấy).
+        """
+        h = key_hash(key)
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                return self._take(h, rate, burst, now)
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def _take(self, h, rate, burst, now):
+        table, slots = self._map, self.slots
+        offset = tokens = last = None
+        oldest = None
+        for probe in range(PROBES):
+            slot_offset = ((h + probe) % slots) * SLOT.size
+            slot_hash, slot_tokens, slot_last = SLOT.unpack_from(table, slot_offset)
+            if slot_hash == h:
+                offset, tokens, last = slot_offset, slot_tokens, slot_last
+                break
+            if slot_hash == 0:
+                offset = slot_offset
+                break
+            if oldest is None or slot_last < oldest[1]:
+                oldest = (slot_offset, slot_last)
+        if offset is None:
+            offset = oldest[0]
+
+        if tokens is None:
+            tokens = float(burst)
+        else:
+            # Đồng hồ lùi (chỉnh giờ hệ thống) thì không nạp thêm
+            tokens = min(float(burst), tokens + max(0.0, now - last) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        SLOT.pack_into(table, offset, h, tokens, now)
+        return allowed, tokens
+
+
+_store = None
+
+
+def get_store():
+    """BucketStore theo cấu hình hiện tại (mở lại nếu đường dẫn hoặc số ô thay đổi)"""
+    global _store
+    config = settings.API_THROTTLE
+    if _store is None or (_store.path, _store.slots) != (config['path'], config['slots']):
+        if _store is not None:
+            _store.close()
+        _store = BucketStore(config['path'], config['slots'])
+    return _store
+
+
+def route_class(request, view):
+    """Nhóm giới hạn của request: read, search hoặc write"""
+    if getattr(view, 'action', None) in SEARCH_ACTIONS:
+        return SEARCH
+    return READ if request.method in SAFE_METHODS else WRITE
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Giới hạn tốc độ theo client và nhóm route. Client là get_ident() của DRF:
+    REMOTE_ADDR, hoặc địa chỉ trong X-Forwarded-For do các proxy tin cậy thêm
+    vào khi REST_FRAMEWORK['NUM_PROXIES'] > 0 (settings.py đặt 0 theo mặc định).
+    """
+
+    def allow_request(self, request, view):
+        config = settings.API_THROTTLE
+        if not config['enabled']:
+            return True
+        scope = route_class(request, view)
+        rate, burst = config['rates'][scope]['rate'], config['rates'][scope]['burst']
+        allowed, tokens = get_store().take(f"{scope}:{self.get_ident(request)}", rate, burst)
+        self.wait_seconds = None if allowed else (1 - tokens) / rate
+        # Đọc lại trong RateLimitHeadersMiddleware (request gốc của Django)
+        request._request.rate_limit = (burst, int(tokens), math.ceil((burst - tokens) / rate))
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RateLimitHeadersMiddleware:
+    """Thêm RateLimit-Limit/Remaining/Reset vào phản hồi của request đã qua throttle"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response['RateLimit-Limit'] = str(limit)
+            response['RateLimit-Remaining'] = str(remaining)
+            response['RateLimit-Reset'] = str(reset)
+        return response
@@ -1,6 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
+from .batch import BATCH_ROUTE
+from .metrics import metrics_view, METRICS_ROUTE
 
 router = DefaultRouter()
 router.register(r'quan', views.QuanViewSet)
@@ -8,4 +10,8 @@ router.register(r'loaidaily', views.LoaiDaiLyViewSet)
 router.register(r'daily', views.DaiLyViewSet)
 router.register(r'quydinh', views.QuyDinhViewSet)
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path('_metrics', metrics_view, name=METRICS_ROUTE),
+    path('batch/', views.batch, name=BATCH_ROUTE),
+    path('bootstrap/', views.BootstrapView.as_view(), name='bootstrap'),
+] + router.urls
@@ -1,32 +1,70 @@
 # backend/api/views.py
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, throttle_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from rest_framework.views import APIView
+from django.http import Http404
+from . import stamps
+from .batch import BatchError, parse_items, run_batch
+from .bulk import bulk_save_dai_lys, MODES, MODE_ATOMIC, MODE_PARTIAL
+from .changes import dai_ly_changes
+from .export import stream_export
+from .filters import DaiLyFilterBackend, DaiLyOrderingFilter, dai_ly_lookups, dai_ly_ordering
+from .mixins import ConditionalGetMixin, IdempotencyMixin
 from .models import Quan, LoaiDaiLy, DaiLy, QuyDinh
-from .serializers import QuanSerializer, LoaiDaiLySerializer, DaiLySerializer, QuyDinhSerializer
+from .pagination import KeysetPagination, SearchPagination, parse_id
+from .regulations import quy_dinh_registry
+from .renderers import CSVRenderer, NDJSONRenderer
+from .search import search_filter, search_ids
+from .serializers import (
+    QuanSerializer, LoaiDaiLySerializer, DaiLySerializer, QuyDinhSerializer, AdjustDebtSerializer
+)
 
 
-class QuanViewSet(viewsets.ModelViewSet):
+BULK_MAX_ITEMS = 10000
+CHANGES_PAGE_SIZE = 1000
+CHANGES_MAX_PAGE_SIZE = 10000
+
+
+def dai_ly_queryset():
+    """Queryset đại lý dùng chung cho mọi endpoint đọc (đã JOIN quận và loại đại lý)"""
+    return DaiLy.objects.with_related().order_by('id')
+
+
+def filter_dai_lys(request, queryset):
+    """Áp dụng bộ lọc và sắp xếp của /api/daily/ cho một queryset đại lý bất kỳ"""
+    for backend in DaiLyViewSet.filter_backends:
+        queryset = backend().filter_queryset(request, queryset, None)
+    return queryset
+
+
+class QuanViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Quan.objects.all()
     serializer_class = QuanSerializer
+    # so_dai_ly thay đổi theo đại lý; action dai_lys trả kèm tên loại đại lý
+    etag_stamps = (stamps.QUAN, stamps.DAI_LY, stamps.LOAI_DAI_LY)
+
+    def get_queryset(self):
+        return QuanSerializer.prune_queryset(Quan.objects.order_by('id'), self.request)
 
     @action(detail=True, methods=['get'])
     def dai_lys(self, request, pk=None):
         """Lấy danh sách đại lý thuộc quận"""
         quan = self.get_object()
-        dai_lys = DaiLy.objects.filter(quan=quan)
-        serializer = DaiLySerializer(dai_lys, many=True)
-        return Response(serializer.data)
+        dai_lys = DaiLySerializer.prune_queryset(dai_ly_queryset().filter(quan=quan), request)
+        page = self.paginate_queryset(filter_dai_lys(request, dai_lys))
+        serializer = DaiLySerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def count_daily(self, request):
         """Lấy số lượng đại lý theo quận"""
-        quans = Quan.objects.annotate(so_daily=Count('dai_lys'))
+        quans = Quan.objects.order_by('id')
         data = [{
             'id': quan.id,
             'ten_quan': quan.ten_quan,
-            'so_daily': quan.so_daily
+            'so_daily': quan.so_dai_ly
         } for quan in quans]
         return Response(data)
 
@@ -41,17 +79,32 @@ class QuanViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class LoaiDaiLyViewSet(viewsets.ModelViewSet):
+class LoaiDaiLyViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = LoaiDaiLy.objects.all()
     serializer_class = LoaiDaiLySerializer
+    # so_dai_ly thay đổi theo đại lý; action dai_lys trả kèm tên quận
+    etag_stamps = (stamps.LOAI_DAI_LY, stamps.DAI_LY, stamps.QUAN)
+
+    def get_queryset(self):
+        queryset = LoaiDaiLy.objects.order_by('id')
+        # Chỉ đếm đại lý (GROUP BY) khi so_dai_ly được yêu cầu
+        if LoaiDaiLySerializer.wants(self.request, 'so_dai_ly'):
+            queryset = queryset.with_so_dai_ly()
+        return LoaiDaiLySerializer.prune_queryset(queryset, self.request)
+
+    def perform_create(self, serializer):
+        # Loại đại lý mới chưa có đại lý nào, không cần đếm lại
+        instance = serializer.save()
+        instance.so_dai_ly = 0
 
     @action(detail=True, methods=['get'])
     def dai_lys(self, request, pk=None):
         """Lấy danh sách đại lý thuộc loại đại lý"""
         loai = self.get_object()
-        dai_lys = DaiLy.objects.filter(loai_dai_ly=loai)
-        serializer = DaiLySerializer(dai_lys, many=True)
-        return Response(serializer.data)
+        dai_lys = DaiLySerializer.prune_queryset(dai_ly_queryset().filter(loai_dai_ly=loai), request)
+        page = self.paginate_queryset(filter_dai_lys(request, dai_lys))
+        serializer = DaiLySerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
 
     def update(self, request, *args, **kwargs):
         """Ghi đè phương thức cập nhật để kiểm tra ràng buộc"""
@@ -84,24 +137,116 @@ class LoaiDaiLyViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class DaiLyViewSet(viewsets.ModelViewSet):
+class DaiLyViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = DaiLy.objects.all()
     serializer_class = DaiLySerializer
+    # ten_quan và ten_loai_dai_ly được trả kèm mỗi đại lý
+    etag_stamps = (stamps.DAI_LY, stamps.QUAN, stamps.LOAI_DAI_LY)
+    # ?quan=, ?loai_dai_ly=, ?tien_no__gte/lte=, ?ngay_tiep_nhan__gte/lte=, ?ordering= (xem api/filters.py)
+    filter_backends = [DaiLyFilterBackend, DaiLyOrderingFilter]
+
+    def get_queryset(self):
+        return DaiLySerializer.prune_queryset(dai_ly_queryset(), self.request)
+
+    @property
+    def paginator(self):
+        """Mặc định phân trang theo số trang; ?pagination=cursor dùng phân trang keyset"""
+        if not hasattr(self, '_paginator'):
+            if self.request is not None and self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = KeysetPagination()
+            else:
+                return super().paginator
+        return self._paginator
 
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Tìm kiếm đại lý"""
-        keyword = request.query_params.get('keyword', '')
-        if keyword:
-            dai_lys = DaiLy.objects.filter(
-                Q(ten_dai_ly__icontains=keyword) |
-                Q(dien_thoai__icontains=keyword) |
-                Q(dia_chi__icontains=keyword) |
-                Q(email__icontains=keyword)
+        """
+        Tìm kiếm đại lý (toàn văn, không dấu, khớp tiền tố, xếp theo mức độ liên quan).
+
+        Kết hợp được với các bộ lọc của danh sách; có ?ordering= thì xếp theo
+        cột đó thay vì mức độ liên quan.
+        """
+        keyword = request.query_params.get('keyword', '').strip()
+        paginator = SearchPagination()
+        filtered = self.filter_queryset(self.get_queryset())
+        has_filters = bool(dai_ly_lookups(request.query_params))
+        ranked = dai_ly_ordering(request.query_params) is None
+
+        def fetch(offset, limit):
+            if not keyword:
+                return 0, []
+            found = search_ids(keyword, offset, limit, restrict=filtered if has_filters else None) if ranked else None
+            if found is None:
+                dai_lys = filtered.filter(search_filter(keyword))
+                return dai_lys.count(), list(dai_lys[offset:offset + limit])
+            total, ids = found
+            dai_lys = self.get_queryset().in_bulk(ids)
+            return total, [dai_lys[pk] for pk in ids if pk in dai_lys]
+
+        dai_lys = paginator.paginate_search(request, fetch)
+        serializer = DaiLySerializer(dai_lys, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """Xuất toàn bộ đại lý (theo bộ lọc của danh sách) dạng CSV hoặc NDJSON, không phân trang"""
+        export_format = request.accepted_renderer.format
+        fields = DaiLySerializer.selected_fields(request)
+        return stream_export(self.filter_queryset(self.get_queryset()), export_format, fields)
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Đồng bộ delta: các đại lý thêm/sửa/xóa sau token ?since= (xem api/changes.py)"""
+        try:
+            limit = int(request.query_params.get('page_size', CHANGES_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "page_size phải là số nguyên"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, CHANGES_MAX_PAGE_SIZE))
+        try:
+            result = dai_ly_changes(self.get_queryset(), request.query_params.get('since', ''), limit)
+        except ValueError:
+            return Response({"error": "Token since không hợp lệ"}, status=status.HTTP_400_BAD_REQUEST)
+        result['upserted'] = DaiLySerializer(result['upserted'], many=True, context=self.get_serializer_context()).data
+        return Response(result)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Thêm/cập nhật nhiều đại lý trong một giao dịch (?mode=atomic|partial)"""
+        mode = request.query_params.get('mode', MODE_ATOMIC)
+        if mode not in MODES:
+            return Response(
+                {"error": f"mode phải là một trong: {', '.join(MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            serializer = DaiLySerializer(dai_lys, many=True)
-            return Response(serializer.data)
-        return Response([])
+        if not isinstance(request.data, list):
+            return Response({"error": "Dữ liệu phải là một mảng đại lý"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"Mỗi lô tối đa {BULK_MAX_ITEMS} đại lý"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = bulk_save_dai_lys(request.data, mode)
+        if not result['committed']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @action(detail=True, methods=['post'])
+    def adjust_debt(self, request, pk=None):
+        """Cộng/trừ tiền nợ của đại lý bằng một câu UPDATE có điều kiện"""
+        serializer = AdjustDebtSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            pk = parse_id(pk)
+        except ValueError:
+            raise Http404
+        try:
+            tien_no = DaiLy.objects.adjust_debt(pk, serializer.validated_data['delta'])
+        except DaiLy.DoesNotExist:
+            raise Http404
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(AdjustDebtSerializer({'id': pk, 'tien_no': tien_no}).data)
 
     def create(self, request, *args, **kwargs):
         """Ghi đè phương thức tạo mới để xử lý lỗi ràng buộc"""
@@ -128,21 +273,72 @@ class DaiLyViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class QuyDinhViewSet(viewsets.ModelViewSet):
+class QuyDinhViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = QuyDinh.objects.all()
     serializer_class = QuyDinhSerializer
+    etag_stamps = (stamps.QUY_DINH,)
+
+    def get_queryset(self):
+        return QuyDinhSerializer.prune_queryset(QuyDinh.objects.order_by('id'), self.request)
 
     @action(detail=False, methods=['get'])
     def by_name(self, request):
         """Lấy quy định theo tên"""
         name = request.query_params.get('name', '')
         if name:
-            try:
-                quy_dinh = QuyDinh.objects.get(ten_quy_dinh=name)
-                serializer = QuyDinhSerializer(quy_dinh)
-                return Response(serializer.data)
-            except QuyDinh.DoesNotExist:
+            quy_dinh = quy_dinh_registry.get_row(name)
+            if quy_dinh is None:
                 return Response({"error": "Quy định không tồn tại"}, status=status.HTTP_404_NOT_FOUND)
+            serializer = QuyDinhSerializer(quy_dinh, context=self.get_serializer_context())
+            return Response(serializer.data)
         return Response({"error": "Thiếu tên quy định"}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BootstrapView(ConditionalGetMixin, APIView):
+    """
+    Dữ liệu khởi động client trong một request, với một ETag chung: toàn bộ
+    quận, loại đại lý, quy định và trang đầu danh sách đại lý. ?fields=, các
+    bộ lọc, ?ordering= và ?page= áp dụng cho danh sách đại lý như /api/daily/.
+    """
+    etag_stamps = (stamps.QUAN, stamps.LOAI_DAI_LY, stamps.DAI_LY, stamps.QUY_DINH)
+
+    def get(self, request):
+        # Không truyền request cho các bảng tham chiếu: ?fields= chỉ dành cho đại lý
+        quans = Quan.objects.order_by('id')
+        loai_dai_lys = LoaiDaiLy.objects.order_by('id').with_so_dai_ly()
+        quy_dinhs = QuyDinh.objects.order_by('id')
+
+        paginator = PageNumberPagination()
+        dai_lys = DaiLySerializer.prune_queryset(dai_ly_queryset(), request)
+        page = paginator.paginate_queryset(filter_dai_lys(request, dai_lys), request, view=self)
+        context = {'request': request, 'view': self}
+        return Response({
+            'quans': QuanSerializer(quans, many=True).data,
+            'loai_dai_lys': LoaiDaiLySerializer(loai_dai_lys, many=True).data,
+            'quy_dinhs': QuyDinhSerializer(quy_dinhs, many=True).data,
+            'dai_lys': paginator.get_paginated_response(DaiLySerializer(page, many=True, context=context).data).data,
+        })
+
+
+@api_view(['POST'])
+@throttle_classes([])  # Mỗi yêu cầu con được giới hạn riêng theo nhóm của nó
+def batch(request):
+    """
+    Gửi nhiều yêu cầu con trong một request (?mode=atomic|partial, mặc định partial).
+    Dữ liệu: [{"method": "GET", "path": "/api/quan/", "body": ..., "headers": {...}}, ...]
+    """
+    mode = request.query_params.get('mode', MODE_PARTIAL)
+    if mode not in MODES:
+        return Response(
+            {"error": f"mode phải là một trong: {', '.join(MODES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        items = parse_items(request.data)
+    except BatchError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    result = run_batch(request, items, mode)
+    if not result['committed']:
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+    return Response(result)
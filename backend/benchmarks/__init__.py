@@ -0,0 +1,45 @@
+# backend/benchmarks/__init__.py
+"""
+Benchmarks for the backend, run from the backend/ directory:
+
+    python -m benchmarks.index_plan --rows 100000 1000000
+    python -m benchmarks.api --rows 10000 100000
+    python -m benchmarks.throttle
+
+Every benchmark works on its own throw-away SQLite database (never on
+db.sqlite3) and its own runtime directory.
+"""
+import os
+import tempfile
+
+
+def setup_django(db_path=None):
+    """Khởi tạo Django với cơ sở dữ liệu và thư mục VAR_DIR tạm thời, trả về đường dẫn CSDL"""
+    import django
+    from django.conf import settings
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quanlydaily.settings')
+    work_dir = tempfile.mkdtemp(prefix='qldl-bench-')
+    if db_path is None:
+        db_path = os.path.join(work_dir, 'bench.sqlite3')
+    # Phải gán trước django.setup(): kết nối đọc cấu hình khi được tạo lần đầu
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.VAR_DIR = os.path.join(work_dir, 'var')
+    settings.VERSION_STAMP_DIR = os.path.join(settings.VAR_DIR, 'stamps')
+    settings.SLOW_QUERY_LOG = {
+        **settings.SLOW_QUERY_LOG, 'path': os.path.join(settings.VAR_DIR, 'logs', 'slow_queries.log'),
+    }
+    # Benchmark gửi hàng nghìn request từ một client: không giới hạn tốc độ
+    settings.API_THROTTLE = {
+        **settings.API_THROTTLE, 'enabled': False, 'path': os.path.join(settings.VAR_DIR, 'throttle', 'buckets'),
+    }
+    django.setup()
+    return db_path
+
+
+def percentile(values, pct):
+    """Phân vị pct (nearest-rank) của values, 0 nếu rỗng"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
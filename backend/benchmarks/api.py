@@ -0,0 +1,295 @@
+# backend/benchmarks/api.py
+"""
+Latency, queries per request and memory of every API viewset, through the
+real URLconf (api/urls.py) and middleware, in-process with Django's test
+client.
+
+    python -m benchmarks.api --rows 10000 100000 1000000 [--requests 200] [--output FILE]
+    python -m benchmarks.api --compare OLD.json NEW.json
+
+For each size the distributors are re-seeded with bulk_create (districts and
+types are seeded once), then each viewset runs list, retrieve, search (only
+/api/daily/search/), create, update and delete. Updates and deletes work on
+the objects the create step made, so the data set stays the same size.
+
+Peak memory is measured on a few extra requests per operation with
+tracemalloc (Python allocations while handling one request), kept out of the
+latency figures because tracing slows everything down.
+
+Results are written as JSON (with the git commit) to benchmarks/results/ so
+two runs can be compared with --compare.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks import percentile, setup_django
+from benchmarks.data import SO_LOAI, SO_QUAN, bulk_seed_dai_lys, seed_reference
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+SEARCH_KEYWORDS = ('le loi', 'đại lý 12', 'Lê', '0900001', 'so 77', 'khong co ket qua')
+
+
+def quan_payload(i):
+    return {'ten_quan': f"Quận thử {i}"}
+
+
+def loai_dai_ly_payload(i):
+    return {'ten_loai_dai_ly': f"Loại thử {i}", 'no_toi_da': '1000000'}
+
+
+def dai_ly_payload(i):
+    return {
+        'ten_dai_ly': f"Đại lý thử {i}", 'dien_thoai': f"08{i:08d}", 'dia_chi': f"Số {i} Trần Hưng Đạo",
+        'quan': 1 + i % SO_QUAN, 'loai_dai_ly': 1 + i % SO_LOAI, 'email': None,
+    }
+
+
+def quy_dinh_payload(i):
+    return {'ten_quy_dinh': f"QuyDinhThu{i}", 'gia_tri': str(i), 'mo_ta': None}
+
+
+# prefix -> (model, hàm tạo dữ liệu gửi lên, trường tên sẽ được sửa khi update)
+VIEWSETS = {
+    'quan': ('Quan', quan_payload, 'ten_quan'),
+    'loaidaily': ('LoaiDaiLy', loai_dai_ly_payload, 'ten_loai_dai_ly'),
+    'daily': ('DaiLy', dai_ly_payload, 'ten_dai_ly'),
+    'quydinh': ('QuyDinh', quy_dinh_payload, 'ten_quy_dinh'),
+}
+
+
+class QueryCounter:
+    """execute_wrapper đếm số truy vấn (rẻ hơn CaptureQueriesContext, không giữ lại SQL)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def git_revision():
+    """(commit, có thay đổi chưa commit hay không), hoặc (None, None) ngoài git"""
+    cwd = os.path.dirname(__file__)
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain'], cwd=cwd, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.stdout.strip(), bool(status.stdout.strip())
+
+
+def max_rss_kib():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Runner:
+    """Chạy các thao tác của một viewset bằng test client và thu số đo"""
+
+    def __init__(self, client, rng, args):
+        self.client = client
+        self.rng = rng
+        self.requests = args.requests
+        self.memory_samples = args.memory_samples
+
+    def run(self, request, expected_status, count):
+        """Gửi count + memory_samples request (request(i) trả về response), trả về số đo"""
+        from django.db import connection
+
+        latencies, queries, errors = [], [], 0
+        for i in range(count):
+            counter = QueryCounter()
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = request(i)
+            latencies.append(time.perf_counter() - started)
+            queries.append(counter.count)
+            if response.status_code != expected_status:
+                errors += 1
+
+        peak = 0
+        tracemalloc.start()
+        try:
+            for i in range(count, count + self.memory_samples):
+                tracemalloc.reset_peak()
+                response = request(i)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                if response.status_code != expected_status:
+                    errors += 1
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'requests': count,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0.0,
+            'max_queries': max(queries, default=0),
+            'peak_memory_kib': round(peak / 1024, 1),
+            'errors': errors,
+        }
+
+    def viewset(self, prefix, model, payload, name_field):
+        client, rng, n = self.client, self.rng, self.requests
+        url = f'/api/{prefix}/'
+        pks = list(model.objects.values_list('pk', flat=True))
+        last_page = max(1, (len(pks) + 99) // 100)
+        results = {}
+
+        results['list'] = self.run(lambda i: client.get(url, {'page': rng.randint(1, last_page)}), 200, n)
+        results['retrieve'] = self.run(lambda i: client.get(f'{url}{rng.choice(pks)}/'), 200, n)
+        if prefix == 'daily':
+            results['search'] = self.run(
+                lambda i: client.get(f'{url}search/', {'keyword': rng.choice(SEARCH_KEYWORDS)}), 200, n
+            )
+
+        created = []
+
+        def create(i):
+            response = client.post(url, payload(i), content_type='application/json')
+            if response.status_code == 201:
+                created.append(response.json()['id'])
+            return response
+
+        def update(i):
+            data = payload(i)
+            data[name_field] = f"{data[name_field]} (sửa)"
+            return client.put(f'{url}{created[i]}/', data, content_type='application/json')
+
+        results['create'] = self.run(create, 201, n)
+        count = max(0, min(n, len(created) - self.memory_samples))
+        results['update'] = self.run(update, 200, count)
+        results['delete'] = self.run(lambda i: client.delete(f'{url}{created[i]}/'), 204, count)
+        return results
+
+
+def run_benchmark(args):
+    db_path = setup_django(args.db)
+    logging.disable(logging.CRITICAL)  # 4xx/5xx được đếm trong "errors"
+
+    import django
+    from django.apps import apps
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+
+    from api.models import QuyDinh
+    from api.regulations import SO_DAI_LY_TOI_DA_TRONG_QUAN
+
+    print(f"CSDL: {db_path}")
+    call_command('migrate', verbosity=0)
+    seed_reference()
+    QuyDinh.objects.create(ten_quy_dinh=SO_DAI_LY_TOI_DA_TRONG_QUAN, gia_tri=str(max(args.rows) * 2))
+
+    commit, dirty = git_revision()
+    report = {
+        'benchmark': 'api',
+        'started_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': connection.Database.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'requests': args.requests,
+        'memory_samples': args.memory_samples,
+        'seed': args.seed,
+        'sizes': [],
+    }
+
+    client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+    runner = Runner(client, random.Random(args.seed), args)
+    for rows in args.rows:
+        print(f"\n=== {rows:,} đại lý ===")
+        started = time.perf_counter()
+        bulk_seed_dai_lys(rows)
+        seed_seconds = time.perf_counter() - started
+        print(f"Tạo dữ liệu (bulk_create + chỉ mục tìm kiếm): {seed_seconds:.1f}s")
+
+        size = {'rows': rows, 'seed_seconds': round(seed_seconds, 2), 'results': []}
+        for prefix, (model_name, payload, name_field) in VIEWSETS.items():
+            model = apps.get_model('api', model_name)
+            for operation, result in runner.viewset(prefix, model, payload, name_field).items():
+                size['results'].append({'viewset': prefix, 'operation': operation, **result})
+                print(
+                    f"  {prefix:10} {operation:8} p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  "
+                    f"p99 {result['p99_ms']:8.2f} ms  {result['queries_per_request']:5.1f} truy vấn  "
+                    f"{result['peak_memory_kib']:9.1f} KiB  lỗi {result['errors']}"
+                )
+        size['max_rss_kib'] = max_rss_kib()
+        report['sizes'].append(size)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"api-{stamp}-{(commit or 'nogit')[:10]}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nKết quả: {output}")
+
+
+def compare(old_path, new_path):
+    """In p50/p95/p99 và số truy vấn của hai lần chạy cạnh nhau"""
+    def load(path):
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        rows = {
+            (size['rows'], result['viewset'], result['operation']): result
+            for size in report['sizes'] for result in size['results']
+        }
+        return report, rows
+
+    old_report, old = load(old_path)
+    new_report, new = load(new_path)
+    print(f"Cũ: {old_report['commit'] or '?'}{' (có thay đổi)' if old_report['dirty'] else ''}")
+    print(f"Mới: {new_report['commit'] or '?'}{' (có thay đổi)' if new_report['dirty'] else ''}")
+    for key in sorted(old.keys() & new.keys()):
+        rows, prefix, operation = key
+        before, after = old[key], new[key]
+        changes = []
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            ratio = after[metric] / before[metric] if before[metric] else float('inf')
+            changes.append(f"{metric[:3]} {before[metric]:8.2f} -> {after[metric]:8.2f} ({ratio:5.2f}x)")
+        changes.append(f"truy vấn {before['queries_per_request']:g} -> {after['queries_per_request']:g}")
+        print(f"{rows:>9,} {prefix:10} {operation:8} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help="Các kích thước bảng đại lý cần đo (mặc định 10000 100000)")
+    parser.add_argument('--requests', type=int, default=200, help="Số request đo cho mỗi thao tác")
+    parser.add_argument('--memory-samples', type=int, default=5,
+                        help="Số request thêm cho mỗi thao tác để đo bộ nhớ đỉnh (tracemalloc)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed chọn trang, id và từ khóa ngẫu nhiên")
+    parser.add_argument('--db', help="File SQLite dùng để đo (mặc định: file tạm)")
+    parser.add_argument('--output', help="File JSON kết quả (mặc định: benchmarks/results/api-<thời gian>-<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="So sánh hai file kết quả rồi thoát")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.requests <= 0 or args.memory_samples < 0:
+        parser.error("--requests phải lớn hơn 0 và --memory-samples không được âm")
+    run_benchmark(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# backend/benchmarks/index_plan.py
+"""
+EXPLAIN QUERY PLAN and timings of the hot DaiLy queries before and after
+migration 0005_daily_indexes.
+
+    python -m benchmarks.index_plan --rows 100000 1000000 [--repeat 5] [--db PATH]
+
+For each size the database is migrated to the state just before the index
+migration, seeded with one INSERT ... SELECT, measured, migrated forward
+(index build time is reported), measured again and migrated back.
+"""
+import argparse
+import time
+from datetime import date
+
+from benchmarks import setup_django
+from benchmarks.data import NO_TOI_DA, seed_dai_lys, seed_reference
+
+INDEX_MIGRATION = '0005_daily_indexes'
+BEFORE_MIGRATION = '0004_daily_phien_ban'
+
+
+def hot_queries():
+    """(tên, hàm chạy truy vấn) giống hệt truy vấn của ứng dụng"""
+    from api.models import DaiLy
+    from api.pagination import KeysetPagination
+    from api.views import dai_ly_queryset
+
+    thang = {'ngay_tiep_nhan__gte': date(2023, 5, 1), 'ngay_tiep_nhan__lt': date(2023, 6, 1)}
+    # Điều kiện trang sau của ?pagination=cursor&ordering=-tien_no, tạo bởi chính KeysetPagination
+    keyset = KeysetPagination()
+    keyset.fields = keyset.orderings['tien_no']
+    trang_sau = keyset._after([NO_TOI_DA // 2, 500], descending=True)
+    return [
+        # LoaiDaiLyViewSet.update khi giảm no_toi_da
+        ("loai_dai_ly = ? AND tien_no > ? (exists)",
+         lambda: DaiLy.objects.filter(loai_dai_ly_id=1, tien_no__gt=NO_TOI_DA - 1).exists()),
+        # Trang quản trị: date_hierarchy theo tháng (đếm + trang đầu)
+        ("admin: đếm đại lý trong một tháng",
+         lambda: DaiLy.objects.filter(**thang).count()),
+        ("admin: lọc một tháng, 100 dòng",
+         lambda: list(DaiLy.objects.filter(**thang).select_related('quan', 'loai_dai_ly')
+                      .order_by('ngay_tiep_nhan', 'id')[:100])),
+        # Đại lý nợ nhiều nhất / ?pagination=cursor&ordering=-tien_no
+        ("100 đại lý nợ nhiều nhất",
+         lambda: list(dai_ly_queryset().order_by('-tien_no', '-id')[:100])),
+        ("keyset ordering=-tien_no, trang giữa",
+         lambda: list(dai_ly_queryset()
+                      .filter(trang_sau)
+                      .order_by('-tien_no', '-id')[:100])),
+    ]
+
+
+def measure(connection, queries, repeat):
+    from django.test.utils import CaptureQueriesContext
+
+    results = []
+    for name, run in queries:
+        with CaptureQueriesContext(connection) as captured:
+            run()
+        sql = captured.captured_queries[-1]['sql']
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plan = [row[-1] for row in cursor.fetchall()]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        results.append((name, plan, min(timings)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5, help="Số lần chạy mỗi truy vấn (lấy thời gian nhỏ nhất)")
+    parser.add_argument('--db', help="File SQLite dùng để đo (mặc định: file tạm)")
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    print(f"CSDL: {db_path}")
+    call_command('migrate', 'api', BEFORE_MIGRATION, verbosity=0)
+    seed_reference()
+    queries = hot_queries()
+
+    for rows in args.rows:
+        print(f"\n=== {rows:,} đại lý ===")
+        started = time.perf_counter()
+        seed_dai_lys(rows)
+        print(f"Tạo dữ liệu: {time.perf_counter() - started:.1f}s")
+
+        before = measure(connection, queries, args.repeat)
+        started = time.perf_counter()
+        call_command('migrate', 'api', INDEX_MIGRATION, verbosity=0)
+        print(f"Tạo chỉ mục ({INDEX_MIGRATION}): {time.perf_counter() - started:.1f}s")
+        after = measure(connection, queries, args.repeat)
+        call_command('migrate', 'api', BEFORE_MIGRATION, verbosity=0)
+
+        for (name, plan_before, t_before), (_, plan_after, t_after) in zip(before, after):
+            print(f"\n{name}")
+            for label, plan, elapsed in (("trước", plan_before, t_before), ("sau", plan_after, t_after)):
+                print(f"  {label:5} {elapsed * 1000:9.2f} ms")
+                for step in plan:
+                    print(f"        {step}")
+            print(f"  nhanh hơn {t_before / t_after if t_after else float('inf'):.1f} lần")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# backend/benchmarks/json_renderers.py
+"""
+DRF JSONRenderer versus ORJSONRenderer (and JSONParser versus ORJSONParser)
+on pages of serialized distributors.
+
+    python -m benchmarks.json_renderers [--rows 10000] [--repeat 10]
+
+The page is serialized once with DaiLySerializer; only rendering/parsing is
+timed. Both renderers must produce the same JSON document.
+"""
+import argparse
+import io
+import json
+import time
+
+from benchmarks import setup_django
+from benchmarks.data import seed_dai_lys, seed_reference
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help="Số đại lý trong một trang")
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.management import call_command
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.parsers import ORJSONParser
+    from api.renderers import ORJSONRenderer, orjson
+    from api.serializers import DaiLySerializer
+    from api.views import dai_ly_queryset
+
+    if orjson is None:
+        print("orjson chưa được cài đặt: ORJSONRenderer sẽ dùng JSONRenderer của DRF")
+
+    call_command('migrate', verbosity=0)
+    seed_reference()
+    seed_dai_lys(args.rows)
+    data = DaiLySerializer(dai_ly_queryset(), many=True).data
+    print(f"{len(data):,} đại lý, tốt nhất trong {args.repeat} lần")
+
+    stock, fast = JSONRenderer().render(data), ORJSONRenderer().render(data)
+    assert json.loads(stock) == json.loads(fast), "Hai renderer cho kết quả khác nhau"
+    print(f"Kích thước: JSONRenderer {len(stock):,} byte, ORJSONRenderer {len(fast):,} byte")
+
+    rows = [
+        ("render", lambda: JSONRenderer().render(data), lambda: ORJSONRenderer().render(data)),
+        ("parse", lambda: JSONParser().parse(io.BytesIO(stock)), lambda: ORJSONParser().parse(io.BytesIO(stock))),
+    ]
+    for name, run_stock, run_fast in rows:
+        t_stock, t_fast = best_of(args.repeat, run_stock), best_of(args.repeat, run_fast)
+        print(
+            f"{name:6}: DRF {t_stock * 1000:8.2f} ms   orjson {t_fast * 1000:8.2f} ms   "
+            f"nhanh hơn {t_stock / t_fast:.1f} lần"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# backend/benchmarks/sqlite_concurrency.py
+"""
+Concurrent read/write throughput with the default SQLite profile versus the
+tuned profile of settings.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, mmap,
+cache, temp_store, busy_timeout) with persistent connections.
+
+    python -m benchmarks.sqlite_concurrency [--readers 4] [--writers 2] [--duration 10] [--rows 100000]
+
+Readers and writers are separate processes that send requests through the
+real URLconf with Django's test client: readers fetch list pages and single
+distributors, writers call POST /api/daily/{id}/adjust_debt/.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import time
+
+from benchmarks import percentile, setup_django
+from benchmarks.data import seed_dai_lys, seed_reference
+
+# Cấu hình mặc định của Django/SQLite trước khi có api/sqlite.py
+DEFAULT_PROFILE = {
+    'QLDL_DB_CONN_MAX_AGE': '0',
+    'QLDL_SQLITE_JOURNAL_MODE': 'delete',
+    'QLDL_SQLITE_SYNCHRONOUS': 'full',
+    'QLDL_SQLITE_MMAP_SIZE': '0',
+    'QLDL_SQLITE_CACHE_SIZE': '-2000',
+    'QLDL_SQLITE_TEMP_STORE': 'default',
+    'QLDL_SQLITE_BUSY_TIMEOUT': '5000',
+}
+# Cấu hình trong settings.py (không ghi đè biến môi trường nào)
+TUNED_PROFILE = {'QLDL_SQLITE_JOURNAL_MODE': 'wal'}
+PROFILE_VARS = tuple(DEFAULT_PROFILE)
+
+
+def worker(role, profile, db_path, rows, start_at, deadline, results):
+    for name in PROFILE_VARS:
+        os.environ.pop(name, None)
+    os.environ.update(profile)
+    setup_django(db_path)
+    logging.disable(logging.CRITICAL)
+
+    from django.db import close_old_connections
+    from django.test import Client
+
+    client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+    rng = random.Random(os.getpid())
+    latencies = []
+    errors = 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    while time.time() < deadline:
+        pk = rng.randint(1, rows)
+        started = time.perf_counter()
+        if role == 'read':
+            if rng.random() < 0.5:
+                response = client.get('/api/daily/', {'page': rng.randint(1, rows // 100)})
+            else:
+                response = client.get(f'/api/daily/{pk}/')
+        else:
+            response = client.post(
+                f'/api/daily/{pk}/adjust_debt/', {'delta': rng.choice(['-1', '1'])},
+                content_type='application/json'
+            )
+        # Test client không phát request_finished cho close_old_connections: gọi tay để CONN_MAX_AGE có hiệu lực
+        close_old_connections()
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 500:
+            errors += 1
+    results.put((role, latencies, errors))
+
+
+def run_profile(label, profile, args, db_path):
+    from django.db import connection
+
+    # Đổi chế độ journal trước khi các tiến trình mở kết nối (WAL được lưu trong file CSDL)
+    journal_mode = profile['QLDL_SQLITE_JOURNAL_MODE']
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+    connection.close()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    start_at = time.time() + 3  # thời gian khởi động Django của các tiến trình
+    deadline = start_at + args.duration
+    roles = ['read'] * args.readers + ['write'] * args.writers
+    processes = [
+        context.Process(target=worker, args=(role, profile, db_path, args.rows, start_at, deadline, results))
+        for role in roles
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(f"\n{label}")
+    for role in ('read', 'write'):
+        latencies = [value for r, values, _ in collected if r == role for value in values]
+        errors = sum(e for r, _, e in collected if r == role)
+        print(
+            f"  {role:5}: {len(latencies) / args.duration:8.1f} req/s  "
+            f"p50 {percentile(latencies, 50) * 1000:7.2f} ms  "
+            f"p99 {percentile(latencies, 99) * 1000:7.2f} ms  lỗi {errors}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10, help="Số giây đo cho mỗi cấu hình")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--db', help="File SQLite dùng để đo (mặc định: file tạm)")
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    from django.core.management import call_command
+
+    print(f"CSDL: {db_path}, {args.readers} đọc + {args.writers} ghi, {args.duration:g}s mỗi cấu hình")
+    call_command('migrate', verbosity=0)
+    seed_reference()
+    seed_dai_lys(args.rows)
+
+    run_profile("Mặc định (journal DELETE, synchronous FULL, mở kết nối mỗi request)", DEFAULT_PROFILE, args, db_path)
+    run_profile("settings.SQLITE_PRAGMAS (WAL, NORMAL, mmap, kết nối bền)", TUNED_PROFILE, args, db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# backend/benchmarks/throttle.py
+"""
+Overhead of the token-bucket throttle (api/throttling.py) per request.
+
+    python -m benchmarks.throttle [--calls 200000] [--keys 10000] [--processes 4]
+
+Times, per call: the key hash alone, BucketStore.take on one hot key, on
+--keys distinct clients, on more clients than the table has slots (every
+call evicts), the whole TokenBucketThrottle.allow_request on a DRF request,
+and finally --processes processes hammering one table at once (contention
+on the fcntl lock). Each call is timed with perf_counter_ns, which itself
+costs a few tens of nanoseconds.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+from benchmarks import percentile, setup_django
+
+# Rất lớn: mọi lần lấy token đều được phép, chỉ đo chi phí
+RATE = BURST = 1e12
+
+
+def measure(calls, func):
+    """Thời gian (ns) của từng lần gọi func(i)"""
+    timings = []
+    clock = time.perf_counter_ns
+    for i in range(calls):
+        started = clock()
+        func(i)
+        timings.append(clock() - started)
+    return timings
+
+
+def report(name, timings):
+    mean = sum(timings) / len(timings)
+    print(
+        f"  {name:34} mean {mean / 1000:7.2f} µs  p50 {percentile(timings, 50) / 1000:7.2f} µs  "
+        f"p99 {percentile(timings, 99) / 1000:7.2f} µs"
+    )
+
+
+def hammer(task):
+    """Chạy trong tiến trình con: calls lần take, trả về tổng thời gian (giây)"""
+    path, slots, calls, worker = task
+    from api.throttling import BucketStore
+
+    store = BucketStore(path, slots)
+    key = f"read:10.0.0.{worker}"
+    started = time.perf_counter()
+    for _ in range(calls):
+        store.take(key, RATE, BURST)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000, help="Số lần gọi cho mỗi phép đo")
+    parser.add_argument('--keys', type=int, default=10000, help="Số client khác nhau")
+    parser.add_argument('--processes', type=int, default=4, help="Số tiến trình dùng chung bảng (0 = bỏ qua)")
+    args = parser.parse_args()
+    if args.calls <= 0 or args.keys <= 0 or args.processes < 0:
+        parser.error("--calls, --keys phải lớn hơn 0 và --processes không được âm")
+
+    setup_django()
+
+    from django.conf import settings
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.request import Request
+
+    from api import throttling
+    from api.throttling import BucketStore, TokenBucketThrottle, fcntl, key_hash
+
+    config = settings.API_THROTTLE
+    store = BucketStore(config['path'], config['slots'])
+    print(f"Bảng: {config['slots']:,} ô ({config['slots'] * throttling.SLOT.size:,} byte), "
+          f"khóa fcntl: {'có' if fcntl is not None else 'không (chỉ khóa trong tiến trình)'}")
+
+    keys = [f"read:10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(args.keys)]
+    many = [f"read:client-{i}" for i in range(config['slots'] * 4)]
+    report("key_hash", measure(args.calls, lambda i: key_hash(keys[i % args.keys])))
+    report("take, 1 client", measure(args.calls, lambda i: store.take(keys[0], RATE, BURST)))
+    report(f"take, {args.keys:,} clients", measure(args.calls, lambda i: store.take(keys[i % args.keys], RATE, BURST)))
+    report(
+        f"take, {len(many):,} clients (đẩy ô cũ)",
+        measure(args.calls, lambda i: store.take(many[i % len(many)], RATE, BURST))
+    )
+
+    settings.API_THROTTLE = {
+        **config, 'enabled': True,
+        'rates': {scope: {'rate': RATE, 'burst': BURST} for scope in config['rates']},
+    }
+    throttle = TokenBucketThrottle()
+    requests = [Request(APIRequestFactory().get('/api/daily/', REMOTE_ADDR=key.split(':')[1])) for key in keys[:1000]]
+    report("TokenBucketThrottle.allow_request", measure(
+        args.calls, lambda i: throttle.allow_request(requests[i % len(requests)], None)
+    ))
+
+    if args.processes:
+        calls = args.calls // args.processes
+        tasks = [(config['path'], config['slots'], calls, worker) for worker in range(args.processes)]
+        with multiprocessing.get_context().Pool(args.processes) as pool:
+            started = time.perf_counter()
+            elapsed = pool.map(hammer, tasks)
+            wall = time.perf_counter() - started
+        total = calls * args.processes
+        print(
+            f"  {args.processes} tiến trình, {total:,} lần take: {total / wall:,.0f} lần/giây, "
+            f"trung bình {sum(elapsed) / total * 1e6:.2f} µs mỗi lần trong từng tiến trình "
+            f"({os.cpu_count()} CPU)"
+        )
+
+
+if __name__ == '__main__':
+    main()
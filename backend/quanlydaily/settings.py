@@ -26,10 +26,18 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',  # Thêm dòng này
-    'distributor',
+    'rest_framework',
+    'api',
 ]
 
 MIDDLEWARE = [
+    # Ghi truy vấn chậm và N+1 (xem api/querylog.py); đặt trước api.metrics để
+    # thời gian EXPLAIN không bị tính vào thời gian SQL của request
+    'api.querylog.SlowQueryMiddleware',
+    # Server-Timing và histogram theo route cho /api/_metrics (xem api/metrics.py)
+    'api.metrics.RequestMetricsMiddleware',
+    # RateLimit-* cho các request qua TokenBucketThrottle (xem api/throttling.py)
+    'api.throttling.RateLimitHeadersMiddleware',
     # 'corsheaders.middleware.CorsMiddleware',  # Comment dòng này lại
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,9 +76,31 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Giữ kết nối giữa các request (giây; 0 = mở lại mỗi request, None = không giới hạn)
+        'CONN_MAX_AGE': None if os.environ.get('QLDL_DB_CONN_MAX_AGE') == 'none'
+        else int(os.environ.get('QLDL_DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# PRAGMA áp dụng cho mỗi kết nối SQLite mới (xem api/sqlite.py)
+# WAL (QLDL_SQLITE_JOURNAL_MODE=wal): người đọc không bị người ghi chặn và ngược lại.
+# Phải bật rõ ràng cho máy chủ: chế độ WAL được lưu vĩnh viễn trong file CSDL và
+# để lại các file -wal/-shm, nên không bật mặc định cho db.sqlite3 có trong git
+SQLITE_JOURNAL_MODE = os.environ.get('QLDL_SQLITE_JOURNAL_MODE', 'delete').lower()
+SQLITE_PRAGMAS = {
+    'journal_mode': SQLITE_JOURNAL_MODE,
+    # NORMAL an toàn với WAL (chỉ có thể mất giao dịch cuối khi mất điện), ít fsync hơn FULL;
+    # với journal DELETE thì giữ FULL
+    'synchronous': os.environ.get('QLDL_SQLITE_SYNCHRONOUS', 'normal' if SQLITE_JOURNAL_MODE == 'wal' else 'full'),
+    'mmap_size': int(os.environ.get('QLDL_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    # Số âm: kích thước tính bằng KiB (mặc định 64 MiB mỗi kết nối)
+    'cache_size': int(os.environ.get('QLDL_SQLITE_CACHE_SIZE', -64 * 1024)),
+    'temp_store': os.environ.get('QLDL_SQLITE_TEMP_STORE', 'memory'),
+    # Mili giây chờ khóa ghi trước khi báo "database is locked"
+    'busy_timeout': int(os.environ.get('QLDL_SQLITE_BUSY_TIMEOUT', 5000)),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -97,6 +127,47 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Thư mục dữ liệu lúc chạy (không đưa vào git)
+VAR_DIR = os.environ.get('QLDL_VAR_DIR', os.path.join(BASE_DIR, 'var'))
+
+# Stamp phiên bản dùng chung giữa các tiến trình (xem api/stamps.py)
+VERSION_STAMP_DIR = os.path.join(VAR_DIR, 'stamps')
+
+# Phản hồi lưu lại cho các yêu cầu ghi có Idempotency-Key (xem api/idempotency.py)
+IDEMPOTENCY = {
+    # Thời gian giữ một phản hồi (giây): client phải thử lại trong khoảng này
+    'ttl_seconds': int(os.environ.get('QLDL_IDEMPOTENCY_TTL', 24 * 3600)),
+    # Số phản hồi tối đa được giữ, cũ nhất bị xóa trước
+    'max_entries': int(os.environ.get('QLDL_IDEMPOTENCY_MAX_ENTRIES', 10000)),
+}
+
+# Giới hạn tốc độ theo client và nhóm route (xem api/throttling.py): mỗi nhóm
+# có bucket `burst` token, nạp lại `rate` token mỗi giây
+API_THROTTLE = {
+    'enabled': os.environ.get('QLDL_THROTTLE', '1') != '0',
+    # Bảng bucket dùng chung giữa các tiến trình (file ánh xạ bộ nhớ)
+    'path': os.path.join(VAR_DIR, 'throttle', 'buckets'),
+    # Số ô của bảng (24 byte mỗi ô): nên lớn hơn nhiều lần số client x 3 nhóm
+    'slots': 16384,
+    'rates': {
+        'read': {'rate': 20, 'burst': 100},
+        # /api/daily/search/: đắt nhất trong các yêu cầu đọc
+        'search': {'rate': 2, 'burst': 10},
+        'write': {'rate': 5, 'burst': 20},
+    },
+}
+
+# Nhật ký truy vấn chậm (xem api/querylog.py, manage.py slow_queries)
+SLOW_QUERY_LOG = {
+    'path': os.path.join(VAR_DIR, 'logs', 'slow_queries.log'),
+    # Truy vấn chạy lâu hơn ngưỡng này (mili giây) được ghi kèm EXPLAIN QUERY PLAN
+    'threshold_ms': float(os.environ.get('QLDL_SLOW_QUERY_MS', 100)),
+    # Cùng một câu SQL chạy từ chừng này lần trở lên trong một request được ghi là N+1
+    'n_plus_one': int(os.environ.get('QLDL_N_PLUS_ONE_THRESHOLD', 10)),
+    'max_bytes': 5 * 1024 * 1024,
+    'backup_count': 5,
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -106,5 +177,23 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',  # Cho phép mọi người truy cập API
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    # JSON qua orjson (xem api/renderers.py, api/parsers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Token bucket theo client và nhóm route (xem API_THROTTLE, api/throttling.py)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+    # Số reverse proxy tin cậy phía trước máy chủ: client được nhận diện bằng địa chỉ
+    # thứ NUM_PROXIES tính từ cuối X-Forwarded-For; 0 = chỉ dùng REMOTE_ADDR.
+    # Không đặt (None) thì DRF tin nguyên X-Forwarded-For do client gửi, đổi header là vượt giới hạn
+    'NUM_PROXIES': int(os.environ.get('QLDL_NUM_PROXIES', 0)),
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
\ No newline at end of file
@@ -1,9 +1,45 @@
 # frontend/api_client.py
+import copy
+import json
+import random
+import time
+import uuid
+import warnings
 import requests
+from collections import OrderedDict
+from contextlib import contextmanager
 from decimal import Decimal
 from datetime import datetime, date
 from typing import List, Dict, Any, Optional, Union
-from shared.config import API_BASE_URL, DEFAULT_TIMEOUT
+from urllib.parse import urlencode, urlsplit
+from shared.config import API_BASE_URL, DEFAULT_TIMEOUT, MAX_RETRIES, RETRY_BACKOFF
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(content: bytes) -> Any:
+    """Decode a JSON body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# Server-side limit of sub-requests per POST /api/batch/ (api/batch.py)
+BATCH_MAX_REQUESTS = 50
+
+# Writes sent with an Idempotency-Key: the server replays the first response for retries
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH")
+# Throttled or transient gateway/server errors worth retrying (the server never stores
+# these for an Idempotency-Key, so a retried write still runs once)
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+def _fields_params(fields: Optional[List[str]]) -> Optional[Dict]:
+    """Query params for a sparse fieldset (?fields=a,b)"""
+    return {"fields": ",".join(fields)} if fields else None
 
 
 class APIError(Exception):
@@ -16,112 +52,347 @@ class APIError(Exception):
         super().__init__(self.message)
 
 
+def _error_message(data, status_code):
+    """The "error" field of an error body, or a generic message"""
+    if isinstance(data, dict) and data.get('error'):
+        return data['error']
+    return f"API error: HTTP {status_code}"
+
+
+class BatchCall:
+    """
+    Deferred result of a call made inside DjangoAPIClient.batch().
+    result() returns the value (or raises APIError) once the batch was sent.
+    """
+
+    def __init__(self, method, path, body=None, expected_status=200, etag_key=None):
+        self.method = method
+        self.path = path
+        self.body = body
+        self.expected_status = expected_status
+        self.etag_key = etag_key
+        self.headers = {}
+        self._steps = []
+        self._done = False
+        self._value = None
+        self._error = None
+
+    def then(self, fn, on_error=None):
+        """Post-process the value (fn) or turn an APIError into a value (on_error)"""
+        self._steps.append((fn, on_error))
+        return self
+
+    def _resolve(self, value=None, error=None):
+        for fn, on_error in self._steps:
+            if error is None:
+                value = fn(value)
+            elif on_error is not None:
+                value, error = on_error(error), None
+        self._value, self._error, self._done = value, error, True
+
+    def result(self):
+        if not self._done:
+            raise RuntimeError("The batch has not been sent yet")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+def _then(value, fn, on_error=None):
+    """Apply fn now, or after the batch is sent when value is a BatchCall"""
+    if isinstance(value, BatchCall):
+        return value.then(fn, on_error)
+    return fn(value)
+
+
+class ETagCache:
+    """Small LRU cache of (ETag, body) per GET URL, shared by all clients"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, etag, body):
+        self._entries[key] = (etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+_shared_etag_cache = ETagCache()
+
+
 class DjangoAPIClient:
     """Client class to interact with Django REST API"""
 
-    def __init__(self, base_url=API_BASE_URL):
+    def __init__(self, base_url=API_BASE_URL, etag_cache=None):
         self.base_url = base_url
+        self.etag_cache = etag_cache if etag_cache is not None else _shared_etag_cache
+        # Calls collected by batch(), None outside a batch
+        self._pending = None
+
+    @contextmanager
+    def batch(self, atomic=False):
+        """
+        Collect the calls made in the block and send them as one POST /api/batch/
+        when it exits. Inside the block every call returns a BatchCall; read the
+        values with .result() after the block. With atomic=True the server runs
+        the writes in one transaction and rolls all of them back if one fails.
+        Nested batch() blocks join the outer one.
+        """
+        if self._pending is not None:
+            yield
+            return
+        self._pending = []
+        try:
+            yield
+            calls = self._pending
+        finally:
+            self._pending = None
+        if not calls:
+            return
+        if atomic and len(calls) > BATCH_MAX_REQUESTS:
+            raise APIError(f"An atomic batch holds at most {BATCH_MAX_REQUESTS} requests")
+        for start in range(0, len(calls), BATCH_MAX_REQUESTS):
+            self._send_batch(calls[start:start + BATCH_MAX_REQUESTS], atomic)
+
+    def _send_batch(self, calls, atomic):
+        prefix = urlsplit(self.base_url).path
+        items = []
+        for call in calls:
+            item = {"method": call.method, "path": f"{prefix}{call.path}"}
+            if call.body is not None:
+                item["body"] = call.body
+            if call.headers:
+                item["headers"] = call.headers
+            items.append(item)
+
+        # Writes carry their own Idempotency-Key, so only DELETE makes a lost batch unsafe to resend
+        response = self._request(
+            "POST", f"{self.base_url}/batch/", retry=all(call.method != "DELETE" for call in calls),
+            params={"mode": "atomic" if atomic else "partial"}, json=items
+        )
+        data = _loads(response.content) if response.content else None
+        if not isinstance(data, dict) or "responses" not in data:
+            raise APIError(_error_message(data, response.status_code), response.status_code, response)
+
+        for call, sub in zip(calls, data["responses"]):
+            status_code, body = sub["status"], sub["body"]
+            if call.etag_key is not None:
+                cached = self.etag_cache.get(call.etag_key)
+                if status_code == 304 and cached:
+                    call._resolve(copy.deepcopy(cached[1]))
+                    continue
+                etag = sub["headers"].get("ETag")
+                if status_code == call.expected_status and etag:
+                    self.etag_cache.put(call.etag_key, etag, copy.deepcopy(body))
+            if status_code == call.expected_status and not data.get("committed", True):
+                call._resolve(error=APIError(
+                    "Rolled back: another request of the atomic batch failed", status_code
+                ))
+            elif status_code == call.expected_status:
+                call._resolve(body)
+            else:
+                call._resolve(error=APIError(_error_message(body, status_code), status_code))
+
+    def _queue(self, method, path, params=None, body=None, expected_status=200, etag_key=None):
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        call = BatchCall(method, path, body, expected_status, etag_key)
+        if method in IDEMPOTENT_METHODS:
+            call.headers["Idempotency-Key"] = str(uuid.uuid4())
+        self._pending.append(call)
+        return call
+
+    def _request(self, method, url, retry, **kwargs):
+        """
+        Send one request; when `retry` is set, resend it after a timeout, a lost
+        connection or a RETRY_STATUSES response, waiting RETRY_BACKOFF * 2**attempt
+        seconds (plus jitter, at least Retry-After) between attempts, at most
+        MAX_RETRIES times
+        """
+        attempt = 0
+        while True:
+            retry_after = 0
+            try:
+                response = requests.request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs)
+                if not retry or attempt >= MAX_RETRIES or response.status_code not in RETRY_STATUSES:
+                    return response
+                try:
+                    retry_after = float(response.headers.get("Retry-After", 0))
+                except ValueError:
+                    pass
+            except (requests.Timeout, requests.ConnectionError):
+                if not retry or attempt >= MAX_RETRIES:
+                    raise
+            delay = RETRY_BACKOFF * 2 ** attempt + random.uniform(0, RETRY_BACKOFF)
+            time.sleep(max(delay, retry_after))
+            attempt += 1
+
+    def _send(self, method, path, json=None, params=None, expected_status=200):
+        """
+        Send a request (or queue it inside batch()) and check its status.
+        Writes get a fresh Idempotency-Key that is reused by every retry.
+        """
+        if self._pending is not None:
+            return self._queue(method, path, params, json, expected_status)
+        headers = {}
+        if method in IDEMPOTENT_METHODS:
+            headers["Idempotency-Key"] = str(uuid.uuid4())
+        response = self._request(
+            method, f"{self.base_url}{path}", retry=method != "DELETE",
+            params=params, json=json, headers=headers
+        )
+        return self._handle_response(response, expected_status)
+
+    def _require_immediate(self):
+        if self._pending is not None:
+            raise RuntimeError("This method needs intermediate results and cannot be used inside batch()")
+
+    def _get(self, path, params=None):
+        """GET with If-None-Match: reuse the cached body when the server answers 304"""
+        url = f"{self.base_url}{path}"
+        key = (url, tuple(sorted((params or {}).items())))
+        cached = self.etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        if self._pending is not None:
+            call = self._queue("GET", path, params, etag_key=key)
+            call.headers = headers
+            return call
+
+        response = self._request("GET", url, retry=True, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return copy.deepcopy(cached[1])
+
+        data = self._handle_response(response)
+        etag = response.headers.get("ETag")
+        if etag:
+            self.etag_cache.put(key, etag, copy.deepcopy(data))
+        return data
 
     def _handle_response(self, response, expected_status=200):
         """Handle API response and errors"""
         if response.status_code == expected_status:
-            return response.json() if response.content else None
+            return _loads(response.content) if response.content else None
 
         # Handle error
         try:
-            error_data = response.json()
-            error_message = error_data.get('error', 'Unknown API error')
-        except:
+            error_message = _error_message(_loads(response.content), response.status_code)
+        except ValueError:
             error_message = f"API error: HTTP {response.status_code}"
 
         raise APIError(error_message, response.status_code, response)
 
+    def get_bootstrap(self, dai_ly_fields: Optional[List[str]] = None) -> Dict:
+        """
+        Startup data in one request: {"quans", "loai_dai_lys", "quy_dinhs"} (all rows)
+        and "dai_lys" (first page, only the given fields when `dai_ly_fields` is set)
+        """
+        return self._get("/bootstrap/", params=_fields_params(dai_ly_fields))
+
     # Quan (District) API methods
-    def get_all_quan(self) -> List[Dict]:
-        """Get all districts"""
-        response = requests.get(f"{self.base_url}/quan/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+    def get_all_quan(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Get districts, first page (only the given fields when `fields` is set)"""
+        return _then(self._get("/quan/", params=_fields_params(fields)), lambda page: page["results"])
 
     def get_quan_by_id(self, id_: int) -> Dict:
         """Get district by ID"""
-        response = requests.get(f"{self.base_url}/quan/{id_}/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        return self._get(f"/quan/{id_}/")
 
     def add_quan(self, ten_quan: str) -> Dict:
         """Add new district"""
         data = {"ten_quan": ten_quan}
-        response = requests.post(f"{self.base_url}/quan/", json=data, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response, 201)
+        return self._send("POST", "/quan/", json=data, expected_status=201)
 
     def update_quan(self, id_: int, ten_quan: str) -> Dict:
         """Update district"""
         data = {"ten_quan": ten_quan}
-        response = requests.put(f"{self.base_url}/quan/{id_}/", json=data, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        return self._send("PUT", f"/quan/{id_}/", json=data)
 
     def delete_quan(self, id_: int) -> None:
         """Delete district"""
-        response = requests.delete(f"{self.base_url}/quan/{id_}/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response, 204)
+        return self._send("DELETE", f"/quan/{id_}/", expected_status=204)
 
     def count_daily_by_quan(self, id_: int) -> int:
         """Count distributors in district"""
         try:
-            response = requests.get(f"{self.base_url}/quan/{id_}/dai_lys/", timeout=DEFAULT_TIMEOUT)
-            data = self._handle_response(response)
-            return len(data)
+            return _then(self.get_quan_by_id(id_), lambda quan: quan["so_dai_ly"], on_error=lambda e: 0)
         except:
             return 0
 
     # LoaiDaiLy (Distributor Type) API methods
-    def get_all_loaidaily(self) -> List[Dict]:
-        """Get all distributor types"""
-        response = requests.get(f"{self.base_url}/loaidaily/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+    def get_all_loaidaily(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Get distributor types, first page (only the given fields when `fields` is set)"""
+        return _then(self._get("/loaidaily/", params=_fields_params(fields)), lambda page: page["results"])
 
     def get_loaidaily_by_id(self, id_: int) -> Dict:
         """Get distributor type by ID"""
-        response = requests.get(f"{self.base_url}/loaidaily/{id_}/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        return self._get(f"/loaidaily/{id_}/")
 
     def add_loaidaily(self, ten_loai: str, no_toi_da: Decimal) -> Dict:
         """Add new distributor type"""
         data = {
             "ten_loai_dai_ly": ten_loai,
-            "no_toi_da": float(no_toi_da)
+            "no_toi_da": str(no_toi_da)
         }
-        response = requests.post(f"{self.base_url}/loaidaily/", json=data, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response, 201)
+        return self._send("POST", "/loaidaily/", json=data, expected_status=201)
 
     def update_loaidaily(self, id_: int, ten_loai: str, no_toi_da: Decimal) -> Dict:
         """Update distributor type"""
         data = {
             "ten_loai_dai_ly": ten_loai,
-            "no_toi_da": float(no_toi_da)
+            "no_toi_da": str(no_toi_da)
         }
-        response = requests.put(f"{self.base_url}/loaidaily/{id_}/", json=data, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        return self._send("PUT", f"/loaidaily/{id_}/", json=data)
 
     def delete_loaidaily(self, id_: int) -> None:
         """Delete distributor type"""
-        response = requests.delete(f"{self.base_url}/loaidaily/{id_}/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response, 204)
+        return self._send("DELETE", f"/loaidaily/{id_}/", expected_status=204)
 
     # DaiLy (Distributor) API methods
-    def get_all_daily(self) -> List[Dict]:
-        """Get all distributors"""
-        response = requests.get(f"{self.base_url}/daily/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+    def get_all_daily(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Get distributors, first page (only the given fields when `fields` is set)"""
+        return _then(self._get("/daily/", params=_fields_params(fields)), lambda page: page["results"])
 
     def get_daily_by_id(self, id_: int) -> Dict:
         """Get distributor by ID"""
-        response = requests.get(f"{self.base_url}/daily/{id_}/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        return self._get(f"/daily/{id_}/")
 
     def search_daily(self, keyword: str) -> List[Dict]:
-        """Search distributors"""
-        response = requests.get(f"{self.base_url}/daily/search/?keyword={keyword}", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        """Search distributors (best matches first)"""
+        return _then(self._get("/daily/search/", params={"keyword": keyword}), lambda page: page["results"])
+
+    def get_daily_changes(self, since: Optional[str] = None, page_size: Optional[int] = None) -> Dict:
+        """Get distributors upserted/deleted since a sync token (one page)"""
+        params = {"since": since or "0"}
+        if page_size:
+            params["page_size"] = page_size
+        return self._send("GET", "/daily/changes/", params=params)
+
+    def sync_daily(self, local: Dict[int, Dict], since: Optional[str] = None) -> str:
+        """Bring a local {id: distributor} copy up to date, returns the new sync token"""
+        self._require_immediate()
+        while True:
+            changes = self.get_daily_changes(since)
+            if changes["reset"]:
+                local.clear()
+            for id_ in changes["deleted"]:
+                local.pop(id_, None)
+            for dai_ly in changes["upserted"]:
+                local[dai_ly["id"]] = dai_ly
+            since = changes["token"]
+            if not changes["has_more"]:
+                return since
 
     def add_daily(self, ten_daily: str, dien_thoai: str, dia_chi: str,
                   quan_id: int, loaidaily_id: int, email: Optional[str] = None) -> Dict:
@@ -134,8 +405,7 @@ class DjangoAPIClient:
             "loai_dai_ly": loaidaily_id,
             "email": email
         }
-        response = requests.post(f"{self.base_url}/daily/", json=data, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response, 201)
+        return self._send("POST", "/daily/", json=data, expected_status=201)
 
     def update_daily(self, id_: int, ten_daily: str, dien_thoai: str, dia_chi: str,
                      quan_id: int, loaidaily_id: int, email: Optional[str] = None) -> Dict:
@@ -148,38 +418,46 @@ class DjangoAPIClient:
             "loai_dai_ly": loaidaily_id,
             "email": email
         }
-        response = requests.put(f"{self.base_url}/daily/{id_}/", json=data, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        return self._send("PUT", f"/daily/{id_}/", json=data)
 
-    def update_tien_no(self, id_: int, tien_no: Decimal) -> Dict:
-        """Update distributor's debt"""
-        daily = self.get_daily_by_id(id_)
-        daily["tien_no"] = float(tien_no)
+    def adjust_tien_no(self, id_: int, delta: Decimal) -> Dict:
+        """Adjust distributor's debt by a signed delta on the server, returns {"id", "tien_no"}"""
+        data = {"delta": str(delta)}
+        return self._send("POST", f"/daily/{id_}/adjust_debt/", json=data)
 
-        response = requests.put(f"{self.base_url}/daily/{id_}/", json=daily, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+    def update_tien_no(self, id_: int, tien_no: Decimal) -> Dict:
+        """
+        Set distributor's debt to tien_no.
+
+        Deprecated: reads the current debt and then adjusts it, so a concurrent
+        change between the two calls is overwritten. Use adjust_tien_no.
+        """
+        warnings.warn("update_tien_no is deprecated, use adjust_tien_no with a delta",
+                      DeprecationWarning, stacklevel=2)
+        self._require_immediate()
+        current = Decimal(str(self.get_daily_by_id(id_)["tien_no"]))
+        return self.adjust_tien_no(id_, Decimal(tien_no) - current)
 
     def delete_daily(self, id_: int) -> None:
         """Delete distributor"""
-        response = requests.delete(f"{self.base_url}/daily/{id_}/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response, 204)
+        return self._send("DELETE", f"/daily/{id_}/", expected_status=204)
 
     # QuyDinh (Regulation) API methods
     def get_all_quydinh(self) -> List[Dict]:
-        """Get all regulations"""
-        response = requests.get(f"{self.base_url}/quydinh/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        """Get regulations, first page"""
+        return _then(self._get("/quydinh/"), lambda page: page["results"])
 
     def get_quydinh_by_name(self, name: str) -> Optional[Dict]:
         """Get regulation by name"""
         try:
-            response = requests.get(f"{self.base_url}/quydinh/by_name/?name={name}", timeout=DEFAULT_TIMEOUT)
-            return self._handle_response(response)
+            return _then(self._get("/quydinh/by_name/", params={"name": name}), lambda quydinh: quydinh,
+                         on_error=lambda e: None)
         except APIError:
             return None
 
     def get_or_create_quydinh(self, name: str, default_value: str, mo_ta: Optional[str] = None) -> Dict:
         """Get regulation by name or create if not exists"""
+        self._require_immediate()
         try:
             quydinh = self.get_quydinh_by_name(name)
             if quydinh:
@@ -193,20 +471,18 @@ class DjangoAPIClient:
             "gia_tri": default_value,
             "mo_ta": mo_ta
         }
-        response = requests.post(f"{self.base_url}/quydinh/", json=data, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response, 201)
+        return self._send("POST", "/quydinh/", json=data, expected_status=201)
 
     def update_quydinh(self, id_: int, gia_tri: str, mo_ta: Optional[str] = None) -> Dict:
         """Update regulation"""
+        self._require_immediate()
         quydinh = self.get_quydinh_by_id(id_)
         quydinh["gia_tri"] = gia_tri
         if mo_ta is not None:
             quydinh["mo_ta"] = mo_ta
 
-        response = requests.put(f"{self.base_url}/quydinh/{id_}/", json=quydinh, timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
+        return self._send("PUT", f"/quydinh/{id_}/", json=quydinh)
 
     def get_quydinh_by_id(self, id_: int) -> Dict:
         """Get regulation by ID"""
-        response = requests.get(f"{self.base_url}/quydinh/{id_}/", timeout=DEFAULT_TIMEOUT)
-        return self._handle_response(response)
\ No newline at end of file
+        return self._get(f"/quydinh/{id_}/")
\ No newline at end of file
@@ -10,12 +10,18 @@ from frontend.api_client import DjangoAPIClient, APIError
 from frontend.utils.helpers import AlertHelper, IconManager
 from frontend.utils.validators import ValidationHelper
 
+# Các cột hiển thị trong bảng đại lý (chỉ tải các trường này)
+TABLE_FIELDS = [
+    'id', 'ten_dai_ly', 'dien_thoai', 'dia_chi', 'ten_quan', 'ten_loai_dai_ly',
+    'ngay_tiep_nhan', 'email', 'tien_no'
+]
+
 
 class DaiLyController(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, api_client=None, bootstrap=None):
         super().__init__(parent)
-        # Initialize API client
-        self.api_client = DjangoAPIClient()
+        # Initialize API client (shared with the other screens when given)
+        self.api_client = api_client or DjangoAPIClient()
 
         # Setup UI
         self.setup_ui()
@@ -23,9 +29,12 @@ class DaiLyController(QWidget):
         # Connect signals to slots
         self.connect_signals()
 
-        # Load initial data
-        self.load_combobox_data()
-        self.refresh_table_data()
+        # Load initial data (from GET /api/bootstrap/ when MainWindow already fetched it)
+        if bootstrap is not None:
+            self.fill_comboboxes(bootstrap['quans'], bootstrap['loai_dai_lys'])
+            self.populate_table(bootstrap['dai_lys']['results'])
+        else:
+            self.load_initial_data()
 
     def setup_ui(self):
         # Create main layout
@@ -150,25 +159,30 @@ class DaiLyController(QWidget):
         # Connect table selection change
         self.table_daily.itemSelectionChanged.connect(self.on_table_selection_changed)
 
-    def load_combobox_data(self):
+    def load_initial_data(self):
+        # Quận, loại đại lý và bảng đại lý trong một request (POST /api/batch/)
         try:
-            # Load Quan data
-            quan_list = self.api_client.get_all_quan()
-            self.cbo_quan.clear()
-            for quan in quan_list:
-                self.cbo_quan.addItem(quan['ten_quan'], quan['id'])
-
-            # Load LoaiDaiLy data
-            loai_daily_list = self.api_client.get_all_loaidaily()
-            self.cbo_loai_daily.clear()
-            for loai in loai_daily_list:
-                self.cbo_loai_daily.addItem(loai['ten_loai_dai_ly'], loai['id'])
+            with self.api_client.batch():
+                quan_list = self.api_client.get_all_quan(fields=['id', 'ten_quan'])
+                loai_daily_list = self.api_client.get_all_loaidaily(fields=['id', 'ten_loai_dai_ly'])
+                daily_list = self.api_client.get_all_daily(fields=TABLE_FIELDS)
+            self.fill_comboboxes(quan_list.result(), loai_daily_list.result())
+            self.populate_table(daily_list.result())
         except APIError as e:
             AlertHelper.show_api_error(self, e, "Lỗi tải dữ liệu")
 
+    def fill_comboboxes(self, quan_list, loai_daily_list):
+        self.cbo_quan.clear()
+        for quan in quan_list:
+            self.cbo_quan.addItem(quan['ten_quan'], quan['id'])
+
+        self.cbo_loai_daily.clear()
+        for loai in loai_daily_list:
+            self.cbo_loai_daily.addItem(loai['ten_loai_dai_ly'], loai['id'])
+
     def refresh_table_data(self):
         try:
-            daily_list = self.api_client.get_all_daily()
+            daily_list = self.api_client.get_all_daily(fields=TABLE_FIELDS)
             self.populate_table(daily_list)
         except APIError as e:
             AlertHelper.show_api_error(self, e, "Lỗi tải dữ liệu")
@@ -191,7 +205,7 @@ class DaiLyController(QWidget):
             self.table_daily.setItem(i, 6, QTableWidgetItem(formatted_date))
 
             self.table_daily.setItem(i, 7, QTableWidgetItem(daily['email'] or ""))
-            self.table_daily.setItem(i, 8, QTableWidgetItem(f"{daily['tien_no']:,.0f}"))
+            self.table_daily.setItem(i, 8, QTableWidgetItem(f"{Decimal(daily['tien_no']):,.0f}"))
 
         # Auto adjust column widths
         self.table_daily.resizeColumnsToContents()
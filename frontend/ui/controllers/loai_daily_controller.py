@@ -11,10 +11,10 @@ from frontend.utils.validators import ValidationHelper
 
 
 class LoaiDaiLyController(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, api_client=None, bootstrap=None):
         super().__init__(parent)
-        # Initialize API client
-        self.api_client = DjangoAPIClient()
+        # Initialize API client (shared with the other screens when given)
+        self.api_client = api_client or DjangoAPIClient()
 
         # Setup UI
         self.setup_ui()
@@ -22,8 +22,11 @@ class LoaiDaiLyController(QWidget):
         # Connect signals to slots
         self.connect_signals()
 
-        # Load initial data
-        self.refresh_table_data()
+        # Load initial data (from GET /api/bootstrap/ when MainWindow already fetched it)
+        if bootstrap is not None:
+            self.populate_table(bootstrap['loai_dai_lys'])
+        else:
+            self.refresh_table_data()
 
     def setup_ui(self):
         # Create main layout
@@ -122,7 +125,7 @@ class LoaiDaiLyController(QWidget):
             self.table_loai.insertRow(i)
             self.table_loai.setItem(i, 0, QTableWidgetItem(str(loai['id'])))
             self.table_loai.setItem(i, 1, QTableWidgetItem(loai['ten_loai_dai_ly']))
-            self.table_loai.setItem(i, 2, QTableWidgetItem(f"{loai['no_toi_da']:,.0f}"))
+            self.table_loai.setItem(i, 2, QTableWidgetItem(f"{Decimal(loai['no_toi_da']):,.0f}"))
             self.table_loai.setItem(i, 3, QTableWidgetItem(str(loai['so_dai_ly'])))
 
         # Auto adjust column widths
@@ -5,7 +5,8 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 import os
 
-from frontend.ui.controllers.daily_controller import DaiLyController
+from frontend.api_client import DjangoAPIClient, APIError
+from frontend.ui.controllers.daily_controller import DaiLyController, TABLE_FIELDS
 from frontend.ui.controllers.quan_controller import QuanController
 from frontend.ui.controllers.loai_daily_controller import LoaiDaiLyController
 from frontend.utils.helpers import IconManager
@@ -39,10 +40,18 @@ class MainWindow(QMainWindow):
         self.content_panel = QtWidgets.QStackedWidget()
         self.main_layout.addWidget(self.content_panel, 4)
 
+        # Startup data for every screen in one request (GET /api/bootstrap/);
+        # on failure each controller loads its own data and reports the error
+        self.api_client = DjangoAPIClient()
+        try:
+            bootstrap = self.api_client.get_bootstrap(dai_ly_fields=TABLE_FIELDS)
+        except APIError:
+            bootstrap = None
+
         # Create controllers
-        self.daily_controller = DaiLyController()
-        self.quan_controller = QuanController()
-        self.loai_daily_controller = LoaiDaiLyController()
+        self.daily_controller = DaiLyController(api_client=self.api_client, bootstrap=bootstrap)
+        self.quan_controller = QuanController(api_client=self.api_client, bootstrap=bootstrap)
+        self.loai_daily_controller = LoaiDaiLyController(api_client=self.api_client, bootstrap=bootstrap)
 
         # Add controllers to content panel
         self.content_panel.addWidget(self.daily_controller)
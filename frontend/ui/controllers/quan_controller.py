@@ -10,10 +10,10 @@ from frontend.utils.validators import ValidationHelper
 
 
 class QuanController(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, api_client=None, bootstrap=None):
         super().__init__(parent)
-        # Initialize API client
-        self.api_client = DjangoAPIClient()
+        # Initialize API client (shared with the other screens when given)
+        self.api_client = api_client or DjangoAPIClient()
 
         # Setup UI
         self.setup_ui()
@@ -21,8 +21,11 @@ class QuanController(QWidget):
         # Connect signals to slots
         self.connect_signals()
 
-        # Load initial data
-        self.refresh_table_data()
+        # Load initial data (from GET /api/bootstrap/ when MainWindow already fetched it)
+        if bootstrap is not None:
+            self.populate_table(bootstrap['quans'])
+        else:
+            self.refresh_table_data()
 
     def setup_ui(self):
         # Create main layout
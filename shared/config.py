@@ -6,6 +6,11 @@ API_BASE_URL = "http://127.0.0.1:8000/api"  # Đảm bảo port đúng
 # Thời gian timeout mặc định cho các request API (giây)
 DEFAULT_TIMEOUT = 10
 
+# Số lần thử lại tối đa khi request bị timeout/mất kết nối hoặc nhận 429/502/503/504,
+# và thời gian chờ cơ sở (giây) trước lần thử lại đầu tiên (nhân đôi sau mỗi lần)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+
 # Cấu hình ứng dụng
 APP_NAME = "Quản lý Đại Lý"
 APP_VERSION = "1.0.0"